@@ -4,14 +4,22 @@ from sanic.request import Request
 #from tensorflow.keras.utils import plot_model
 from container.container import Container
 from etcd.etcd_client import EtcdClient
+from etcd.async_etcd_client import AsyncEtcdClient
+from etcd import storage_schema
+from etcd.informer import Informer
 from container.container_manager import ContainerManager
 from container.container_runtime import ContainerRuntime
+from container.runtime_backend import load_backend
 from pod.pod_controller import PodController
 from container.image_handler import ImageHandler
 from node.node_controller import NodeController
+from node.node_heartbeat import HeartbeatMonitor
 from orchestrator.DDQN_scheduler import DDQNScheduler
+from orchestrator.ddqn_checkpoint import load_checkpointer
+from orchestrator.ddqn_learner import load_learner
 from tests.system_tester import SystemTester
 from orchestrator.kube_scheduler_plus import Kube_Scheduler_Plus
+from orchestrator.image_locality import ImageLocality, create_image_informer
 from sanic_cors import CORS
 import logging,json
 from hypercorn.asyncio import serve
@@ -29,18 +37,65 @@ ddqn_scheduler = None
 use_ddqn = True
 
 # 初始化控制器
-etcd_client = EtcdClient()
-container_manager = ContainerManager(etcd_client)
-container_runtime = ContainerRuntime(etcd_client)
-image_handler = ImageHandler()
-pod_controller = PodController(etcd_client, container_manager, container_runtime)
-node_controller = NodeController(etcd_client)
-kube_scheduler = Kube_Scheduler_Plus(node_controller)
+etcd_client = EtcdClient.shared()  # 进程内共享、可在配置的 etcd endpoint 间故障转移的客户端
+async_etcd_client = AsyncEtcdClient.shared()  # 路由处理函数使用的异步客户端，etcd 请求不阻塞事件循环
+runtime_backend = load_backend()  # 按 config.yaml 的 container_runtime 段选择 containerd gRPC 或 ctr 后端
+container_manager = ContainerManager(etcd_client, backend=runtime_backend)
+container_runtime = ContainerRuntime(etcd_client, backend=runtime_backend)
+image_handler = ImageHandler(backend=runtime_backend)  # 镜像拉取到容器运行时所在的命名空间
+# list-watch 本地缓存，GET /nodes 与 GET /pods 直接读内存
+node_informer = Informer(etcd_client, storage_schema.NODE_PREFIX)
+binding_informer = Informer(etcd_client, storage_schema.BINDING_PREFIX,
+                            indexers={'node': lambda key, binding: [binding['node']]})
+pod_informer = Informer(etcd_client, storage_schema.POD_PREFIX,
+                        indexers={'namespace': lambda key, pod: [pod['namespace']]})
+# 各节点上报的本地镜像（images/），镜像 -> 节点倒排索引随 watch 事件增量更新
+image_informer = create_image_informer(etcd_client)
+pod_controller = PodController(etcd_client, container_manager, container_runtime, pod_informer=pod_informer,
+                               async_etcd_client=async_etcd_client)
+node_controller = NodeController(etcd_client, node_informer=node_informer, binding_informer=binding_informer,
+                                 async_etcd_client=async_etcd_client)
+kube_scheduler = Kube_Scheduler_Plus(node_controller, image_locality=ImageLocality(image_informer))
+# 监听节点心跳租约，心跳过期的节点被标记为 NotReady 并退出调度
+heartbeat_monitor = HeartbeatMonitor(node_controller, etcd_client)
 
 def create_scheduler():
     global ddqn_scheduler
     if ddqn_scheduler is None:
-        ddqn_scheduler = DDQNScheduler(node_controller)
+        # 从 config.yaml 的 ddqn_checkpoint 目录加载最新检查点，重启后直接沿用已学到的策略
+        ddqn_scheduler = DDQNScheduler(node_controller, checkpointer=load_checkpointer())
+        # 训练移到后台线程，/DDQN_schedule 只做状态构建与一次推理
+        load_learner(ddqn_scheduler)
+
+@app.listener('before_server_start')
+async def migrate_storage(app, loop):
+    # 将旧版（节点记录内嵌 Pod 列表）的 etcd 数据迁移到当前存储布局
+    try:
+        storage_schema.migrate(etcd_client)
+    except Exception as e:
+        logging.error(f"Failed to migrate etcd storage schema: {e}")
+
+@app.listener('before_server_start')
+async def start_informers(app, loop):
+    # 迁移完成后再 list-watch；失败时列表接口回退为直接读取 etcd
+    for informer in (node_informer, binding_informer, pod_informer, image_informer):
+        try:
+            informer.start()
+        except Exception as e:
+            logging.error(f"Failed to start informer for {informer.prefix}: {e}")
+    try:
+        heartbeat_monitor.start()
+    except Exception as e:
+        logging.error(f"Failed to start node heartbeat monitor: {e}")
+
+@app.listener('after_server_stop')
+async def stop_informers(app, loop):
+    for informer in (node_informer, binding_informer, pod_informer, image_informer):
+        informer.stop()
+    heartbeat_monitor.stop()
+    if ddqn_scheduler is not None:
+        ddqn_scheduler.stop_learner()
+    await async_etcd_client.close()
 
 @app.listener('before_server_start')
 async def setup_scheduler(app, loop):
@@ -94,7 +149,7 @@ def configure_routes(app):
     @app.route('/nodes/<name>', methods=['DELETE'])
     async def remove_node(request: Request, name: str):
         try:
-            node_controller.remove_node(name)
+            await node_controller.remove_node_async(name)
             return response.json({'message': f"Node '{name}' removed successfully."}, status=200)
         except Exception as e:
             return response.json({'error': str(e)}, status=500)
@@ -104,11 +159,10 @@ def configure_routes(app):
     @app.route('/nodes', methods=['GET'])
     async def list_nodes(request: Request):
         try:
-            # 从 etcd 获取所有节点信息
-            node_controller._update_etcd_node()
-            nodes = node_controller.get_all_nodes()
+            # 优先从 Informer 缓存获取所有节点信息，未同步时回退为读取 etcd
+            nodes = await node_controller.get_all_nodes_async()
             
-            return response.json({'nodes': nodes}, status=200)
+            return response.json({'nodes': nodes, 'resourceVersion': node_controller.resource_version}, status=200)
         except Exception as e:
             logging.error(f"Error while listing nodes: {e}")
             return response.json({'error': str(e)}, status=500)
@@ -141,7 +195,7 @@ def configure_routes(app):
             node_controller.schedule_pod_to_node(pod, name)
 
             # 启动Pod
-            pod_controller.start_pod(pod_name, namespace)
+            await pod_controller.start_pod_async(pod_name, namespace)
 
             # 返回成功响应
             return json({'message': f"Pod '{pod_name}' scheduled to Node '{name}' successfully."}, status=200)
@@ -213,7 +267,7 @@ def configure_routes(app):
                 return response.json({'error': "At least one container must be specified."}, status=400)
 
             # Call the pod controller to create the pod
-            pod_controller.create_pod(name, containers, namespace)
+            await pod_controller.create_pod_async(name, containers, namespace)
 
             return response.json({'message': f"Pod '{name}' created successfully."}, status=201)
 
@@ -225,7 +279,7 @@ def configure_routes(app):
     @app.route('/pods/<name>', methods=['DELETE'])
     async def delete_pod(request: Request, name: str):
         try:
-            pod_controller.delete_pod(name,"default")
+            await pod_controller.delete_pod_async(name, "default")
             return response.json({'message': f"Pod '{name}' deleted successfully."}, status=200)
         except Exception as e:
             return response.json({'error': str(e)}, status=500)
@@ -233,9 +287,9 @@ def configure_routes(app):
     @app.route('/pods', methods=['GET'])
     async def list_pods(request: Request):
         try:
-            # 从 etcd 获取所有 Pods 信息
-            pods = pod_controller.get_all_pods()
-            return response.json({'pods': pods}, status=200)
+            # 优先从 Informer 缓存获取所有 Pods 信息，未同步时回退为读取 etcd
+            pods = await pod_controller.get_all_pods_async()
+            return response.json({'pods': pods, 'resourceVersion': pod_controller.resource_version}, status=200)
         except Exception as e:
             logging.error(f"Error while listing pods: {e}")
             return response.json({'error': str(e)}, status=500)
@@ -244,7 +298,7 @@ def configure_routes(app):
     @app.route('/pods/<name>/stop', methods=['POST'])
     async def stop_pod(request: Request, name: str):
         try:
-            pod_controller.stop_pod(name)
+            await pod_controller.stop_pod_async(name)
             return response.json({'message': f"Pod '{name}' stopped successfully."}, status=200)
         except Exception as e:
             return response.json({'error': str(e)}, status=500)
@@ -252,7 +306,7 @@ def configure_routes(app):
     @app.route('/pods/<name>/start', methods=['POST'])
     async def start_pod(request: Request, name: str):
         try:
-            pod_controller.start_pod(name)
+            await pod_controller.start_pod_async(name)
             return response.json({'message': f"Pod '{name}' started successfully."}, status=200)
         except Exception as e:
             return response.json({'error': str(e)}, status=500)
@@ -260,7 +314,7 @@ def configure_routes(app):
     @app.route('/pods/<name>/restart', methods=['POST'])
     async def restart_pod(request: Request, name: str):
         try:
-            pod_controller.restart_pod(name)
+            await pod_controller.restart_pod_async(name)
             return response.json({'message': f"Pod '{name}' restarted successfully."}, status=200)
         except Exception as e:
             return response.json({'error': str(e)}, status=500)
@@ -337,6 +391,49 @@ def configure_routes(app):
         except Exception as e:
             return response.json({"status": "error", "message": f"Failed to schedule Pod: {str(e)}"}, status=500)
 
+    def _get_batch_pods(request):
+        """从批量调度请求中解析 Pod 列表，返回 (pods, 错误结果列表)."""
+        data = request.json or {}
+        pod_specs = data.get("pods", []) if isinstance(data, dict) else data
+        pods, errors = [], []
+        for pod_data in pod_specs:
+            metadata = pod_data.get("metadata", {})
+            pod_name = metadata.get("name")
+            namespace = metadata.get("namespace", "default")
+            pod = pod_controller.pods.get(namespace, {}).get(pod_name)
+            if pod is None:
+                errors.append({"pod_name": pod_name, "node_name": None,
+                               "error": f"Pod '{pod_name}' not found in namespace '{namespace}'."})
+                continue
+            pods.append(pod)
+        return pods, errors
+
+    @app.route("/kube_schedule/batch", methods=["POST"])
+    async def kube_schedule_pods(request):
+        """在一次请求中批量调度多个 Pod."""
+        try:
+            pods, errors = _get_batch_pods(request)
+            results = kube_scheduler.schedule_pods(pods) + errors
+            return response.json({"status": "success", "results": results})
+
+        except SanicException as e:
+            return response.json({"status": "error", "message": str(e)}, status=400)
+        except Exception as e:
+            return response.json({"status": "error", "message": f"Failed to schedule Pods: {str(e)}"}, status=500)
+
+    @app.route("/DDQN_schedule/batch", methods=["POST"])
+    async def DDQN_schedule_pods(request):
+        """在一次请求中使用 DDQN 调度器批量调度多个 Pod."""
+        try:
+            pods, errors = _get_batch_pods(request)
+            results = ddqn_scheduler.schedule_pods(pods) + errors
+            return response.json({"status": "success", "results": results})
+
+        except SanicException as e:
+            return response.json({"status": "error", "message": str(e)}, status=400)
+        except Exception as e:
+            return response.json({"status": "error", "message": f"Failed to schedule Pods: {str(e)}"}, status=500)
+
     @app.route("/DDQN_schedule_history", methods=["GET"])
     async def get_DDQN_schedule_history(request):
         """
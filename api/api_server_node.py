@@ -1,26 +1,98 @@
 from sanic import Sanic, response, SanicException
 from sanic.request import Request
 from container.container import Container
-from etcd.etcd_client import EtcdClient
+from etcd.etcd_client import EtcdClient, DEFAULT_CONFIG_FILE
+from etcd.etcd_config import EtcdConfig
 from container.container_manager import ContainerManager
 from container.container_runtime import ContainerRuntime
+from container.runtime_backend import load_backend
 from pod.pod_controller import PodController
 from container.image_handler import ImageHandler
 from node.node_controller import NodeController
+from node.node_heartbeat import NodeHeartbeat, DEFAULT_HEARTBEAT_TTL
+from node.image_prepuller import ImagePrePuller, DEFAULT_PREPULL_WORKERS
+from node.image_gc import ImageGarbageCollector
+from node.image_reporter import ImageStateReporter
 from orchestrator.DDQN_scheduler import DDQNScheduler
 from orchestrator.kube_scheduler_plus import Kube_Scheduler_Plus
 from sanic_cors import CORS
 import logging,json
+import os
+import socket
+import yaml
 
 app = Sanic(__name__)
 app.config.DEBUG = True
 CORS(app)
 
-etcd_client = EtcdClient()
-container_manager = ContainerManager(etcd_client)
-container_runtime = ContainerRuntime(etcd_client)
-image_handler = ImageHandler()
-pod_controller = PodController(etcd_client, container_manager, container_runtime)
+etcd_client = EtcdClient.shared()  # 进程内共享、可在配置的 etcd endpoint 间故障转移的客户端
+runtime_backend = load_backend()  # 按 config.yaml 的 container_runtime 段选择 containerd gRPC 或 ctr 后端
+container_manager = ContainerManager(etcd_client, backend=runtime_backend)
+container_runtime = ContainerRuntime(etcd_client, backend=runtime_backend)
+image_handler = ImageHandler(backend=runtime_backend)  # 镜像拉取到容器运行时所在的命名空间
+# 启动 Pod 前先确保镜像在本地，共享同一镜像的容器只拉取一次
+pod_controller = PodController(etcd_client, container_manager, container_runtime, image_handler=image_handler)
+node_name = os.environ.get('NODE_NAME', socket.gethostname())
+
+def _heartbeat_ttl():
+    try:
+        return EtcdConfig(DEFAULT_CONFIG_FILE).get_heartbeat_ttl()
+    except Exception:
+        return DEFAULT_HEARTBEAT_TTL
+
+# 节点心跳：持有 etcd 租约，每个续约周期只发送一次 keep-alive；节点名称与 master 中注册的名称一致
+node_heartbeat = NodeHeartbeat(etcd_client, node_name, ttl=_heartbeat_ttl())
+
+def _node_config(section):
+    """读取 config/config.yaml 中的一段配置，读取失败时返回空字典"""
+    try:
+        with open('config/config.yaml', 'r') as f:
+            return dict((yaml.safe_load(f) or {}).get(section) or {})
+    except Exception as e:
+        logging.warning(f"Failed to load '{section}' config: {e}")
+        return {}
+
+def _image_prepuller():
+    """config/config.yaml 中 image_prepull.enabled 为 true 时创建镜像预拉取器"""
+    config = _node_config('image_prepull')
+    if not config.get('enabled'):
+        return None
+    return ImagePrePuller(image_handler, etcd_client, node_name,
+                          workers=config.get('workers', DEFAULT_PREPULL_WORKERS))
+
+def _image_gc():
+    """config/config.yaml 中 image_gc.enabled 为 true 时创建镜像回收器（默认关闭）"""
+    config = _node_config('image_gc')
+    if not config.pop('enabled', False):
+        return None
+    return ImageGarbageCollector(image_handler, pod_controller.images_in_use, **config)
+
+# 可选：Pod 被调度到本节点后立即在后台拉取其镜像
+image_prepuller = _image_prepuller()
+# 可选：磁盘使用率超过高水位时按 LRU 删除未被 Pod 引用的镜像
+image_gc = _image_gc()
+# 本地镜像集合变化时写入 images/{node}，供 master 按镜像局部性调度
+image_reporter = ImageStateReporter(image_handler.cache, etcd_client, node_name, refresh=image_handler.list_images)
+
+@app.listener('before_server_start')
+async def start_heartbeat(app, loop):
+    node_heartbeat.start()
+    await image_handler.list_images_async()  # 以本地已有镜像初始化镜像索引
+    image_reporter.start()
+    if image_prepuller is not None:
+        image_prepuller.start()
+    if image_gc is not None:
+        image_gc.start()
+
+@app.listener('after_server_stop')
+async def stop_heartbeat(app, loop):
+    # 撤销租约，master 立即将本节点标记为 NotReady
+    node_heartbeat.stop()
+    image_reporter.stop()
+    if image_prepuller is not None:
+        image_prepuller.stop()
+    if image_gc is not None:
+        image_gc.stop()
 
 
 
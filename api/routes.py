@@ -6,6 +6,7 @@ from container.container import Container
 from etcd.etcd_client import EtcdClient
 from container.container_manager import ContainerManager
 from container.container_runtime import ContainerRuntime
+from container.runtime_backend import load_backend
 from pod.pod_controller import PodController
 from container.image_handler import ImageHandler
 from node.node_controller import NodeController
@@ -18,10 +19,11 @@ app = Sanic(__name__)
 CORS(app)
 
 # 初始化各个控制器
-etcd_client = EtcdClient()
-container_manager = ContainerManager(etcd_client)
-container_runtime = ContainerRuntime(etcd_client)
-image_handler = ImageHandler()
+etcd_client = EtcdClient.shared()  # 进程内共享、可在配置的 etcd endpoint 间故障转移的客户端
+runtime_backend = load_backend()  # 按 config.yaml 的 container_runtime 段选择 containerd gRPC 或 ctr 后端
+container_manager = ContainerManager(etcd_client, backend=runtime_backend)
+container_runtime = ContainerRuntime(etcd_client, backend=runtime_backend)
+image_handler = ImageHandler(backend=runtime_backend)  # 镜像拉取到容器运行时所在的命名空间
 pod_controller = PodController(etcd_client)
 node_controller = NodeController(etcd_client)
 ddqn_scheduler = DDQNScheduler(node_controller)
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import threading
+import weakref
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# 同时运行的 ctr 子进程数上限
+DEFAULT_MAX_CONCURRENCY = 8
+# 单条命令的默认超时时间（秒）；镜像拉取可能较慢
+DEFAULT_TIMEOUT = 300.0
+
+
+class CommandExecutor:
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, default_timeout=DEFAULT_TIMEOUT):
+        """
+        基于 asyncio.create_subprocess_exec 的命令执行器，等待子进程时不阻塞事件循环。
+        :param max_concurrency: 同时运行的子进程数上限，超出的命令排队等待
+        :param default_timeout: 默认超时时间（秒），None 表示不限制
+        """
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.default_timeout = default_timeout
+        self._semaphores = weakref.WeakKeyDictionary()  # 事件循环 -> 该循环上的并发信号量
+
+    @classmethod
+    def shared(cls):
+        """返回进程内共享的执行器，所有组件共用同一个并发上限."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def run(self, cmd, timeout=None, check=False):
+        """
+        异步执行命令并收集输出，语义与 subprocess.run(cmd, capture_output=True, text=True) 一致。
+        超时或调用方取消时终止子进程，不留下孤儿进程。
+        :param timeout: 超时时间（秒），None 时使用 default_timeout
+        :param check: 为 True 时非零退出码抛出 subprocess.CalledProcessError
+        :return: subprocess.CompletedProcess
+        :raises subprocess.TimeoutExpired: 命令超时
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        async with self._semaphore():
+            # 独立进程组，超时或取消时连同 ctr 派生的子进程一起终止
+            process = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE,
+                                                           stderr=asyncio.subprocess.PIPE,
+                                                           start_new_session=os.name == 'posix')
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                await self._kill(process)
+                logging.error(f"Command timed out after {timeout}s: {' '.join(cmd)}")
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            except asyncio.CancelledError:
+                await self._kill(process)
+                raise
+        result = subprocess.CompletedProcess(cmd, process.returncode, stdout.decode(errors='replace'),
+                                             stderr.decode(errors='replace'))
+        if check:
+            result.check_returncode()
+        return result
+
+    @staticmethod
+    async def _kill(process):
+        if process.returncode is None:
+            try:
+                if os.name == 'posix':
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.kill()
+            except PermissionError:
+                # sudo 启动的子进程属于 root，只能由 sudo 转发信号
+                process.terminate()
+            except ProcessLookupError:
+                pass
+            await process.wait()
@@ -25,7 +25,7 @@ class Container:
             'limits': {}
         } 
         self.ports = ports or []
-        self.etcd_client = etcd_client or EtcdClient()  # 初始化 Etcd 客户端
+        self.etcd_client = etcd_client or EtcdClient.shared()  # 复用进程内共享的 Etcd 客户端
         self.sync_to_etcd()  # 同步初始状态到 etcd
 
     def to_dict(self):
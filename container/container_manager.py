@@ -1,34 +1,22 @@
-import subprocess
-import logging,json
+import asyncio
+import logging
 from .container import Container
+from .runtime_backend import CtrBackend
 #from etcd.etcd_client import EtcdClient  # 假设你有一个 etcd 客户端类
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
 class ContainerManager:
-    def __init__(self, etcd_client):
+    def __init__(self, etcd_client, executor=None, backend=None):
         self.etcd_client = etcd_client  # 初始化 etcd 客户端
+        # 容器运行时后端，默认通过 ctr 命令行操作 containerd；executor 仅供 ctr 后端的 *_async 方法使用
+        self.backend = backend or CtrBackend(executor)
 
     def create_container(self, container: Container):
         """Creates a container using containerd and updates etcd"""
         try:
-            # 构造创建命令
-            cmd = ['sudo', 'ctr', 'container', 'create', container.image, container.name]
-            if container.command:
-                cmd.extend(container.command)
-            if container.ports:
-                cmd.extend(['--ports', json.dumps(container.ports)])
-            if container.resources:
-                # 处理资源限制，如 requests 和 limits
-                for limit_type, resources in container.resources.items():
-                    for resource, value in resources.items():
-                        cmd.extend([f"--{limit_type}-{resource}", value])
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise Exception(f"Error creating container: {result.stderr.strip()}")
-
+            self.backend.create_container(container)
             logging.info(f"Container {container.name} created successfully.")
             # 将容器信息写入 etcd
             self.etcd_client.put(f"/containers/{container.name}/status", "running")
@@ -36,15 +24,20 @@ class ContainerManager:
             logging.error(f"Failed to create container {container.name}: {e}")
             raise
 
+    async def create_container_async(self, container: Container, timeout=None):
+        """create_container 的异步版本，等待运行时时不阻塞事件循环"""
+        try:
+            await self.backend.create_container_async(container, timeout=timeout)
+            logging.info(f"Container {container.name} created successfully.")
+            await asyncio.to_thread(self.etcd_client.put, f"/containers/{container.name}/status", "running")
+        except Exception as e:
+            logging.error(f"Failed to create container {container.name}: {e}")
+            raise
+
     def delete_container(self, name: str):
         """Deletes a container using containerd and updates etcd"""
         try:
-            result = subprocess.run(
-                ['sudo', 'ctr', 'containers', 'delete', name], capture_output=True, text=True
-            )
-            if result.returncode != 0:
-                raise Exception(f"Error deleting container: {result.stderr.strip()}")
-
+            self.backend.delete_container(name)
             logging.info(f"Container {name} deleted successfully.")
             # 从 etcd 中删除容器记录
             self.etcd_client.delete(f"/containers/{name}")
@@ -52,30 +45,40 @@ class ContainerManager:
             logging.error(f"Failed to delete container {name}: {e}")
             raise
 
+    async def delete_container_async(self, name: str, timeout=None):
+        """delete_container 的异步版本"""
+        try:
+            await self.backend.delete_container_async(name, timeout=timeout)
+            logging.info(f"Container {name} deleted successfully.")
+            await asyncio.to_thread(self.etcd_client.delete, f"/containers/{name}")
+        except Exception as e:
+            logging.error(f"Failed to delete container {name}: {e}")
+            raise
+
     def list_containers(self):
         """Lists all containers using containerd"""
         try:
-            result = subprocess.run(
-                ['ctr', 'containers', 'list'], capture_output=True, text=True
-            )
-            if result.returncode != 0:
-                raise Exception(f"Error listing containers: {result.stderr.strip()}")
-
-            logging.info("Containers:\n" + result.stdout)
+            names = self.backend.list_containers()
+            logging.info("Containers:\n" + "\n".join(names))
+            return names
         except Exception as e:
             logging.error(f"Failed to list containers: {e}")
             raise  # 显式抛出异常
 
+    async def list_containers_async(self, timeout=None):
+        """list_containers 的异步版本"""
+        try:
+            names = await self.backend.list_containers_async(timeout=timeout)
+            logging.info("Containers:\n" + "\n".join(names))
+            return names
+        except Exception as e:
+            logging.error(f"Failed to list containers: {e}")
+            raise
+
     def container_info(self, name: str):
         """Retrieves information about a specific container and syncs with etcd"""
         try:
-            result = subprocess.run(
-                ['ctr', 'containers', 'info', name], capture_output=True, text=True
-            )
-            if result.returncode != 0:
-                raise Exception(f"Error getting container info: {result.stderr.strip()}")
-
-            container_data = result.stdout.strip()
+            container_data = self.backend.container_info(name)
             logging.info(f"Container info for {name}:\n" + container_data)
 
             # 更新 etcd 中的容器信息
@@ -83,3 +86,13 @@ class ContainerManager:
         except Exception as e:
             logging.error(f"Failed to get info for container {name}: {e}")
             raise  # 显式抛出异常
+
+    async def container_info_async(self, name: str, timeout=None):
+        """container_info 的异步版本"""
+        try:
+            container_data = await self.backend.container_info_async(name, timeout=timeout)
+            logging.info(f"Container info for {name}:\n" + container_data)
+            await asyncio.to_thread(self.etcd_client.put, f"/containers/{name}", container_data)
+        except Exception as e:
+            logging.error(f"Failed to get info for container {name}: {e}")
+            raise
@@ -1,86 +1,115 @@
-import subprocess
+import asyncio
 import logging
 from .container import Container
+from .runtime_backend import CtrBackend
 #from etcd.etcd_client import EtcdClient  
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
 class ContainerRuntime:
-    def __init__(self, etcd_client):
+    def __init__(self, etcd_client, executor=None, backend=None):
         self.etcd_client = etcd_client  # 初始化 etcd 客户端
+        # 容器运行时后端，默认通过 ctr 命令行操作 containerd；executor 仅供 ctr 后端的 *_async 方法使用
+        self.backend = backend or CtrBackend(executor)
 
     def start_container(self, container: Container):
         """Starts a container and updates etcd status."""
         try:
-            result = subprocess.run(
-                ['sudo', 'ctr', 'task', 'start', container.name], capture_output=True, text=True
-            )
-            if result.returncode != 0:
-                raise Exception(f"Error starting container: {result.stderr.strip()}")
+            self.backend.start_task(container.name)
             logging.info(f"Container {container.name} started successfully.")
             # 更新 etcd 中的容器状态
             self.etcd_client.put(f"/containers/{container.name}/status", "running")
         except Exception as e:
             logging.error(f"Failed to start container {container.name}: {e}")
+            raise
+
+    async def start_container_async(self, container: Container, timeout=None):
+        """start_container 的异步版本，等待运行时时不阻塞事件循环"""
+        try:
+            await self.backend.start_task_async(container.name, timeout=timeout)
+            logging.info(f"Container {container.name} started successfully.")
+            await asyncio.to_thread(self.etcd_client.put, f"/containers/{container.name}/status", "running")
+        except Exception as e:
+            logging.error(f"Failed to start container {container.name}: {e}")
+            raise
 
     def stop_container(self, name: str):
         """Stops a container and updates etcd status."""
         try:
-            result = subprocess.run(
-                ['sudo', 'ctr', 'task', 'kill', name], capture_output=True, text=True
-            )
-            if result.returncode != 0:
-                raise Exception(f"Error stopping container: {result.stderr.strip()}")
+            self.backend.kill_task(name)
             logging.info(f"Container {name} stopped successfully.")
             # 更新 etcd 中的容器状态
             self.etcd_client.put(f"/containers/{name}/status", "stopped")
         except Exception as e:
             logging.error(f"Failed to stop container {name}: {e}")
+            raise
+
+    async def stop_container_async(self, name: str, timeout=None):
+        """stop_container 的异步版本"""
+        try:
+            await self.backend.kill_task_async(name, timeout=timeout)
+            logging.info(f"Container {name} stopped successfully.")
+            await asyncio.to_thread(self.etcd_client.put, f"/containers/{name}/status", "stopped")
+        except Exception as e:
+            logging.error(f"Failed to stop container {name}: {e}")
+            raise
 
 
     def list_containers(self):
         """Lists all containers and optionally syncs with etcd."""
         try:
-            result = subprocess.run(
-                ['ctr', 'containers', 'ls'], capture_output=True, text=True
-            )
-            if result.returncode != 0:
-                raise Exception(f"Error listing containers: {result.stderr.strip()}")
-            logging.info(f"Containers:\n{result.stdout}")
+            names = self.backend.list_containers()
+            logging.info("Containers:\n" + "\n".join(names))
             # 可选：将容器列表与 etcd 同步
-            containers = result.stdout.splitlines()
-            for container in containers:
-                container_name = container.split()[0]  # 假设第一个字段是容器名称
-                self.etcd_client.put(f"/containers/{container_name}/status", "listed")
+            self.etcd_client.put_many([(f"/containers/{name}/status", "listed") for name in names])
+        except Exception as e:
+            logging.error(f"Failed to list containers: {e}")
+
+    async def list_containers_async(self, timeout=None):
+        """list_containers 的异步版本"""
+        try:
+            names = await self.backend.list_containers_async(timeout=timeout)
+            logging.info("Containers:\n" + "\n".join(names))
+            await asyncio.to_thread(self.etcd_client.put_many,
+                                    [(f"/containers/{name}/status", "listed") for name in names])
         except Exception as e:
             logging.error(f"Failed to list containers: {e}")
 
     def remove_container(self, name: str):
         """Removes a container and updates etcd."""
         try:
-            result = subprocess.run(
-                ['ctr', 'containers', 'rm', name], capture_output=True, text=True
-            )
-            if result.returncode != 0:
-                raise Exception(f"Error removing container: {result.stderr.strip()}")
+            self.backend.delete_container(name)
             logging.info(f"Container {name} removed successfully.")
             # 从 etcd 中删除容器记录
             self.etcd_client.delete(f"/containers/{name}")
         except Exception as e:
             logging.error(f"Failed to remove container {name}: {e}")
 
+    async def remove_container_async(self, name: str, timeout=None):
+        """remove_container 的异步版本"""
+        try:
+            await self.backend.delete_container_async(name, timeout=timeout)
+            logging.info(f"Container {name} removed successfully.")
+            await asyncio.to_thread(self.etcd_client.delete, f"/containers/{name}")
+        except Exception as e:
+            logging.error(f"Failed to remove container {name}: {e}")
+
     def inspect_container(self, name: str):
         """Inspects a container and syncs data with etcd."""
         try:
-            result = subprocess.run(
-                ['sudo', 'ctr', 'containers', 'info', name], capture_output=True, text=True
-            )
-            if result.returncode != 0:
-                raise Exception(f"Error inspecting container: {result.stderr.strip()}")
-            container_info = result.stdout.strip()
+            container_info = self.backend.container_info(name)
             logging.info(f"Container {name} info:\n{container_info}")
             # 将容器信息同步到 etcd
             self.etcd_client.put(f"/containers/{name}/info", container_info)
         except Exception as e:
-            logging.error(f"Failed to inspect container {name}: {e}")
\ No newline at end of file
+            logging.error(f"Failed to inspect container {name}: {e}")
+
+    async def inspect_container_async(self, name: str, timeout=None):
+        """inspect_container 的异步版本"""
+        try:
+            container_info = await self.backend.container_info_async(name, timeout=timeout)
+            logging.info(f"Container {name} info:\n{container_info}")
+            await asyncio.to_thread(self.etcd_client.put, f"/containers/{name}/info", container_info)
+        except Exception as e:
+            logging.error(f"Failed to inspect container {name}: {e}")
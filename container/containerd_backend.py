@@ -0,0 +1,230 @@
+import hashlib
+import json
+import logging
+import platform
+import signal
+import threading
+import grpc
+from google.protobuf import any_pb2, json_format
+from utils import quantity
+from .runtime_backend import RuntimeBackend
+
+try:
+    # containerd 的 gRPC 绑定为可选依赖（pip install containerd），未安装时只能使用 ctr 后端
+    from containerd.services.containers.v1 import containers_pb2, containers_pb2_grpc
+    from containerd.services.content.v1 import content_pb2, content_pb2_grpc
+    from containerd.services.images.v1 import images_pb2, images_pb2_grpc
+    from containerd.services.snapshots.v1 import snapshots_pb2, snapshots_pb2_grpc
+    from containerd.services.tasks.v1 import tasks_pb2, tasks_pb2_grpc
+except ImportError:
+    containers_pb2 = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+DEFAULT_ADDRESS = '/run/containerd/containerd.sock'
+DEFAULT_NAMESPACE = 'default'
+DEFAULT_RUNTIME = 'io.containerd.runc.v2'
+DEFAULT_SNAPSHOTTER = 'overlayfs'
+# 单次 gRPC 调用的默认超时时间（秒）
+DEFAULT_TIMEOUT = 30.0
+
+OCI_SPEC_TYPE_URL = 'types.containerd.io/opencontainers/runtime-spec/1/Spec'
+INDEX_MEDIA_TYPES = ('application/vnd.oci.image.index.v1+json',
+                     'application/vnd.docker.distribution.manifest.list.v2+json')
+DEFAULT_ENV = ['PATH=/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin']
+# platform.machine() -> OCI 平台架构
+ARCHITECTURES = {'x86_64': 'amd64', 'amd64': 'amd64', 'aarch64': 'arm64', 'arm64': 'arm64'}
+
+
+class ContainerdBackend(RuntimeBackend):
+    name = 'containerd'
+
+    def __init__(self, address=DEFAULT_ADDRESS, namespace=DEFAULT_NAMESPACE, runtime=DEFAULT_RUNTIME,
+                 snapshotter=DEFAULT_SNAPSHOTTER, timeout=DEFAULT_TIMEOUT):
+        """
+        直接通过 containerd 的 unix socket 调用 gRPC API，整个进程复用一条持久连接，
+        每个操作不再启动 sudo/ctr 子进程；gRPC 调用很快，*_async 方法沿用基类的线程池实现。
+        :param address: containerd socket 路径
+        :param namespace: containerd 命名空间，通过 containerd-namespace 元数据传递
+        :param runtime: 创建容器时使用的 shim 运行时
+        :param snapshotter: 容器根文件系统使用的 snapshotter
+        :param timeout: 单次 gRPC 调用的超时时间（秒）
+        """
+        if containers_pb2 is None:
+            raise ImportError("containerd gRPC bindings are not installed; install the 'containerd' package "
+                              "or use the ctr backend")
+        self.address = address
+        self.namespace = namespace
+        self.runtime = runtime
+        self.snapshotter = snapshotter
+        self.timeout = timeout
+        self._metadata = (('containerd-namespace', namespace),)
+        self._channel = grpc.insecure_channel(f"unix://{address}")
+        self._containers = containers_pb2_grpc.ContainersStub(self._channel)
+        self._content = content_pb2_grpc.ContentStub(self._channel)
+        self._images = images_pb2_grpc.ImagesStub(self._channel)
+        self._snapshots = snapshots_pb2_grpc.SnapshotsStub(self._channel)
+        self._tasks = tasks_pb2_grpc.TasksStub(self._channel)
+        self._image_configs = {}  # 镜像 target digest -> (chain ID, 镜像配置)，镜像内容不可变，可以缓存
+        self._lock = threading.Lock()
+
+    def _call(self, method, request, action, ignore_not_found=False):
+        try:
+            return method(request, timeout=self.timeout, metadata=self._metadata)
+        except grpc.RpcError as e:
+            if ignore_not_found and e.code() == grpc.StatusCode.NOT_FOUND:
+                return None
+            raise Exception(f"Error {action}: {e.code().name}: {e.details()}") from e
+
+    def _read_blob(self, digest):
+        data = b''.join(response.data for response in self._call(
+            self._content.Read, content_pb2.ReadContentRequest(digest=digest), "reading image content"))
+        return json.loads(data)
+
+    def _select_manifest(self, index):
+        """从多架构镜像索引中选出当前节点平台的 manifest."""
+        architecture = ARCHITECTURES.get(platform.machine().lower(), platform.machine().lower())
+        for manifest in index.get('manifests', []):
+            target = manifest.get('platform', {})
+            if target.get('os', 'linux') == 'linux' and target.get('architecture') == architecture:
+                return manifest
+        raise Exception(f"Error resolving image: no manifest for linux/{architecture}")
+
+    def _resolve_image(self, image):
+        """:return: (镜像根文件系统的 chain ID, 镜像配置)"""
+        target = self._call(self._images.Get, images_pb2.GetImageRequest(name=image), "resolving image").image.target
+        with self._lock:
+            cached = self._image_configs.get(target.digest)
+        if cached is not None:
+            return cached
+        descriptor = {'mediaType': target.media_type, 'digest': target.digest}
+        if descriptor['mediaType'] in INDEX_MEDIA_TYPES:
+            descriptor = self._select_manifest(self._read_blob(descriptor['digest']))
+        manifest = self._read_blob(descriptor['digest'])
+        config = self._read_blob(manifest['config']['digest'])
+        # chain ID: chain(L0) = diff(L0)，chain(Ln) = sha256(chain(Ln-1) + " " + diff(Ln))
+        chain_id = None
+        for diff_id in config.get('rootfs', {}).get('diff_ids', []):
+            chain_id = diff_id if chain_id is None else \
+                'sha256:' + hashlib.sha256(f"{chain_id} {diff_id}".encode()).hexdigest()
+        if chain_id is None:
+            raise Exception(f"Error resolving image: {image} has no layers; is it unpacked?")
+        with self._lock:
+            self._image_configs[target.digest] = (chain_id, config)
+        return chain_id, config
+
+    @staticmethod
+    def _spec(container, image_config):
+        """根据镜像配置与容器资源限制构造 OCI 运行时 spec."""
+        config = image_config.get('config') or {}
+        args = list(container.command or []) or (config.get('Entrypoint') or []) + (config.get('Cmd') or [])
+        if not args:
+            raise Exception(f"Error creating container: no command for {container.name}")
+        resources = {}
+        limits = (container.resources or {}).get('limits') or {}
+        if limits.get('cpu'):
+            period = 100000
+            resources['cpu'] = {'quota': quantity.parse_cpu(limits['cpu']) * period // 1000, 'period': period}
+        if limits.get('memory'):
+            resources['memory'] = {'limit': quantity.parse_memory(limits['memory'])}
+        return {
+            'ociVersion': '1.0.2',
+            'process': {'args': args, 'cwd': config.get('WorkingDir') or '/', 'env': config.get('Env') or DEFAULT_ENV,
+                        'user': {'uid': 0, 'gid': 0}, 'terminal': False},
+            'root': {'path': 'rootfs'},
+            'hostname': container.name,
+            'mounts': [
+                {'destination': '/proc', 'type': 'proc', 'source': 'proc', 'options': ['nosuid', 'noexec', 'nodev']},
+                {'destination': '/dev', 'type': 'tmpfs', 'source': 'tmpfs',
+                 'options': ['nosuid', 'strictatime', 'mode=755', 'size=65536k']},
+                {'destination': '/sys', 'type': 'sysfs', 'source': 'sysfs',
+                 'options': ['nosuid', 'noexec', 'nodev', 'ro']},
+            ],
+            'linux': {'namespaces': [{'type': namespace} for namespace in ('pid', 'ipc', 'uts', 'mount', 'network')],
+                      'resources': resources},
+        }
+
+    def create_container(self, container):
+        chain_id, image_config = self._resolve_image(container.image)
+        snapshot_key = container.name
+        self._call(self._snapshots.Prepare, snapshots_pb2.PrepareSnapshotRequest(
+            snapshotter=self.snapshotter, key=snapshot_key, parent=chain_id), "preparing snapshot")
+        spec = any_pb2.Any(type_url=OCI_SPEC_TYPE_URL, value=json.dumps(self._spec(container, image_config)).encode())
+        record = containers_pb2.Container(
+            id=container.name, image=container.image, spec=spec, snapshotter=self.snapshotter,
+            snapshot_key=snapshot_key, runtime=containers_pb2.Container.Runtime(name=self.runtime))
+        try:
+            self._call(self._containers.Create, containers_pb2.CreateContainerRequest(container=record),
+                       "creating container")
+        except Exception:
+            self._call(self._snapshots.Remove, snapshots_pb2.RemoveSnapshotRequest(
+                snapshotter=self.snapshotter, key=snapshot_key), "removing snapshot", ignore_not_found=True)
+            raise
+
+    def delete_container(self, name):
+        record = self._call(self._containers.Get, containers_pb2.GetContainerRequest(id=name),
+                            "deleting container").container
+        self._call(self._tasks.Delete, tasks_pb2.DeleteTaskRequest(container_id=name), "deleting task",
+                   ignore_not_found=True)
+        self._call(self._containers.Delete, containers_pb2.DeleteContainerRequest(id=name), "deleting container")
+        if record.snapshot_key:
+            self._call(self._snapshots.Remove, snapshots_pb2.RemoveSnapshotRequest(
+                snapshotter=record.snapshotter or self.snapshotter, key=record.snapshot_key), "removing snapshot",
+                ignore_not_found=True)
+
+    def start_task(self, name):
+        record = self._call(self._containers.Get, containers_pb2.GetContainerRequest(id=name),
+                            "starting container").container
+        mounts = self._call(self._snapshots.Mounts, snapshots_pb2.MountsRequest(
+            snapshotter=record.snapshotter or self.snapshotter, key=record.snapshot_key), "starting container").mounts
+        self._call(self._tasks.Create, tasks_pb2.CreateTaskRequest(container_id=name, rootfs=mounts),
+                   "starting container")
+        self._call(self._tasks.Start, tasks_pb2.StartRequest(container_id=name), "starting container")
+
+    def kill_task(self, name):
+        """与 ctr task kill + ctr task rm 相同：发送 SIGTERM，等待任务退出后删除任务，
+        否则已退出的任务仍挂在容器上，下次启动或删除该容器会失败；超时未退出时改发 SIGKILL。"""
+        self._call(self._tasks.Kill, tasks_pb2.KillRequest(container_id=name, signal=int(signal.SIGTERM)),
+                   "stopping container")
+        if not self._wait_task(name):
+            logging.warning(f"Container {name} did not exit within {self.timeout}s after SIGTERM, sending SIGKILL.")
+            self._call(self._tasks.Kill, tasks_pb2.KillRequest(container_id=name, signal=int(signal.SIGKILL)),
+                       "stopping container", ignore_not_found=True)
+            if not self._wait_task(name):
+                raise Exception(f"Error stopping container: {name} did not exit after SIGKILL")
+        self._call(self._tasks.Delete, tasks_pb2.DeleteTaskRequest(container_id=name), "deleting task",
+                   ignore_not_found=True)
+
+    def _wait_task(self, name):
+        """等待任务退出；超时返回 False，任务已不存在时视为已退出."""
+        try:
+            self._tasks.Wait(tasks_pb2.WaitRequest(container_id=name), timeout=self.timeout, metadata=self._metadata)
+            return True
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                return False
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                return True
+            raise Exception(f"Error stopping container: {e.code().name}: {e.details()}") from e
+
+    def list_containers(self):
+        response = self._call(self._containers.List, containers_pb2.ListContainersRequest(), "listing containers")
+        return [record.id for record in response.containers]
+
+    def container_info(self, name):
+        record = self._call(self._containers.Get, containers_pb2.GetContainerRequest(id=name),
+                            "getting container info").container
+        # OCI spec 的 Any 类型未在 protobuf 中注册，需要单独解码
+        spec = json.loads(record.spec.value) if record.spec.value else None
+        record.ClearField('spec')
+        info = json_format.MessageToDict(record)
+        info['spec'] = spec
+        return json.dumps(info, indent=2)
+
+    def ctr_command(self, *args):
+        # 镜像拉取仍通过 ctr 完成，需指向同一个 socket 与命名空间，容器才能使用拉取的镜像
+        return ['sudo', 'ctr', '--address', self.address, '--namespace', self.namespace] + list(args)
+
+    def close(self):
+        self._channel.close()
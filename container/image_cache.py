@@ -0,0 +1,142 @@
+import logging
+import re
+import threading
+import time
+from collections import namedtuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# 本地镜像记录：digest 未知时（拉取输出中未解析到）以镜像引用代替，下次 list_images 时校正
+ImageRecord = namedtuple('ImageRecord', ['digest', 'size', 'last_used', 'refs'])
+
+# ctr images list 的一行：REF TYPE DIGEST SIZE PLATFORMS LABELS，SIZE 形如 "3.2 MiB"
+_LIST_LINE = re.compile(r'^(\S+)\s+\S+\s+(sha256:[0-9a-f]{64})\s+([\d.]+)\s*([KMGT]i?B|B)\b')
+# ctr images pull 结束时输出 "unpacking linux/amd64 sha256:..."
+_PULL_DIGEST = re.compile(r'unpacking\s+\S+\s+(sha256:[0-9a-f]{64})')
+_SIZE_UNITS = {'B': 1, 'KB': 1000, 'MB': 1000 ** 2, 'GB': 1000 ** 3, 'TB': 1000 ** 4,
+               'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3, 'TiB': 1024 ** 4}
+
+
+def parse_size(number, unit):
+    return int(float(number) * _SIZE_UNITS.get(unit or 'B', 1))
+
+
+def parse_pull_digest(output):
+    """从 ctr images pull 的输出中解析镜像 digest，未找到时返回 None."""
+    matches = _PULL_DIGEST.findall(output) if isinstance(output, str) else []
+    return matches[-1] if matches else None
+
+
+class ImageCacheIndex:
+    def __init__(self):
+        """
+        节点本地镜像索引：digest -> (大小, 最近使用时间, 引用该 digest 的镜像名)，以及镜像名 -> digest。
+        拉取前先查询索引，已存在的镜像不再调用 ctr；list_images 的结果会整体校正索引。
+        """
+        self._images = {}  # digest -> ImageRecord
+        self._refs = {}  # 镜像引用 -> digest
+        self._lock = threading.Lock()
+        self.version = 0  # 镜像集合每次变化（不含最近使用时间）时递增，供上报方判断是否需要重新上报
+
+    def __contains__(self, ref):
+        with self._lock:
+            return ref in self._refs
+
+    def __len__(self):
+        with self._lock:
+            return len(self._images)
+
+    def get(self, ref):
+        """:return: 镜像引用对应的 ImageRecord，不存在时返回 None"""
+        with self._lock:
+            digest = self._refs.get(ref)
+            return self._images.get(digest) if digest is not None else None
+
+    def records(self):
+        with self._lock:
+            return list(self._images.values())
+
+    def image_sizes(self):
+        """:return: 镜像引用 -> 镜像大小（字节）"""
+        with self._lock:
+            return {ref: self._images[digest].size for ref, digest in self._refs.items()}
+
+    def total_size(self):
+        with self._lock:
+            return sum(record.size for record in self._images.values())
+
+    def touch(self, ref, now=None):
+        """记录镜像被使用（容器创建或拉取命中），返回镜像是否在索引中."""
+        now = time.time() if now is None else now
+        with self._lock:
+            digest = self._refs.get(ref)
+            if digest is None:
+                return False
+            self._images[digest] = self._images[digest]._replace(last_used=now)
+            return True
+
+    def record_pull(self, ref, digest=None, size=0, now=None):
+        """登记拉取完成的镜像."""
+        now = time.time() if now is None else now
+        digest = digest or ref
+        with self._lock:
+            self._unlink(ref)
+            record = self._images.get(digest)
+            if record is None:
+                record = ImageRecord(digest, size, now, frozenset())
+            self._images[digest] = record._replace(size=max(record.size, size), last_used=now,
+                                                   refs=record.refs | {ref})
+            self._refs[ref] = digest
+            self.version += 1
+
+    def remove(self, ref):
+        """移除镜像引用；digest 不再被任何引用使用时一并移除."""
+        with self._lock:
+            if ref in self._refs:
+                self._unlink(ref)
+                self.version += 1
+
+    def refresh(self, lines, now=None):
+        """
+        以 ctr images list 的输出整体校正索引：新增未登记的镜像，移除已不存在的镜像，保留已有的最近使用时间。
+        :param lines: ctr images list 的输出行（第一行为表头）
+        :return: 解析出的镜像数量
+        """
+        now = time.time() if now is None else now
+        images = {}
+        refs = {}
+        for line in lines:
+            match = _LIST_LINE.match(line)
+            if match is None:
+                continue
+            ref, digest, number, unit = match.groups()
+            record = images.get(digest)
+            if record is None:
+                record = ImageRecord(digest, parse_size(number, unit), now, frozenset())
+            images[digest] = record._replace(refs=record.refs | {ref})
+            refs[ref] = digest
+        with self._lock:
+            for digest, record in images.items():
+                # 沿用旧记录的使用时间；旧记录可能以镜像引用代替 digest
+                previous = [self._images.get(digest)] + [self._images.get(self._refs.get(ref)) for ref in record.refs]
+                used = [old.last_used for old in previous if old is not None]
+                if used:
+                    images[digest] = record._replace(last_used=max(used))
+            if refs != self._refs or any(images[digest].size != self._images.get(digest, record).size
+                                         for digest, record in images.items()):
+                self.version += 1
+            self._images = images
+            self._refs = refs
+        return len(images)
+
+    def _unlink(self, ref):
+        digest = self._refs.pop(ref, None)
+        if digest is None:
+            return
+        record = self._images[digest]
+        refs = record.refs - {ref}
+        if refs:
+            self._images[digest] = record._replace(refs=refs)
+        else:
+            del self._images[digest]
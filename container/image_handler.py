@@ -1,19 +1,95 @@
+import asyncio
 import subprocess
 import logging
+import threading
+import weakref
+from concurrent.futures import Future
 from typing import Optional, List
+from .command_executor import CommandExecutor
+from .image_cache import ImageCacheIndex, parse_pull_digest
+from .runtime_backend import RuntimeBackend
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
 class ImageHandler:
+    def __init__(self, executor: Optional[CommandExecutor] = None, cache: Optional[ImageCacheIndex] = None,
+                 backend: Optional[RuntimeBackend] = None):
+        self.executor = executor or CommandExecutor.shared()  # *_async 方法使用的异步命令执行器
+        # 容器运行时后端：镜像操作沿用其 ctr 命令前缀（sudo、socket、命名空间），与容器在同一命名空间中；
+        # 未提供时使用默认的 ctr
+        self.backend = backend if backend is not None else RuntimeBackend()
+        self.cache = cache if cache is not None else ImageCacheIndex()  # 节点本地镜像索引
+        # 进行中的拉取：同一镜像的并发拉取只执行一次 ctr，其余调用等待同一结果
+        self._inflight = {}  # 镜像引用 -> concurrent.futures.Future
+        self._inflight_lock = threading.Lock()
+        self._inflight_async = weakref.WeakKeyDictionary()  # 事件循环 -> {镜像引用: asyncio.Task}
+
+    def ensure_image(self, image: str) -> bool:
+        """确保镜像已在本地：索引命中时只更新最近使用时间，否则拉取（并发调用共享同一次拉取）"""
+        if self.cache.touch(image):
+            return True
+        return self.pull_image(image)
+
+    async def ensure_image_async(self, image: str, timeout: Optional[float] = None) -> bool:
+        """ensure_image 的异步版本"""
+        if self.cache.touch(image):
+            return True
+        return await self.pull_image_async(image, timeout=timeout)
+
     def pull_image(self, image: str) -> bool:
+        with self._inflight_lock:
+            future = self._inflight.get(image)
+            owner = future is None
+            if owner:
+                future = self._inflight[image] = Future()
+        if not owner:
+            logging.info(f"Image '{image}' is already being pulled, waiting for it.")
+            return future.result()
+        pulled = False
+        try:
+            pulled = self._pull(image)
+            return pulled
+        finally:
+            with self._inflight_lock:
+                del self._inflight[image]
+            future.set_result(pulled)
+
+    def _pull(self, image: str) -> bool:
         try:
             result = subprocess.run(
-                ['ctr', 'images', 'pull', image],
+                self.backend.ctr_command('images', 'pull', image),
                 capture_output=True,
                 text=True,
                 check=True
             )
+            self.cache.record_pull(image, parse_pull_digest(result.stdout))
+            logging.info(f"Image '{image}' pulled successfully.")
+            return True
+        except subprocess.CalledProcessError as e:
+            logging.error(f"Failed to pull image '{image}': {e.stderr.strip()}")
+            return False
+        except Exception as e:
+            logging.error(f"An unexpected error occurred while pulling image '{image}': {e}")
+            return False
+
+    async def pull_image_async(self, image: str, timeout: Optional[float] = None) -> bool:
+        """pull_image 的异步版本，拉取期间不阻塞事件循环；同一事件循环上的并发拉取共享同一个任务，
+        某个等待方被取消不会中断其他等待方的拉取"""
+        tasks = self._inflight_async.setdefault(asyncio.get_running_loop(), {})
+        task = tasks.get(image)
+        if task is None:
+            task = tasks[image] = asyncio.ensure_future(self._pull_async(image, timeout))
+            task.add_done_callback(lambda _: tasks.pop(image, None))
+        else:
+            logging.info(f"Image '{image}' is already being pulled, waiting for it.")
+        return await asyncio.shield(task)
+
+    async def _pull_async(self, image: str, timeout: Optional[float]) -> bool:
+        try:
+            result = await self.executor.run(self.backend.ctr_command('images', 'pull', image), timeout=timeout,
+                                             check=True)
+            self.cache.record_pull(image, parse_pull_digest(result.stdout))
             logging.info(f"Image '{image}' pulled successfully.")
             return True
         except subprocess.CalledProcessError as e:
@@ -26,12 +102,28 @@ class ImageHandler:
     def list_images(self) -> Optional[List[str]]:
         try:
             result = subprocess.run(
-                ['ctr', 'images', 'list'],
+                self.backend.ctr_command('images', 'list'),
                 capture_output=True,
                 text=True,
                 check=True
             )
             images = result.stdout.splitlines()  # Split into a list of images
+            self.cache.refresh(images)
+            logging.info("Images listed successfully.")
+            return images
+        except subprocess.CalledProcessError as e:
+            logging.error(f"Failed to list images: {e.stderr.strip()}")
+        except Exception as e:
+            logging.error(f"An unexpected error occurred while listing images: {e}")
+        return None
+
+    async def list_images_async(self, timeout: Optional[float] = None) -> Optional[List[str]]:
+        """list_images 的异步版本"""
+        try:
+            result = await self.executor.run(self.backend.ctr_command('images', 'list'), timeout=timeout,
+                                             check=True)
+            images = result.stdout.splitlines()  # Split into a list of images
+            self.cache.refresh(images)
             logging.info("Images listed successfully.")
             return images
         except subprocess.CalledProcessError as e:
@@ -43,11 +135,26 @@ class ImageHandler:
     def remove_image(self, image: str) -> bool:
         try:
             result = subprocess.run(
-                ['ctr', 'images', 'rm', image],
+                self.backend.ctr_command('images', 'rm', image),
                 capture_output=True,
                 text=True,
                 check=True
             )
+            self.cache.remove(image)
+            logging.info(f"Image '{image}' removed successfully.")
+            return True
+        except subprocess.CalledProcessError as e:
+            logging.error(f"Failed to remove image '{image}': {e.stderr.strip()}")
+            return False
+        except Exception as e:
+            logging.error(f"An unexpected error occurred while removing image '{image}': {e}")
+            return False
+
+    async def remove_image_async(self, image: str, timeout: Optional[float] = None) -> bool:
+        """remove_image 的异步版本"""
+        try:
+            await self.executor.run(self.backend.ctr_command('images', 'rm', image), timeout=timeout, check=True)
+            self.cache.remove(image)
             logging.info(f"Image '{image}' removed successfully.")
             return True
         except subprocess.CalledProcessError as e:
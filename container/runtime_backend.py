@@ -0,0 +1,255 @@
+import asyncio
+import json
+import logging
+import subprocess
+import threading
+import time
+import yaml
+from .command_executor import CommandExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# 读取容器运行时后端配置的文件
+DEFAULT_CONFIG_FILE = 'config/config.yaml'
+
+
+class RuntimeBackend:
+    """容器运行时后端接口，ContainerManager 与 ContainerRuntime 通过它操作容器.
+    同步方法失败时抛出 Exception；*_async 方法默认在线程池中调用同步版本，后端可覆盖为原生异步实现。"""
+
+    name = None
+
+    def create_container(self, container):
+        raise NotImplementedError
+
+    def delete_container(self, name):
+        raise NotImplementedError
+
+    def start_task(self, name):
+        raise NotImplementedError
+
+    def kill_task(self, name):
+        raise NotImplementedError
+
+    def list_containers(self):
+        """:return: 容器名称列表"""
+        raise NotImplementedError
+
+    def container_info(self, name):
+        """:return: 容器详情文本（JSON）"""
+        raise NotImplementedError
+
+    def ctr_command(self, *args):
+        """ImageHandler 拉取、列出、删除镜像使用的 ctr 命令行，须与本后端操作同一个 containerd 与命名空间."""
+        return ['ctr'] + list(args)
+
+    async def create_container_async(self, container, timeout=None):
+        return await asyncio.to_thread(self.create_container, container)
+
+    async def delete_container_async(self, name, timeout=None):
+        return await asyncio.to_thread(self.delete_container, name)
+
+    async def start_task_async(self, name, timeout=None):
+        return await asyncio.to_thread(self.start_task, name)
+
+    async def kill_task_async(self, name, timeout=None):
+        return await asyncio.to_thread(self.kill_task, name)
+
+    async def list_containers_async(self, timeout=None):
+        return await asyncio.to_thread(self.list_containers)
+
+    async def container_info_async(self, name, timeout=None):
+        return await asyncio.to_thread(self.container_info, name)
+
+    def close(self):
+        pass
+
+
+class CtrBackend(RuntimeBackend):
+    name = 'ctr'
+
+    def __init__(self, executor=None, sudo=True, address=None, namespace=None):
+        """
+        通过 ctr 命令行操作 containerd，每个操作启动一个子进程；在 containerd gRPC 后端不可用时作为回退。
+        :param executor: *_async 方法使用的 CommandExecutor
+        :param sudo: 是否以 sudo 运行 ctr
+        :param address: containerd socket 路径，None 时使用 ctr 的默认值
+        :param namespace: containerd 命名空间，None 时使用 ctr 的默认值
+        """
+        self.executor = executor or CommandExecutor.shared()
+        self.sudo = sudo
+        self.options = []
+        if address:
+            self.options.extend(['--address', address])
+        if namespace:
+            self.options.extend(['--namespace', namespace])
+
+    def _command(self, *args):
+        return (['sudo', 'ctr'] if self.sudo else ['ctr']) + self.options + list(args)
+
+    def ctr_command(self, *args):
+        return self._command(*args)
+
+    @staticmethod
+    def _create_args(container):
+        args = ['container', 'create', container.image, container.name]
+        if container.command:
+            args.extend(container.command)
+        if container.ports:
+            args.extend(['--ports', json.dumps(container.ports)])
+        if container.resources:
+            # 处理资源限制，如 requests 和 limits
+            for limit_type, resources in container.resources.items():
+                for resource, value in resources.items():
+                    args.extend([f"--{limit_type}-{resource}", value])
+        return args
+
+    @staticmethod
+    def _check(result, action):
+        if result.returncode != 0:
+            raise Exception(f"Error {action}: {result.stderr.strip()}")
+        return result.stdout
+
+    def _run(self, args, action):
+        return self._check(subprocess.run(self._command(*args), capture_output=True, text=True), action)
+
+    async def _run_async(self, args, action, timeout):
+        return self._check(await self.executor.run(self._command(*args), timeout=timeout), action)
+
+    def create_container(self, container):
+        self._run(self._create_args(container), "creating container")
+
+    def delete_container(self, name):
+        self._run(['containers', 'delete', name], "deleting container")
+
+    def start_task(self, name):
+        self._run(['task', 'start', name], "starting container")
+
+    def kill_task(self, name):
+        self._run(['task', 'kill', name], "stopping container")
+
+    def list_containers(self):
+        # --quiet 只输出容器 ID，不再解析表格文本
+        return self._run(['containers', 'list', '--quiet'], "listing containers").split()
+
+    def container_info(self, name):
+        return self._run(['containers', 'info', name], "getting container info").strip()
+
+    async def create_container_async(self, container, timeout=None):
+        await self._run_async(self._create_args(container), "creating container", timeout)
+
+    async def delete_container_async(self, name, timeout=None):
+        await self._run_async(['containers', 'delete', name], "deleting container", timeout)
+
+    async def start_task_async(self, name, timeout=None):
+        await self._run_async(['task', 'start', name], "starting container", timeout)
+
+    async def kill_task_async(self, name, timeout=None):
+        await self._run_async(['task', 'kill', name], "stopping container", timeout)
+
+    async def list_containers_async(self, timeout=None):
+        return (await self._run_async(['containers', 'list', '--quiet'], "listing containers", timeout)).split()
+
+    async def container_info_async(self, name, timeout=None):
+        return (await self._run_async(['containers', 'info', name], "getting container info", timeout)).strip()
+
+
+class FakeBackend(RuntimeBackend):
+    name = 'fake'
+
+    def __init__(self, latency=0.0, fail=()):
+        """
+        进程内的假后端，供测试与本地调试使用，不依赖 containerd。
+        :param latency: 每个操作的模拟耗时（秒）
+        :param fail: 操作失败的容器名称集合
+        """
+        self.latency = latency
+        self.fail = set(fail)
+        self.containers = {}  # 容器名称 -> {"image", "command", "status"}
+        self.operations = []  # (操作, 容器名称)，按发生顺序记录
+        self._lock = threading.Lock()
+
+    def _operate(self, operation, name, action):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.operations.append((operation, name))
+        if name in self.fail:
+            raise Exception(f"Error {action}: injected failure for {name}")
+
+    def _require(self, name, action):
+        if name not in self.containers:
+            raise Exception(f"Error {action}: container {name} not found")
+        return self.containers[name]
+
+    def create_container(self, container):
+        self._operate('create', container.name, "creating container")
+        with self._lock:
+            if container.name in self.containers:
+                raise Exception(f"Error creating container: container {container.name} already exists")
+            self.containers[container.name] = {"image": container.image, "command": list(container.command or []),
+                                                "status": "created"}
+
+    def delete_container(self, name):
+        self._operate('delete', name, "deleting container")
+        with self._lock:
+            self._require(name, "deleting container")
+            del self.containers[name]
+
+    def start_task(self, name):
+        self._operate('start', name, "starting container")
+        with self._lock:
+            self._require(name, "starting container")["status"] = "running"
+
+    def kill_task(self, name):
+        self._operate('kill', name, "stopping container")
+        with self._lock:
+            self._require(name, "stopping container")["status"] = "stopped"
+
+    def list_containers(self):
+        with self._lock:
+            return list(self.containers)
+
+    def container_info(self, name):
+        with self._lock:
+            return json.dumps(dict(self._require(name, "getting container info"), name=name))
+
+
+def create_backend(name='ctr', **options):
+    """按名称创建运行时后端：'containerd'（gRPC，需要 containerd Python 包）、'ctr' 或 'fake'."""
+    if name == 'containerd':
+        from .containerd_backend import ContainerdBackend
+        return ContainerdBackend(**options)
+    if name == 'ctr':
+        return CtrBackend(**options)
+    if name == 'fake':
+        return FakeBackend(**options)
+    raise ValueError(f"Unknown container runtime backend: {name}")
+
+
+_shared_backend = None
+_shared_lock = threading.Lock()
+
+
+def load_backend(config_file=DEFAULT_CONFIG_FILE):
+    """按配置文件中的 container_runtime 段创建进程共享的运行时后端；
+    containerd 后端不可用时回退为 ctr 后端。"""
+    global _shared_backend
+    with _shared_lock:
+        if _shared_backend is not None:
+            return _shared_backend
+        options = {}
+        try:
+            with open(config_file, 'r') as f:
+                options = dict((yaml.safe_load(f) or {}).get('container_runtime') or {})
+        except Exception as e:
+            logging.warning(f"Failed to load container runtime config from {config_file}: {e}")
+        name = options.pop('backend', 'ctr')
+        try:
+            _shared_backend = create_backend(name, **options)
+        except Exception as e:
+            logging.error(f"Container runtime backend '{name}' unavailable, falling back to ctr: {e}")
+            _shared_backend = CtrBackend(address=options.get('address'), namespace=options.get('namespace'))
+        logging.info(f"Using container runtime backend '{_shared_backend.name}'")
+        return _shared_backend
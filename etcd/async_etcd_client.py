@@ -0,0 +1,366 @@
+# etcd/async_etcd_client.py
+
+import asyncio
+import inspect
+import logging
+import threading
+from collections import namedtuple
+import grpc
+from etcd3 import etcdrpc, exceptions as etcd3_exceptions, utils as etcd3_utils
+from .etcd_client import (DEFAULT_CONFIG_FILE, DEFAULT_MAX_TXN_OPS, DEFAULT_PAGE_SIZE, EndpointFailover,
+                          _is_unavailable, load_endpoints)
+from .prefix_watcher import WatchEvent
+
+logger = logging.getLogger(__name__)
+
+_Stubs = namedtuple('_Stubs', ['channel', 'kv', 'watch', 'lease'])
+
+
+def _range_end(prefix):
+    return etcd3_utils.increment_last_byte(etcd3_utils.to_bytes(prefix))
+
+
+class AsyncWatchHandle:
+    """AsyncEtcdClient.watch_prefix 返回的句柄，cancel() 立即停止监听."""
+
+    def __init__(self, task):
+        self.task = task
+        self.revision = 0  # 最后分发的事件 revision
+
+    def cancel(self):
+        self.task.cancel()
+
+    __call__ = cancel
+
+    def is_alive(self):
+        return not self.task.done()
+
+
+class AsyncEtcdClient(EndpointFailover):
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, host='localhost', port=2379, max_txn_ops=DEFAULT_MAX_TXN_OPS, endpoints=None,
+                 timeout=None, retry_interval=0.5, max_retry_interval=30.0):
+        """
+        基于 grpc.aio 与 etcd3 生成的 gRPC stub 的异步 etcd 客户端，接口与 EtcdClient 对应，
+        在 Sanic 等事件循环中使用时不会阻塞循环。gRPC 通道在首次请求时于当前事件循环中建立。
+        :param timeout: 单次 RPC 的超时时间（秒），None 表示不限制
+        其余参数见 EtcdClient。
+        """
+        self.host = host
+        self.port = port
+        self.max_txn_ops = max_txn_ops
+        self.timeout = timeout
+        self._init_endpoints(endpoints, host, port, retry_interval, max_retry_interval)
+        self._stubs = {}  # endpoint -> _Stubs
+
+    @classmethod
+    def shared(cls, config_file=DEFAULT_CONFIG_FILE):
+        """返回进程内共享的 AsyncEtcdClient，连接 config_file 中配置的全部 etcd endpoint."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(endpoints=load_endpoints(config_file))
+            return cls._shared
+
+    def _stubs_for(self, index):
+        endpoint = self.endpoints[index]
+        stubs = self._stubs.get(endpoint)
+        if stubs is None:
+            channel = grpc.aio.insecure_channel(endpoint)
+            stubs = _Stubs(channel, etcdrpc.KVStub(channel), etcdrpc.WatchStub(channel), etcdrpc.LeaseStub(channel))
+            self._stubs[endpoint] = stubs
+        return stubs
+
+    async def _execute(self, operation, read=False):
+        """在可用的 endpoint 上执行 await operation(stubs)，endpoint 不可用时切换到下一个."""
+        last_error = None
+        for index in self._candidates(read):
+            try:
+                result = await operation(self._stubs_for(index))
+            except Exception as e:
+                if not _is_unavailable(e):
+                    raise
+                last_error = e
+                self._mark_down(index, e)
+                continue
+            self._mark_up(index, read)
+            return result
+        raise last_error
+
+    async def put(self, key, value, lease=None):
+        """将键值对写入 etcd
+        :param lease: 租约 ID，键随租约过期而删除
+        """
+        request = etcdrpc.PutRequest(key=etcd3_utils.to_bytes(key), value=etcd3_utils.to_bytes(value),
+                                     lease=lease or 0)
+        try:
+            await self._execute(lambda stubs: stubs.kv.Put(request, timeout=self.timeout))
+            logger.info(f"Successfully put key {key} into etcd")
+        except Exception as e:
+            logger.error(f"Failed to put key {key} into etcd: {e}")
+
+    async def put_many(self, items):
+        """在一个 etcd 事务中批量写入多个键值对，见 EtcdClient.put_many"""
+        return await self.apply_batch(items)
+
+    async def delete_many(self, keys):
+        """在一个 etcd 事务中批量删除多个键"""
+        return await self.apply_batch((), keys)
+
+    async def apply_batch(self, puts, deletes=(), delete_prefixes=()):
+        """以尽量少的 etcd 事务批量写入和删除键，分块规则见 EtcdClient.apply_batch
+        :return: 全部执行成功返回 True，否则返回 False（之前的块已提交）
+        """
+        if isinstance(puts, dict):
+            puts = puts.items()
+        ops = [etcdrpc.RequestOp(request_put=etcdrpc.PutRequest(key=etcd3_utils.to_bytes(key),
+                                                                value=etcd3_utils.to_bytes(value)))
+               for key, value in puts]
+        ops += [etcdrpc.RequestOp(request_delete_range=etcdrpc.DeleteRangeRequest(key=etcd3_utils.to_bytes(key)))
+                for key in deletes]
+        ops += [etcdrpc.RequestOp(request_delete_range=etcdrpc.DeleteRangeRequest(
+                    key=etcd3_utils.to_bytes(prefix), range_end=_range_end(prefix)))
+                for prefix in delete_prefixes]
+        if not ops:
+            return True
+        chunk_size = max(int(self.max_txn_ops), 1)
+        for start in range(0, len(ops), chunk_size):
+            if await self.txn(success=ops[start:start + chunk_size]) is None:
+                logger.error(f"Failed to apply operations {start}..{start + chunk_size} of {len(ops)} to etcd")
+                return False
+        logger.info(f"Successfully applied {len(ops)} operations to etcd in "
+                    f"{(len(ops) + chunk_size - 1) // chunk_size} transaction(s)")
+        return True
+
+    async def txn(self, success, compare=(), failure=()):
+        """执行一个 etcd 事务
+        :param success: compare 全部成立时执行的 etcdrpc.RequestOp 列表
+        :param compare: etcdrpc.Compare 列表
+        :param failure: compare 不成立时执行的 etcdrpc.RequestOp 列表
+        :return: TxnResponse；执行失败时返回 None
+        """
+        request = etcdrpc.TxnRequest(compare=list(compare), success=list(success), failure=list(failure))
+        try:
+            return await self._execute(lambda stubs: stubs.kv.Txn(request, timeout=self.timeout))
+        except Exception as e:
+            logger.error(f"Failed to execute transaction with {len(request.success)} operations: {e}")
+            return None
+
+    async def get(self, key):
+        """从 etcd 读取键的值"""
+        try:
+            response = await self._range(key)
+            logger.info(f"Retrieved value for key {key}")
+            return response.kvs[0].value.decode('utf-8') if response.kvs and response.kvs[0].value else None
+        except Exception as e:
+            logger.error(f"Failed to get key {key}: {e}")
+            return None
+
+    async def get_with_prefix(self, prefix):
+        """根据前缀从 etcd 读取所有值（分页读取，结果仍一次性返回；大量数据请使用 iter_prefix）"""
+        try:
+            result = [value async for _, value in self.iter_prefix(prefix)]
+            logger.debug(f"Retrieved {len(result)} values with prefix {prefix}")
+            return result
+        except Exception as e:
+            logger.error(f"Failed to get values with prefix {prefix}: {e}")
+            return []
+
+    async def iter_prefix(self, prefix, page_size=DEFAULT_PAGE_SIZE, keys_only=False):
+        """按键顺序分页遍历前缀下的键值对的异步生成器，语义见 EtcdClient.iter_prefix"""
+        async for page in self._iter_pages(prefix, page_size, keys_only):
+            for kv in page.kvs:
+                yield kv.key.decode('utf-8'), None if keys_only else kv.value.decode('utf-8')
+
+    async def get_prefix_with_revision(self, prefix, page_size=DEFAULT_PAGE_SIZE):
+        """分页读取前缀下所有键值对及该次读取对应的 etcd revision
+        :return: ([(key, value)], revision)；读取失败时抛出异常
+        """
+        items = []
+        revision = 0
+        async for page in self._iter_pages(prefix, page_size):
+            revision = revision or page.header.revision
+            items.extend((kv.key.decode('utf-8'), kv.value.decode('utf-8')) for kv in page.kvs)
+        logger.info(f"Listed {len(items)} keys with prefix {prefix} at revision {revision}")
+        return items, revision
+
+    async def _iter_pages(self, prefix, page_size=DEFAULT_PAGE_SIZE, keys_only=False):
+        # 后续页固定在第一页的 revision 上读取，保证分页结果是同一时刻的快照
+        range_end = _range_end(prefix)
+        start = etcd3_utils.to_bytes(prefix)
+        revision = 0
+        while True:
+            page = await self._range(start, range_end, limit=page_size, revision=revision, keys_only=keys_only)
+            yield page
+            if not page.more or not page.kvs:
+                return
+            revision = revision or page.header.revision
+            start = page.kvs[-1].key + b'\0'
+
+    async def count_prefix(self, prefix):
+        """只统计前缀下的键数量；读取失败时返回 None"""
+        try:
+            return (await self._range(prefix, _range_end(prefix), count_only=True)).count
+        except Exception as e:
+            logger.error(f"Failed to count keys with prefix {prefix}: {e}")
+            return None
+
+    async def exists(self, key):
+        """只检查键是否存在，不传输值；读取失败时返回 None"""
+        try:
+            return (await self._range(key, count_only=True)).count > 0
+        except Exception as e:
+            logger.error(f"Failed to check key {key}: {e}")
+            return None
+
+    async def _range(self, key, range_end=None, limit=0, revision=0, keys_only=False, count_only=False):
+        request = etcdrpc.RangeRequest(
+            key=etcd3_utils.to_bytes(key),
+            limit=limit,
+            revision=revision,
+            keys_only=keys_only,
+            count_only=count_only,
+            sort_order=etcdrpc.RangeRequest.ASCEND,
+            sort_target=etcdrpc.RangeRequest.KEY,
+        )
+        if range_end is not None:
+            request.range_end = etcd3_utils.to_bytes(range_end)
+        return await self._execute(lambda stubs: stubs.kv.Range(request, timeout=self.timeout), read=True)
+
+    async def delete(self, key):
+        """从 etcd 删除指定键"""
+        request = etcdrpc.DeleteRangeRequest(key=etcd3_utils.to_bytes(key))
+        try:
+            await self._execute(lambda stubs: stubs.kv.DeleteRange(request, timeout=self.timeout))
+            logger.info(f"Deleted key {key} from etcd")
+        except Exception as e:
+            logger.error(f"Failed to delete key {key}: {e}")
+
+    async def delete_prefix(self, prefix):
+        """以一次范围删除 RPC 删除前缀下的所有键
+        :return: 删除成功返回 True，否则返回 False
+        """
+        request = etcdrpc.DeleteRangeRequest(key=etcd3_utils.to_bytes(prefix), range_end=_range_end(prefix))
+        try:
+            response = await self._execute(lambda stubs: stubs.kv.DeleteRange(request, timeout=self.timeout))
+            logger.info(f"Deleted {response.deleted} keys with prefix {prefix} from etcd")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete keys with prefix {prefix}: {e}")
+            return False
+
+    async def lease(self, ttl):
+        """创建租约
+        :return: 租约 ID；失败时返回 None
+        """
+        try:
+            response = await self._execute(
+                lambda stubs: stubs.lease.LeaseGrant(etcdrpc.LeaseGrantRequest(TTL=ttl), timeout=self.timeout))
+            logger.info(f"Lease {response.ID} created with TTL: {ttl}")
+            return response.ID
+        except Exception as e:
+            logger.error(f"Failed to create lease: {e}")
+            return None
+
+    async def refresh_lease(self, lease_id):
+        """续约一次
+        :return: 续约后的剩余 TTL；租约已过期时为 0，失败时返回 None
+        """
+        async def keepalive(stubs):
+            call = stubs.lease.LeaseKeepAlive(timeout=self.timeout)
+            await call.write(etcdrpc.LeaseKeepAliveRequest(ID=lease_id))
+            response = await call.read()
+            await call.done_writing()
+            return response
+
+        try:
+            response = await self._execute(keepalive)
+            return response.TTL
+        except Exception as e:
+            logger.error(f"Failed to refresh lease {lease_id}: {e}")
+            return None
+
+    async def revoke_lease(self, lease_id):
+        """撤销租约，绑定该租约的键随之删除"""
+        try:
+            await self._execute(
+                lambda stubs: stubs.lease.LeaseRevoke(etcdrpc.LeaseRevokeRequest(ID=lease_id), timeout=self.timeout))
+            logger.info(f"Revoked lease {lease_id}")
+        except Exception as e:
+            logger.error(f"Failed to revoke lease {lease_id}: {e}")
+
+    def watch_prefix(self, prefix, callback, start_revision=None, on_compacted=None):
+        """在当前事件循环中监听前缀下的变化，立即返回可随时取消的句柄
+        callback 可以是普通函数或协程函数，参数为 WatchEvent；连接断开后从最后收到的 revision 之后继续监听。
+        :param on_compacted: 所需 revision 已被压缩时的回调，参数为 RevisionCompactedError，之后本 watch 结束
+        """
+        handle = AsyncWatchHandle(None)
+        handle.revision = (start_revision - 1) if start_revision else 0
+        handle.task = asyncio.get_running_loop().create_task(
+            self._watch_loop(handle, prefix, callback, on_compacted))
+        return handle
+
+    def watch(self, key, callback):
+        """监控指定键的变化，并执行回调 callback(key, value)，删除时 value 为 None
+        :return: 取消句柄
+        """
+        return self.watch_prefix(key, lambda event: callback(event.key, event.value)
+                                 if event.key == key else None)
+
+    async def _watch_loop(self, handle, prefix, callback, on_compacted):
+        delay = self.retry_interval
+        while True:
+            index = self._candidates(read=True)[0]
+            create = etcdrpc.WatchCreateRequest(key=etcd3_utils.to_bytes(prefix), range_end=_range_end(prefix),
+                                                start_revision=handle.revision + 1 if handle.revision else 0)
+            call = self._stubs_for(index).watch.Watch()
+            try:
+                await call.write(etcdrpc.WatchRequest(create_request=create))
+                logger.info(f"Watching {prefix} from revision {create.start_revision or 'now'}")
+                async for response in call:
+                    if response.compact_revision:
+                        error = etcd3_exceptions.RevisionCompactedError(response.compact_revision)
+                        if on_compacted is None:
+                            logger.error(f"Watch on {prefix} lost events before compacted revision "
+                                         f"{response.compact_revision}, continuing from there")
+                            handle.revision = response.compact_revision - 1
+                            break
+                        logger.warning(f"Watch on {prefix} hit compacted revision {response.compact_revision}")
+                        on_compacted(error)
+                        return
+                    delay = self.retry_interval
+                    self._mark_up(index, read=True)
+                    for raw in response.events:
+                        if raw.type == etcdrpc.kv_pb2.Event.DELETE:
+                            event = WatchEvent('delete', raw.kv.key.decode('utf-8'), None, raw.kv.mod_revision)
+                        else:
+                            event = WatchEvent('put', raw.kv.key.decode('utf-8'), raw.kv.value.decode('utf-8'),
+                                               raw.kv.mod_revision)
+                        try:
+                            result = callback(event)
+                            if inspect.isawaitable(result):
+                                await result
+                        except Exception as e:
+                            logger.error(f"Watch callback for {prefix} failed on {event.key}: {e}")
+                        handle.revision = max(handle.revision, event.revision)
+            except asyncio.CancelledError:
+                call.cancel()
+                logger.info(f"Stopped watching {prefix}")
+                raise
+            except Exception as e:
+                if _is_unavailable(e):
+                    self._mark_down(index, e)
+                logger.warning(f"Watch on {prefix} disconnected at revision {handle.revision}: {e}")
+            finally:
+                call.cancel()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_interval)
+
+    async def close(self):
+        """关闭所有 gRPC 通道"""
+        stubs, self._stubs = list(self._stubs.values()), {}
+        for item in stubs:
+            await item.channel.close()
+        if stubs:
+            logger.info("Closed async etcd client channels")
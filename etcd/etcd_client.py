@@ -1,38 +1,219 @@
 # etcd/etcd_client.py
 
 import etcd3
+import grpc
+import itertools
 import logging
+import threading
+import time
+from etcd3 import etcdrpc, exceptions as etcd3_exceptions, utils as etcd3_utils
+from .etcd_config import EtcdConfig
+from .prefix_watcher import PrefixWatcher
 
 logger = logging.getLogger(__name__)
 
-class EtcdClient:
-    def __init__(self, host='localhost', port=2379):
+# etcd 服务端 --max-txn-ops 的默认值，单个事务内的操作数不能超过该值
+DEFAULT_MAX_TXN_OPS = 128
+# 分页读取前缀时每次 Range 请求返回的最大键数
+DEFAULT_PAGE_SIZE = 500
+# 进程共享客户端读取的 etcd 集群配置
+DEFAULT_CONFIG_FILE = 'config/etcd_config.yaml'
+# 视为 endpoint 不可用、需要切换到其他 endpoint 重试的 gRPC 状态
+_UNAVAILABLE_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+
+
+def _is_unavailable(error):
+    if isinstance(error, (etcd3_exceptions.ConnectionFailedError, etcd3_exceptions.ConnectionTimeoutError)):
+        return True
+    return isinstance(error, grpc.RpcError) and error.code() in _UNAVAILABLE_CODES
+
+
+def load_endpoints(config_file=DEFAULT_CONFIG_FILE):
+    """读取配置的 etcd endpoint 列表，失败时返回 None（即只使用 localhost:2379）"""
+    try:
+        return EtcdConfig(config_file).get_etcd_nodes()
+    except Exception as e:
+        logger.warning(f"Falling back to localhost:2379, failed to load {config_file}: {e}")
+        return None
+
+
+class EndpointFailover:
+    """在多个 etcd endpoint 间选择请求目标：读请求轮询分散，写请求固定在主 endpoint；
+    endpoint 不可用时按指数退避暂时跳过。EtcdClient 与 AsyncEtcdClient 共用。"""
+
+    def _init_endpoints(self, endpoints, host, port, retry_interval, max_retry_interval):
+        self.endpoints = list(endpoints) if endpoints else [f"{host}:{port}"]
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self._down_until = {}  # endpoint 下标 -> 退避结束时间
+        self._backoff = {}  # endpoint 下标 -> 当前退避时间
+        self._primary = 0  # 写请求优先使用的 endpoint 下标
+        self._read_counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _candidates(self, read):
+        """本次请求依次尝试的 endpoint 下标：读请求轮询分散到各 endpoint，写请求从当前主 endpoint 开始；
+        处于退避期的 endpoint 排在最后，所有 endpoint 都不可用时仍会逐个尝试。"""
+        count = len(self.endpoints)
+        start = next(self._read_counter) % count if read else self._primary
+        order = [(start + i) % count for i in range(count)]
+        now = time.monotonic()
+        return sorted(order, key=lambda index: self._down_until.get(index, 0) > now)
+
+    def _mark_down(self, index, error):
+        with self._lock:
+            backoff = min(self._backoff.get(index, self.retry_interval / 2) * 2, self.max_retry_interval)
+            self._backoff[index] = backoff
+            self._down_until[index] = time.monotonic() + backoff
+            if index == self._primary and len(self.endpoints) > 1:
+                self._primary = (index + 1) % len(self.endpoints)
+        logger.warning(f"etcd endpoint {self.endpoints[index]} unavailable, retrying it in {backoff:.1f}s: {error}")
+
+    def _mark_up(self, index, read):
+        if index in self._backoff:
+            with self._lock:
+                self._backoff.pop(index, None)
+                self._down_until.pop(index, None)
+            logger.info(f"etcd endpoint {self.endpoints[index]} is available again")
+        if not read:
+            self._primary = index
+
+
+class EtcdClient(EndpointFailover):
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, host='localhost', port=2379, max_txn_ops=DEFAULT_MAX_TXN_OPS, endpoints=None,
+                 retry_interval=0.5, max_retry_interval=30.0):
+        """
+        :param endpoints: etcd endpoint 列表（"host:port"）；未提供时只使用 host:port
+        :param retry_interval: endpoint 不可用后首次重新尝试前的退避时间（秒），连续失败时翻倍
+        :param max_retry_interval: 退避时间上限（秒）
+        """
         self.host = host
         self.port = port
-        self.client = None
+        self.max_txn_ops = max_txn_ops
+        self._init_endpoints(endpoints, host, port, retry_interval, max_retry_interval)
+        self._clients = {}  # endpoint -> etcd3 客户端，每个客户端持有一个复用的 gRPC 通道
         self.connect()
 
+    @classmethod
+    def shared(cls, config_file=DEFAULT_CONFIG_FILE):
+        """返回进程内共享的 EtcdClient，连接 config_file 中配置的全部 etcd endpoint。
+        各组件复用同一组 gRPC 通道，不再各自建立连接。"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(endpoints=load_endpoints(config_file))
+            return cls._shared
+
+    @property
+    def client(self):
+        """当前写请求使用的 etcd3 客户端"""
+        return self._client_for(self._primary)
+
     def connect(self):
-        """与 etcd 集群建立连接，带有重试机制"""
+        """为每个 endpoint 创建 etcd3 客户端；gRPC 通道在首次请求时建立并在之后复用"""
         try:
-            self.client = etcd3.client(host=self.host, port=self.port)
-            logger.info(f"Connected to etcd at {self.host}:{self.port}")
+            for index in range(len(self.endpoints)):
+                self._client_for(index)
+            logger.info(f"Connected to etcd endpoints {self.endpoints}")
         except Exception as e:
             logger.error(f"Failed to connect to etcd: {e}")
             raise
 
-    def put(self, key, value):
-        """将键值对写入 etcd"""
+    def _client_for(self, index):
+        endpoint = self.endpoints[index]
+        client = self._clients.get(endpoint)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(endpoint)
+                if client is None:
+                    host, _, port = endpoint.rpartition(':')
+                    client = etcd3.client(host=host, port=int(port))
+                    self._clients[endpoint] = client
+        return client
+
+    def _execute(self, operation, read=False):
+        """在可用的 endpoint 上执行 operation(client)，endpoint 不可用时切换到下一个
+        :param read: 读请求在各 endpoint 间轮询；写请求固定在主 endpoint，失败时切换主 endpoint
+        """
+        last_error = None
+        for index in self._candidates(read):
+            try:
+                result = operation(self._client_for(index))
+            except Exception as e:
+                if not _is_unavailable(e):
+                    raise
+                last_error = e
+                self._mark_down(index, e)
+                continue
+            self._mark_up(index, read)
+            return result
+        raise last_error
+
+    def put(self, key, value, lease=None):
+        """将键值对写入 etcd
+        :param lease: 租约或租约 ID，键随租约过期而删除
+        :return: 写入成功返回 True，否则返回 False
+        """
         try:
-            self.client.put(key, value)
+            self._execute(lambda client: client.put(key, value, lease))
             logger.info(f"Successfully put key {key} into etcd")
+            return True
         except Exception as e:
             logger.error(f"Failed to put key {key} into etcd: {e}")
+            return False
+
+    def put_many(self, items):
+        """在一个 etcd 事务中批量写入多个键值对
+        :param items: (key, value) 列表或字典
+        :return: 写入成功返回 True，否则返回 False
+        """
+        return self.apply_batch(items)
+
+    def delete_many(self, keys):
+        """在一个 etcd 事务中批量删除多个键
+        :return: 删除成功返回 True，否则返回 False
+        """
+        return self.apply_batch((), keys)
+
+    def apply_batch(self, puts, deletes=(), delete_prefixes=()):
+        """以尽量少的 etcd 事务批量写入和删除键
+        操作数不超过 max_txn_ops 时在一个事务中原子执行；超过时按 max_txn_ops 分块，
+        每块一个事务依次提交，块之间不保证原子性。
+        :param puts: (key, value) 列表或字典
+        :param deletes: 要删除的键列表
+        :param delete_prefixes: 要按前缀整体删除的前缀列表，每个前缀是一个范围删除操作
+        :return: 全部执行成功返回 True，否则返回 False（之前的块已提交）
+        """
+        if isinstance(puts, dict):
+            puts = puts.items()
+        ops = [self.client.transactions.put(key, value) for key, value in puts]
+        ops += [self.client.transactions.delete(key) for key in deletes]
+        ops += [self.client.transactions.delete(prefix, range_end=self._prefix_range_end(prefix))
+                for prefix in delete_prefixes]
+        if not ops:
+            return True
+        chunk_size = max(int(self.max_txn_ops), 1)
+        for start in range(0, len(ops), chunk_size):
+            chunk = ops[start:start + chunk_size]
+            try:
+                self._execute(lambda client: client.transaction(compare=[], success=chunk, failure=[]))
+            except Exception as e:
+                logger.error(f"Failed to apply {len(chunk)} of {len(ops)} operations to etcd: {e}")
+                return False
+        logger.info(f"Successfully applied {len(ops)} operations to etcd in "
+                    f"{(len(ops) + chunk_size - 1) // chunk_size} transaction(s)")
+        return True
+
+    @staticmethod
+    def _prefix_range_end(prefix):
+        return etcd3_utils.increment_last_byte(etcd3_utils.to_bytes(prefix))
 
     def get(self, key):
         """从 etcd 读取键的值"""
         try:
-            value, _ = self.client.get(key)
+            value, _ = self._execute(lambda client: client.get(key), read=True)
             logger.info(f"Retrieved value for key {key}")
             return value.decode('utf-8') if value else None
         except Exception as e:
@@ -40,71 +221,169 @@ class EtcdClient:
             return None
 
     def get_with_prefix(self, prefix):
-        """根据前缀从 etcd 读取所有键值对"""
+        """根据前缀从 etcd 读取所有值（分页读取，结果仍一次性返回；大量数据请使用 iter_prefix）"""
         try:
-            values = self.client.get_prefix(prefix)  # 获取前缀的值
-            result = []
-            for kv in values:
-                value = kv[0].decode('utf-8')  # 只取字节字符串部分
-                result.append(value)
-            
-            logger.info(f"Values returned: {result}")
+            result = [value for _, value in self.iter_prefix(prefix)]
+            logger.debug(f"Retrieved {len(result)} values with prefix {prefix}")
             return result
 
         except Exception as e:
             logger.error(f"Failed to get values with prefix {prefix}: {e}")
             return []
 
+    def iter_prefix(self, prefix, page_size=DEFAULT_PAGE_SIZE, keys_only=False):
+        """按键顺序分页遍历前缀下的键值对，内存占用与 page_size 成正比
+        第一页之后的请求固定在第一页的 revision 上，遍历结果是同一时刻的一致快照。
+        :param page_size: 每次 Range 请求返回的最大键数
+        :param keys_only: 只读取键，不传输值；此时产出的 value 为 None
+        :return: 生成器，产出 (key, value)；读取失败时抛出异常
+        """
+        for page in self._iter_pages(prefix, page_size, keys_only):
+            for kv in page.kvs:
+                yield kv.key.decode('utf-8'), None if keys_only else kv.value.decode('utf-8')
+
+    def count_prefix(self, prefix):
+        """只统计前缀下的键数量，不传输键和值
+        :return: 键数量；读取失败时返回 None
+        """
+        try:
+            return self._range(prefix, self._prefix_range_end(prefix), count_only=True).count
+        except Exception as e:
+            logger.error(f"Failed to count keys with prefix {prefix}: {e}")
+            return None
+
+    def exists(self, key):
+        """检查键是否存在，不传输值
+        :return: 存在返回 True；读取失败时返回 None
+        """
+        try:
+            return self._range(key, count_only=True).count > 0
+        except Exception as e:
+            logger.error(f"Failed to check key {key}: {e}")
+            return None
+
+    def get_prefix_with_revision(self, prefix, page_size=DEFAULT_PAGE_SIZE):
+        """分页读取前缀下所有键值对及该次读取对应的 etcd revision，供 list-watch 使用
+        :return: ([(key, value)], revision)；读取失败时抛出异常，由调用方决定是否重试
+        """
+        items = []
+        revision = 0
+        for page in self._iter_pages(prefix, page_size):
+            revision = revision or page.header.revision
+            items.extend((kv.key.decode('utf-8'), kv.value.decode('utf-8')) for kv in page.kvs)
+        logger.info(f"Listed {len(items)} keys with prefix {prefix} at revision {revision}")
+        return items, revision
+
+    def _iter_pages(self, prefix, page_size=DEFAULT_PAGE_SIZE, keys_only=False):
+        """逐页产出 Range 响应；下一页从上一页最后一个键之后开始，并固定在第一页的 revision."""
+        range_end = self._prefix_range_end(prefix)
+        start = etcd3_utils.to_bytes(prefix)
+        revision = 0
+        while True:
+            page = self._range(start, range_end, limit=page_size, revision=revision, keys_only=keys_only)
+            yield page
+            if not page.more or not page.kvs:
+                return
+            revision = revision or page.header.revision
+            start = page.kvs[-1].key + b'\0'
+
+    def _range(self, key, range_end=None, limit=0, revision=0, keys_only=False, count_only=False):
+        """直接发送 RangeRequest：etcd3 0.12 的 get_range_response 会忽略 limit、revision 与 count_only 参数."""
+        request = etcdrpc.RangeRequest(
+            key=etcd3_utils.to_bytes(key),
+            limit=limit,
+            revision=revision,
+            keys_only=keys_only,
+            count_only=count_only,
+            sort_order=etcdrpc.RangeRequest.ASCEND,
+            sort_target=etcdrpc.RangeRequest.KEY,
+        )
+        if range_end is not None:
+            request.range_end = etcd3_utils.to_bytes(range_end)
+        return self._execute(lambda client: client.kvstub.Range(request, client.timeout,
+                                                               credentials=client.call_credentials,
+                                                               metadata=client.metadata), read=True)
+
     def delete(self, key):
         """从 etcd 删除指定键"""
         try:
-            self.client.delete(key)
+            self._execute(lambda client: client.delete(key))
             logger.info(f"Deleted key {key} from etcd")
         except Exception as e:
             logger.error(f"Failed to delete key {key}: {e}")
 
-    def delete_with_prefix(self, prefix):
-        """根据前缀删除 etcd 中的所有键"""
+    def delete_prefix(self, prefix):
+        """以一次范围删除 RPC 删除前缀下的所有键，无需先读取
+        :return: 删除成功返回 True，否则返回 False
+        """
         try:
-            # 获取所有匹配前缀的键值对
-            values = self.client.get_prefix(prefix)
-            keys_to_delete = [kv[0].decode('utf-8') for kv in values]  # 获取所有的键
-
-            # 删除所有匹配的键
-            for key in keys_to_delete:
-                self.client.delete(key)
-                logger.info(f"Deleted key {key} from etcd")
-
+            response = self._execute(lambda client: client.delete_prefix(prefix))
+            logger.info(f"Deleted {response.deleted} keys with prefix {prefix} from etcd")
+            return True
         except Exception as e:
             logger.error(f"Failed to delete keys with prefix {prefix}: {e}")
+            return False
+
+    def delete_with_prefix(self, prefix):
+        """根据前缀删除 etcd 中的所有键，等同于 delete_prefix"""
+        return self.delete_prefix(prefix)
+
+    def watch_prefix(self, prefix, callback, start_revision=None, on_compacted=None, max_queue=1000):
+        """在后台监听前缀下的变化，立即返回可随时调用的取消句柄
+        事件由独立线程按 revision 顺序分发，连接断开后从最后收到的 revision 之后继续监听。
+        :param callback: 每个事件回调一次，参数为 WatchEvent(type, key, value, revision)
+        :param start_revision: 从该 revision 开始接收事件，None 表示从当前开始
+        :param on_compacted: 所需 revision 已被压缩时的回调，见 PrefixWatcher
+        :param max_queue: 待分发事件队列的容量，满时对 watch 流施加背压
+        :return: PrefixWatcher，调用其 cancel()（或直接调用句柄）取消监听
+        """
+        return PrefixWatcher(self._watch_client, prefix, callback, start_revision=start_revision,
+                             on_compacted=on_compacted, max_queue=max_queue).start()
 
     def watch(self, key, callback):
-        """监控指定键的变化，并执行回调"""
-        try:
-            events_iterator, cancel = self.client.watch(key)
-            logger.info(f"Watching key {key} for changes")
-            for event in events_iterator:
-                if event.event_type == 'put':
-                    callback(event.key, event.value)
-                elif event.event_type == 'delete':
-                    callback(event.key, None)
-            return cancel
-        except Exception as e:
-            logger.error(f"Failed to watch key {key}: {e}")
-            return None
+        """在后台监控指定键的变化，并执行回调 callback(key, value)，删除时 value 为 None
+        :return: 取消句柄，调用即可停止监控
+        """
+        return PrefixWatcher(self._watch_client, key, lambda event: callback(event.key, event.value), prefix=False).start()
+
+    def _watch_client(self):
+        """为（重新）建立 watch 选择 endpoint：优先不在退避期的 endpoint，并在各 endpoint 间轮询"""
+        return self._client_for(self._candidates(read=True)[0])
 
     def lease(self, ttl):
         """为键值对设置一个TTL（生存时间），过期自动删除"""
         try:
-            lease = self.client.lease(ttl)
+            lease = self._execute(lambda client: client.lease(ttl))
             logger.info(f"Lease created with TTL: {ttl}")
             return lease
         except Exception as e:
             logger.error(f"Failed to create lease: {e}")
             return None
 
+    def refresh_lease(self, lease_id):
+        """发送一次续约请求（单个 keep-alive，不重写任何键）
+        :return: 续约后的剩余 TTL；租约已过期时为 0，失败时返回 None
+        """
+        try:
+            responses = self._execute(lambda client: list(client.refresh_lease(lease_id)))
+            return responses[0].TTL if responses else 0
+        except Exception as e:
+            logger.error(f"Failed to refresh lease {lease_id}: {e}")
+            return None
+
+    def revoke_lease(self, lease_id):
+        """撤销租约，绑定该租约的键随之删除"""
+        try:
+            self._execute(lambda client: client.revoke_lease(lease_id))
+            logger.info(f"Revoked lease {lease_id}")
+        except Exception as e:
+            logger.error(f"Failed to revoke lease {lease_id}: {e}")
+
     def close(self):
         """关闭 etcd 连接"""
-        if self.client:
-            self.client.close()
-            logger.info("Closed etcd client connection")
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            client.close()
+        if clients:
+            logger.info("Closed etcd client connections")
@@ -25,9 +25,13 @@ class EtcdConfig:
             raise
     
     def get_etcd_nodes(self):
-        """获取 etcd 集群节点列表"""
+        """获取 etcd 集群的客户端 endpoint 列表（host:port，客户端端口而非 peer 端口）"""
         return self.config_data.get('etcd', {}).get('nodes', ['localhost:2379'])
     
     def get_lease_ttl(self):
         """获取租约 TTL 时间"""
         return self.config_data.get('etcd', {}).get('lease_ttl', 60)
+
+    def get_heartbeat_ttl(self):
+        """获取节点心跳租约 TTL 时间"""
+        return self.config_data.get('etcd', {}).get('heartbeat_ttl', 10)
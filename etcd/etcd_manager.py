@@ -7,7 +7,7 @@ logger = logging.getLogger(__name__)
 
 class EtcdManager:
     def __init__(self):
-        self.client = EtcdClient()
+        self.client = EtcdClient.shared()
     
     def save_data(self, key, value):
         """保存数据到 etcd"""
@@ -0,0 +1,190 @@
+# etcd/informer.py
+
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Informer:
+    def __init__(self, etcd_client, prefix, indexers=None, decoder=json.loads, retry_interval=1.0):
+        """
+        list-watch 本地缓存：先带 revision 读取前缀下的全部键，再从该 revision 之后监听前缀变化，
+        在内存中维护键到对象的映射与二级索引。列表查询直接读内存，不再全量扫描 etcd。
+        :param etcd_client: EtcdClient 实例
+        :param prefix: 监听的键前缀，例如 "nodes/"
+        :param indexers: 索引名称 -> 函数 (key, obj) -> 索引值列表，例如按命名空间索引 Pod
+        :param decoder: 将 etcd 中的字符串值解码为对象
+        :param retry_interval: revision 被压缩后重新 list 失败时的重试间隔（秒）
+        """
+        self.etcd_client = etcd_client
+        self.prefix = prefix
+        self.indexers = indexers or {}
+        self.decoder = decoder
+        self.retry_interval = retry_interval
+        self.resource_version = 0  # 本地缓存已反映到的 etcd revision
+        self._items = {}
+        self._indices = {name: {} for name in self.indexers}  # 索引名称 -> 索引值 -> 键集合
+        self._index_values = {name: {} for name in self.indexers}  # 索引名称 -> 键 -> 索引值
+        self._lock = threading.RLock()
+        self._watcher = None
+        self._stopped = True
+        self._synced = threading.Event()
+
+    def start(self):
+        """初始 list 并开始 watch；list 失败时抛出异常."""
+        self._stopped = False
+        self._relist()
+        self._watch()
+
+    def stop(self):
+        """停止 watch，保留已缓存的数据."""
+        with self._lock:
+            self._stopped = True
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.cancel()
+
+    def has_synced(self):
+        """初始 list 是否已完成."""
+        return self._synced.is_set()
+
+    def get(self, key):
+        with self._lock:
+            return self._items.get(key)
+
+    def list(self, index=None, value=None):
+        """
+        返回缓存中的对象及当前 resourceVersion。
+        :param index: 索引名称；为 None 时返回全部对象
+        :param value: 索引值
+        :return: (对象列表, resource_version)
+        """
+        with self._lock:
+            if index is None:
+                return list(self._items.values()), self.resource_version
+            keys = self._indices[index].get(value, ())
+            return [self._items[key] for key in keys], self.resource_version
+
+    def index_values(self, index):
+        """返回某个索引当前所有的索引值."""
+        with self._lock:
+            return list(self._indices[index])
+
+    def _relist(self):
+        items, revision = self.etcd_client.get_prefix_with_revision(self.prefix)
+        with self._lock:
+            self._items = {}
+            self._indices = {name: {} for name in self.indexers}
+            self._index_values = {name: {} for name in self.indexers}
+            for key, value in items:
+                self._store(key, value)
+            self.resource_version = revision
+        self._synced.set()
+        logger.info(f"Informer for {self.prefix} listed {len(items)} keys at revision {revision}")
+
+    def _watch(self):
+        """从 resource_version + 1 开始 watch；断线重连由 EtcdClient.watch_prefix 从最后收到的 revision 继续."""
+        with self._lock:
+            if self._stopped:
+                return
+            start_revision = self.resource_version + 1
+        watcher = self.etcd_client.watch_prefix(self.prefix, self._on_event, start_revision=start_revision,
+                                                on_compacted=self._on_compacted)
+        with self._lock:
+            if not self._stopped:
+                self._watcher = watcher
+                return
+        watcher.cancel()
+
+    def _on_event(self, event):
+        with self._lock:
+            if self._stopped:
+                return
+            if event.type == 'delete':
+                self._remove(event.key)
+            else:
+                self._store(event.key, event.value)
+            self.resource_version = max(self.resource_version, event.revision)
+
+    def _on_compacted(self, error):
+        """所需 revision 已被压缩，无法补齐缺失事件：重新 list 后再 watch."""
+        logger.warning(f"Informer for {self.prefix} must relist: revision {error.compacted_revision} compacted")
+        with self._lock:
+            self._watcher = None
+        threading.Thread(target=self._resync, daemon=True).start()
+
+    def _resync(self):
+        while not self._stopped:
+            try:
+                self._relist()
+                self._watch()
+                return
+            except Exception as e:
+                logger.error(f"Failed to relist {self.prefix}: {e}")
+            time.sleep(self.retry_interval)
+
+    def _store(self, key, value):
+        try:
+            obj = self.decoder(value)
+        except ValueError:
+            logger.warning(f"Informer for {self.prefix} could not decode value of {key}")
+            obj = value
+        self._remove(key)
+        self._items[key] = obj
+        for name, indexer in self.indexers.items():
+            values = tuple(indexer(key, obj))
+            self._index_values[name][key] = values
+            for index_value in values:
+                self._indices[name].setdefault(index_value, set()).add(key)
+
+    def _remove(self, key):
+        if key not in self._items:
+            return
+        del self._items[key]
+        for name in self.indexers:
+            for index_value in self._index_values[name].pop(key, ()):
+                keys = self._indices[name].get(index_value)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._indices[name][index_value]
+
+
+class PendingWrites:
+    def __init__(self):
+        """
+        记录本进程修改过、但 Informer 尚未观察到其最新状态的对象。
+        列表查询只需用内存状态覆盖这些对象，其余对象直接使用 Informer 缓存。
+        每次标记都会递增代数，确认已观察到时只移除代数未变的记录，避免误删期间的新修改。
+        """
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._generation = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._generations)
+
+    def mark(self, key):
+        with self._lock:
+            self._generation += 1
+            self._generations[key] = self._generation
+
+    def snapshot(self):
+        """:return: [(键, 代数)]"""
+        with self._lock:
+            return list(self._generations.items())
+
+    def observed(self, key, generation):
+        """Informer 已反映该键在 generation 时的状态，停止覆盖."""
+        with self._lock:
+            if self._generations.get(key) == generation:
+                del self._generations[key]
+
+
+def same_record(record, cached):
+    """比较内存中的对象与 Informer 缓存中解码后的 JSON 对象（经过一次 JSON 编解码后比较）."""
+    return cached is not None and json.loads(json.dumps(record)) == cached
@@ -0,0 +1,167 @@
+# etcd/prefix_watcher.py
+
+import logging
+import queue
+import threading
+from collections import namedtuple
+from etcd3 import events, exceptions
+
+logger = logging.getLogger(__name__)
+
+# type 为 'put' 或 'delete'；删除事件的 value 为 None；revision 为该事件的 mod_revision
+WatchEvent = namedtuple('WatchEvent', ['type', 'key', 'value', 'revision'])
+
+_DISCONNECTED = object()
+
+
+class PrefixWatcher:
+    def __init__(self, client_provider, key, callback, prefix=True, start_revision=None, on_compacted=None,
+                 max_queue=1000, retry_interval=0.5, max_retry_interval=30.0):
+        """
+        在后台监听键或前缀的变化：etcd3 的 watch 线程只负责把事件放入有界队列，
+        由独立的分发线程调用 callback，避免慢回调阻塞其他 watch；队列满时对 etcd 读取施加背压。
+        连接断开后按退避间隔从最后收到的 revision 之后重新 watch，不丢失也不重复事件。
+        :param client_provider: 返回 etcd3 客户端的函数，每次（重新）注册 watch 时调用，以便切换到可用的 endpoint
+        :param key: 监听的键或前缀
+        :param callback: 每个事件回调一次，参数为 WatchEvent
+        :param prefix: 是否按前缀监听
+        :param start_revision: 从该 revision 开始接收事件，None 表示从当前开始
+        :param on_compacted: 所需 revision 已被压缩时的回调，参数为 RevisionCompactedError，之后本 watch 结束；
+                             未提供时记录错误并从压缩点继续监听
+        :param max_queue: 待分发事件队列的容量
+        """
+        self.client_provider = client_provider
+        self._client = None  # 当前注册所在的 etcd3 客户端
+        self.key = key
+        self.callback = callback
+        self.prefix = prefix
+        self.on_compacted = on_compacted
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.revision = (start_revision - 1) if start_revision else 0  # 最后分发的事件 revision
+        self._received_revision = self.revision  # 最后放入队列的事件 revision，重连时从其后继续
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._watch_id = None
+        self._token = 0  # 每次注册递增，丢弃已取消注册的迟到响应
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._dispatch_loop, name=f"etcd-watch-{key}", daemon=True)
+
+    def start(self):
+        """注册 watch 并启动分发线程；注册失败时由分发线程按退避重试."""
+        try:
+            self._register(self.revision + 1 if self.revision else None)
+        except Exception as e:
+            logger.error(f"Failed to watch {self.key}, will retry: {e}")
+            self._enqueue(_DISCONNECTED)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """取消 watch，可在任意线程（包括回调内部）调用，立即返回."""
+        if self._cancelled.is_set():
+            return
+        self._cancelled.set()
+        with self._lock:
+            self._token += 1
+            watch_id, self._watch_id = self._watch_id, None
+        if watch_id is not None:
+            try:
+                self._client.cancel_watch(watch_id)
+            except Exception as e:
+                logger.error(f"Failed to cancel watch on {self.key}: {e}")
+        logger.info(f"Stopped watching {self.key}")
+
+    __call__ = cancel
+
+    def is_alive(self):
+        return not self._cancelled.is_set()
+
+    def _register(self, start_revision):
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._token += 1
+            token = self._token
+        kwargs = {}
+        if start_revision:
+            kwargs['start_revision'] = start_revision
+        client = self.client_provider()
+        register = client.add_watch_prefix_callback if self.prefix else client.add_watch_callback
+        watch_id = register(self.key, lambda response: self._on_response(token, response), **kwargs)
+        with self._lock:
+            if token == self._token:
+                self._client = client
+                self._watch_id = watch_id
+                logger.info(f"Watching {self.key} from revision {start_revision}")
+                return
+        client.cancel_watch(watch_id)
+
+    def _on_response(self, token, response):
+        """运行在 etcd3 的 watch 线程中：转换事件并放入队列."""
+        if token != self._token or self._cancelled.is_set():
+            return
+        if isinstance(response, Exception):
+            self._enqueue(response if isinstance(response, exceptions.RevisionCompactedError) else _DISCONNECTED)
+            if not isinstance(response, exceptions.RevisionCompactedError):
+                logger.warning(f"Watch on {self.key} disconnected at revision {self._received_revision}: {response!r}")
+            return
+        for event in response.events:
+            if isinstance(event, events.DeleteEvent):
+                item = WatchEvent('delete', event.key.decode('utf-8'), None, event.mod_revision)
+            else:
+                item = WatchEvent('put', event.key.decode('utf-8'), event.value.decode('utf-8'), event.mod_revision)
+            self._received_revision = max(self._received_revision, item.revision)
+            self._enqueue(item)
+
+    def _enqueue(self, item):
+        # 队列满时阻塞以施加背压，但取消后立即放弃
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _dispatch_loop(self):
+        while not self._cancelled.is_set():
+            try:
+                item = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if self._cancelled.is_set():
+                break
+            if item is _DISCONNECTED:
+                self._reconnect()
+            elif isinstance(item, exceptions.RevisionCompactedError):
+                self._handle_compacted(item)
+            else:
+                try:
+                    self.callback(item)
+                except Exception as e:
+                    logger.error(f"Watch callback for {self.key} failed on {item.key}: {e}")
+                self.revision = max(self.revision, item.revision)
+
+    def _reconnect(self):
+        delay = self.retry_interval
+        while not self._cancelled.wait(delay):
+            try:
+                self._register(self._received_revision + 1 if self._received_revision else None)
+                return
+            except exceptions.RevisionCompactedError as e:
+                self._handle_compacted(e)
+                return
+            except Exception as e:
+                logger.error(f"Failed to re-watch {self.key} from revision {self._received_revision + 1}: {e}")
+                delay = min(delay * 2, self.max_retry_interval)
+
+    def _handle_compacted(self, error):
+        if self.on_compacted is not None:
+            logger.warning(f"Watch on {self.key} hit compacted revision {error.compacted_revision}")
+            self.cancel()
+            self.on_compacted(error)
+            return
+        logger.error(f"Watch on {self.key} lost events before compacted revision {error.compacted_revision}, "
+                     f"continuing from there")
+        self._received_revision = max(self._received_revision, error.compacted_revision - 1)
+        self._reconnect()
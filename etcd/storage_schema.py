@@ -0,0 +1,114 @@
+# etcd/storage_schema.py
+
+import json
+import logging
+from utils.quantity import ResourceVector
+
+logger = logging.getLogger(__name__)
+
+# etcd 存储布局（版本 2）：
+#   nodes/{node}                      节点容量与已分配资源，固定大小，不再内嵌 Pod 列表
+#   bindings/{node}/{namespace}/{pod} Pod 与节点的绑定关系及其资源请求向量
+#   pods/{namespace}/{pod}            Pod 定义，状态字段 status 即 Pod 状态
+#   /pods/{namespace}/{pod}/containers/{container}/status  容器状态
+#   heartbeats/{node}                 节点心跳，绑定节点代理持有的租约，租约过期即被删除
+#   images/{node}                     节点本地缓存的镜像及其大小，由节点代理在镜像集合变化时写入
+#   schema/version                    当前存储布局版本
+# 版本 1 的节点记录内嵌 "pods" 列表，并额外写入 /pods/{namespace}/{pod}/status 键。
+SCHEMA_VERSION = 2
+SCHEMA_VERSION_KEY = "schema/version"
+NODE_PREFIX = "nodes/"
+BINDING_PREFIX = "bindings/"
+POD_PREFIX = "pods/"
+HEARTBEAT_PREFIX = "heartbeats/"
+IMAGE_PREFIX = "images/"
+
+
+def node_key(node_name):
+    return f"{NODE_PREFIX}{node_name}"
+
+
+def heartbeat_key(node_name):
+    return f"{HEARTBEAT_PREFIX}{node_name}"
+
+
+def image_state_key(node_name):
+    return f"{IMAGE_PREFIX}{node_name}"
+
+
+def binding_prefix(node_name=None):
+    """返回绑定键前缀；指定节点时只匹配该节点上的绑定."""
+    if node_name is None:
+        return BINDING_PREFIX
+    return f"{BINDING_PREFIX}{node_name}/"
+
+
+def binding_key(node_name, namespace, pod_name):
+    return f"{BINDING_PREFIX}{node_name}/{namespace}/{pod_name}"
+
+
+def pod_key(namespace, pod_name):
+    return f"{POD_PREFIX}{namespace}/{pod_name}"
+
+
+def legacy_pod_status_key(namespace, pod_name):
+    """版本 1 中与 Pod 记录重复的状态键，迁移时删除."""
+    return f"/pods/{namespace}/{pod_name}/status"
+
+
+def container_status_key(namespace, pod_name, container_name):
+    return f"/pods/{namespace}/{pod_name}/containers/{container_name}/status"
+
+
+def pod_status_prefix(namespace, pod_name):
+    """Pod 的容器状态等附属键的前缀，以 / 结尾，避免匹配到同名前缀的其他 Pod."""
+    return f"/pods/{namespace}/{pod_name}/"
+
+
+def binding_record(node_name, namespace, pod_name, request_vector):
+    """构造绑定记录，大小与节点上的 Pod 数量无关."""
+    return {
+        "node": node_name,
+        "namespace": namespace,
+        "pod": pod_name,
+        "requests": dict(request_vector._asdict()),
+    }
+
+
+def migrate(etcd_client):
+    """将版本 1 的存储布局迁移到当前版本.
+    每个内嵌 Pod 列表的节点记录在一个事务中改写为固定大小记录，并为其中的 Pod 写入绑定键；
+    随后删除冗余的 Pod 状态键并写入版本号。迁移可重复执行。
+    :return: 迁移的节点数量
+    """
+    version = etcd_client.get(SCHEMA_VERSION_KEY)
+    if version is not None and int(version) >= SCHEMA_VERSION:
+        logger.info(f"etcd schema is already at version {version}")
+        return 0
+
+    migrated = 0
+    for value in etcd_client.get_with_prefix(NODE_PREFIX):
+        record = json.loads(value)
+        pods = record.pop("pods", None)
+        if pods is None:
+            continue
+        record["pod_count"] = len(pods)
+        puts = [(node_key(record["name"]), json.dumps(record))]
+        for pod in pods:
+            requests = (pod.get("resources") or {}).get("requests", {})
+            namespace = pod.get("namespace", "default")
+            vector = ResourceVector.from_requests(requests)
+            puts.append((binding_key(record["name"], namespace, pod["name"]),
+                         json.dumps(binding_record(record["name"], namespace, pod["name"], vector))))
+        if not etcd_client.apply_batch(puts):
+            raise Exception(f"Failed to migrate node '{record['name']}' to etcd schema v{SCHEMA_VERSION}.")
+        migrated += 1
+
+    legacy_keys = []
+    for value in etcd_client.get_with_prefix(POD_PREFIX):
+        pod = json.loads(value)
+        legacy_keys.append(legacy_pod_status_key(pod.get("namespace", "default"), pod["name"]))
+    if not etcd_client.apply_batch([(SCHEMA_VERSION_KEY, str(SCHEMA_VERSION))], legacy_keys):
+        raise Exception(f"Failed to finish etcd schema v{SCHEMA_VERSION} migration.")
+    logger.info(f"Migrated {migrated} node records to etcd schema v{SCHEMA_VERSION}")
+    return migrated
@@ -0,0 +1,99 @@
+import logging
+import shutil
+import threading
+import time
+
+# 磁盘使用率高于高水位时开始回收，回收到低水位为止（百分比）
+DEFAULT_HIGH_THRESHOLD = 85
+DEFAULT_LOW_THRESHOLD = 80
+# 检查间隔（秒）
+DEFAULT_GC_INTERVAL = 60
+# 最近使用时间在该时长（秒）内的镜像不回收，避免删除刚拉取、尚未创建容器的镜像
+DEFAULT_MIN_AGE = 120
+# containerd 镜像内容与快照所在目录
+DEFAULT_IMAGE_FS = '/var/lib/containerd'
+
+
+class ImageGarbageCollector:
+    def __init__(self, image_handler, images_in_use, path=DEFAULT_IMAGE_FS, high_threshold=DEFAULT_HIGH_THRESHOLD,
+                 low_threshold=DEFAULT_LOW_THRESHOLD, interval=DEFAULT_GC_INTERVAL, min_age=DEFAULT_MIN_AGE,
+                 disk_usage=shutil.disk_usage):
+        """
+        节点代理侧的镜像回收：镜像所在文件系统的使用率超过高水位时，按最近使用时间从旧到新删除
+        未被本节点任何 Pod 引用的镜像，直到预计使用率降到低水位。最近使用时间由 ImageHandler 的镜像索引
+        在每次 Pod 启动（ensure_image）时更新。
+        :param images_in_use: 返回当前被 Pod 引用的镜像名称集合的函数
+        :param path: 镜像所在文件系统上的路径，用于计算磁盘使用率
+        :param high_threshold: 触发回收的磁盘使用率（百分比）
+        :param low_threshold: 回收的目标磁盘使用率（百分比）
+        :param interval: 后台检查间隔（秒）
+        :param min_age: 最近使用时间在该时长（秒）内的镜像不回收
+        :param disk_usage: 返回 (total, used, free) 的函数，默认为 shutil.disk_usage
+        """
+        if not 0 <= low_threshold < high_threshold <= 100:
+            raise ValueError(f"Invalid image GC thresholds: low {low_threshold}%, high {high_threshold}%.")
+        self.image_handler = image_handler
+        self.images_in_use = images_in_use
+        self.path = path
+        self.high_threshold = high_threshold
+        self.low_threshold = low_threshold
+        self.interval = interval
+        self.min_age = min_age
+        self.disk_usage = disk_usage
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._loop, name="image-gc", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+
+    def _loop(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.collect()
+            except Exception as e:
+                logging.error(f"Image garbage collection failed: {e}")
+
+    def collect(self, now=None):
+        """
+        检查一次磁盘使用率，超过高水位时回收镜像.
+        :return: 被删除的镜像名称列表
+        """
+        total, used, _ = self.disk_usage(self.path)
+        usage = used * 100 / total if total else 0
+        if usage < self.high_threshold:
+            return []
+        to_free = used - total * self.low_threshold / 100
+        logging.info(f"Image filesystem usage {usage:.1f}% exceeds {self.high_threshold}%, "
+                     f"freeing {to_free / 1024 ** 2:.0f} MiB.")
+        # 先以 ctr images list 校正索引，获取各镜像的实际大小
+        self.image_handler.list_images()
+        now = time.time() if now is None else now
+        in_use = set(self.images_in_use())
+        candidates = sorted((record for record in self.image_handler.cache.records()
+                             if not record.refs & in_use and now - record.last_used >= self.min_age),
+                            key=lambda record: record.last_used)
+        removed = []
+        freed = 0
+        for record in candidates:
+            if freed >= to_free:
+                break
+            refs = [ref for ref in sorted(record.refs) if self.image_handler.remove_image(ref)]
+            removed.extend(refs)
+            # digest 的所有引用都删除后才释放空间
+            if len(refs) == len(record.refs):
+                freed += record.size
+        if freed < to_free:
+            logging.warning(f"Image GC freed {freed / 1024 ** 2:.0f} MiB, short of the "
+                            f"{to_free / 1024 ** 2:.0f} MiB needed to reach {self.low_threshold}%.")
+        else:
+            logging.info(f"Image GC removed {len(removed)} images, freeing {freed / 1024 ** 2:.0f} MiB.")
+        return removed
@@ -0,0 +1,131 @@
+import json
+import logging
+import queue
+import threading
+import time
+from etcd import storage_schema
+
+# 默认同时进行的预拉取数
+DEFAULT_PREPULL_WORKERS = 2
+
+
+class ImagePrePuller:
+    def __init__(self, image_handler, etcd_client, node_name, workers=DEFAULT_PREPULL_WORKERS, retry_interval=1.0):
+        """
+        节点代理侧的镜像预拉取（可选启用）：watch bindings/{node}/ 前缀，Pod 一旦被调度到本节点，
+        就在后台拉取其容器镜像，start_pod 时镜像通常已在本地。
+        预拉取与 start_pod 共用 ImageHandler，同一镜像的并发拉取只执行一次。
+        :param workers: 同时进行的预拉取数
+        :param retry_interval: revision 被压缩后重新读取失败时的重试间隔（秒）
+        """
+        self.image_handler = image_handler
+        self.etcd_client = etcd_client
+        self.node_name = node_name
+        self.workers = max(int(workers), 1)
+        self.retry_interval = retry_interval
+        self._queue = queue.Queue()
+        self._pending = set()  # 已排队、尚未开始拉取的镜像
+        self._lock = threading.Lock()
+        self._threads = []
+        self._watcher = None
+        self._stopped = True
+
+    def start(self):
+        """启动拉取线程，读取本节点已有的绑定并从该 revision 之后开始 watch；读取失败时抛出异常."""
+        self._stopped = False
+        self._threads = [threading.Thread(target=self._worker, name=f"image-prepull-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        self._watch(self._relist())
+        return self
+
+    def stop(self):
+        self._stopped = True
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.cancel()
+        for _ in self._threads:
+            self._queue.put(None)
+        self._threads = []
+
+    def enqueue(self, images):
+        """把本地尚不存在的镜像加入预拉取队列，已排队的镜像不重复加入.
+        :return: 新加入队列的镜像数量
+        """
+        added = 0
+        for image in images:
+            if not image or image in self.image_handler.cache:
+                continue
+            with self._lock:
+                if image in self._pending:
+                    continue
+                self._pending.add(image)
+            self._queue.put(image)
+            added += 1
+        return added
+
+    def pending(self):
+        with self._lock:
+            return set(self._pending)
+
+    def _worker(self):
+        while True:
+            image = self._queue.get()
+            if image is None:
+                return
+            with self._lock:
+                self._pending.discard(image)
+            if self._stopped or image in self.image_handler.cache:
+                continue
+            logging.info(f"Pre-pulling image '{image}' on node '{self.node_name}'.")
+            if not self.image_handler.pull_image(image):
+                logging.warning(f"Failed to pre-pull image '{image}'; it will be pulled when the pod starts.")
+
+    def _pod_images(self, binding):
+        """读取绑定对应的 Pod 记录，返回其容器镜像列表."""
+        value = self.etcd_client.get(storage_schema.pod_key(binding['namespace'], binding['pod']))
+        if value is None:
+            logging.warning(f"Pod '{binding['namespace']}/{binding['pod']}' bound to node '{self.node_name}' "
+                            f"not found, skipping image pre-pull.")
+            return []
+        return [container.get('image') for container in json.loads(value).get('containers', [])]
+
+    def _on_binding(self, value):
+        try:
+            self.enqueue(self._pod_images(json.loads(value)))
+        except Exception as e:
+            logging.error(f"Failed to resolve images for binding {value}: {e}")
+
+    def _relist(self):
+        items, revision = self.etcd_client.get_prefix_with_revision(storage_schema.binding_prefix(self.node_name))
+        for _, value in items:
+            self._on_binding(value)
+        logging.info(f"Image pre-puller listed {len(items)} bindings on node '{self.node_name}' "
+                     f"at revision {revision}.")
+        return revision
+
+    def _watch(self, revision):
+        if self._stopped:
+            return
+        self._watcher = self.etcd_client.watch_prefix(storage_schema.binding_prefix(self.node_name), self._on_event,
+                                                      start_revision=revision + 1,
+                                                      on_compacted=self._on_compacted)
+
+    def _on_event(self, event):
+        if event.type == 'put':
+            self._on_binding(event.value)
+
+    def _on_compacted(self, error):
+        logging.warning(f"Image pre-puller must relist: revision {error.compacted_revision} compacted.")
+        self._watcher = None
+        threading.Thread(target=self._resync, daemon=True).start()
+
+    def _resync(self):
+        while not self._stopped:
+            try:
+                self._watch(self._relist())
+                return
+            except Exception as e:
+                logging.error(f"Failed to relist bindings of node '{self.node_name}': {e}")
+            time.sleep(self.retry_interval)
@@ -0,0 +1,61 @@
+import json
+import logging
+import threading
+from etcd import storage_schema
+
+# 检查本地镜像集合是否变化的间隔（秒）
+DEFAULT_REPORT_INTERVAL = 5.0
+
+
+class ImageStateReporter:
+    def __init__(self, image_cache, etcd_client, node_name, interval=DEFAULT_REPORT_INTERVAL, refresh=None):
+        """
+        节点代理侧的镜像状态上报：把本地镜像索引中的镜像及其大小写入 images/{node}，
+        只在镜像集合变化（拉取、删除、list 校正）后重新写入，供 master 的镜像局部性打分使用。
+        :param image_cache: ImageHandler 的 ImageCacheIndex
+        :param interval: 检查镜像集合是否变化的间隔（秒）
+        :param refresh: 校正索引的函数（通常为 ImageHandler.list_images）；拉取只能得到 digest，
+                        索引中有大小未知的镜像时先调用它，再上报
+        """
+        self.image_cache = image_cache
+        self.refresh = refresh
+        self.etcd_client = etcd_client
+        self.node_name = node_name
+        self.interval = interval
+        self._reported_version = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self.report()
+        self._thread = threading.Thread(target=self._loop, name=f"image-report-{self.node_name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+
+    def report(self):
+        """镜像集合自上次上报后有变化时写入 etcd；返回是否写入."""
+        version = self.image_cache.version
+        if version == self._reported_version:
+            return False
+        if self.refresh is not None and 0 in self.image_cache.image_sizes().values():
+            self.refresh()
+            version = self.image_cache.version
+        record = {"node": self.node_name, "images": self.image_cache.image_sizes()}
+        # put_many 失败时返回 False，下个周期重试
+        if not self.etcd_client.put_many([(storage_schema.image_state_key(self.node_name), json.dumps(record))]):
+            logging.error(f"Failed to report images of node '{self.node_name}', will retry.")
+            return False
+        self._reported_version = version
+        logging.info(f"Reported {len(record['images'])} cached images of node '{self.node_name}'.")
+        return True
+
+    def _loop(self):
+        while not self._stopped.wait(self.interval):
+            self.report()
@@ -0,0 +1,96 @@
+import math
+
+# 参与负载均衡统计的资源及其在 Node 上对应的属性
+BALANCE_RESOURCES = (
+    ('cpu', 'allocated_cpu', 'total_cpu'),
+    ('memory', 'allocated_memory', 'total_memory'),
+    ('gpu', 'allocated_gpu', 'total_gpu'),
+)
+
+
+class LoadBalanceStats:
+    def __init__(self, resync_interval=10000):
+        """
+        增量维护所有节点 CPU/内存/GPU 使用率的累加和与平方和，
+        使负载均衡因子（1 / (1 + 标准差)）的计算为 O(1)。
+        :param resync_interval: 每累计多少次增量更新后按缓存的使用率重新求和，抑制浮点误差累积
+        """
+        self.resync_interval = resync_interval
+        self.count = 0
+        self._sum = [0.0] * len(BALANCE_RESOURCES)
+        self._sum_sq = [0.0] * len(BALANCE_RESOURCES)
+        self._ratios = {}  # 节点名称 -> 该节点当前计入统计的使用率
+        self._updates = 0
+
+    @staticmethod
+    def _node_ratios(node):
+        """计算节点的各项使用率，总量为 0 时记为 0。"""
+        ratios = []
+        for _, allocated_attr, total_attr in BALANCE_RESOURCES:
+            total = getattr(node, total_attr)
+            ratios.append(getattr(node, allocated_attr) / total if total > 0 else 0)
+        return tuple(ratios)
+
+    def add_node(self, node):
+        """将新节点计入统计。"""
+        if node.name in self._ratios:
+            self.update_node(node)
+            return
+        ratios = self._node_ratios(node)
+        self._ratios[node.name] = ratios
+        self.count += 1
+        self._apply(ratios, 1)
+
+    def remove_node(self, name):
+        """将节点移出统计。"""
+        ratios = self._ratios.pop(name, None)
+        if ratios is None:
+            return
+        self.count -= 1
+        self._apply(ratios, -1)
+        if self.count == 0:
+            self._sum = [0.0] * len(BALANCE_RESOURCES)
+            self._sum_sq = [0.0] * len(BALANCE_RESOURCES)
+
+    def update_node(self, node):
+        """节点资源变化时替换其贡献值，O(1)。由 Node 在资源或状态变化时回调。"""
+        old = self._ratios.get(node.name)
+        if old is None:
+            return
+        new = self._node_ratios(node)
+        if new == old:
+            return
+        self._apply(old, -1)
+        self._apply(new, 1)
+        self._ratios[node.name] = new
+        self._updates += 1
+        if self._updates >= self.resync_interval:
+            self.resync()
+
+    def _apply(self, ratios, sign):
+        for i, ratio in enumerate(ratios):
+            self._sum[i] += sign * ratio
+            self._sum_sq[i] += sign * ratio * ratio
+
+    def resync(self):
+        """按缓存的各节点使用率重新计算累加和与平方和。"""
+        self._sum = [0.0] * len(BALANCE_RESOURCES)
+        self._sum_sq = [0.0] * len(BALANCE_RESOURCES)
+        for ratios in self._ratios.values():
+            self._apply(ratios, 1)
+        self._updates = 0
+
+    def std(self):
+        """返回 (cpu, memory, gpu) 使用率的总体标准差，与 np.std 一致。"""
+        if self.count == 0:
+            return tuple(0.0 for _ in BALANCE_RESOURCES)
+        result = []
+        for total, total_sq in zip(self._sum, self._sum_sq):
+            mean = total / self.count
+            variance = max(total_sq / self.count - mean * mean, 0.0)
+            result.append(math.sqrt(variance))
+        return tuple(result)
+
+    def balance_factors(self):
+        """返回 (cpu, memory, gpu) 负载均衡因子 1 / (1 + std)。"""
+        return tuple(1 / (1 + std) for std in self.std())
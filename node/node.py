@@ -1,6 +1,7 @@
-import logging,re
+import logging
 import psutil
 import GPUtil
+from utils import quantity
 
 
 class Node:
@@ -31,7 +32,10 @@ class Node:
         self.allocated_io = 0
         self.allocated_net = 0
         self.pods = []
+        self.pod_requests = {}  # Pod -> 调度时分配的 ResourceVector
         self.status = "Ready"
+        # 资源或状态变化时需要同步的监听者（例如 NodeResourceMatrix），需实现 update_node(node)
+        self.resource_listeners = []
 
 
 
@@ -70,51 +74,35 @@ class Node:
 
         :param pod: 要添加的 Pod 对象
         """
-        resources=pod.resources.get("requests", {})
-        resources=self.convert_resources(resources)
-        
-        required_cpu = resources.get("cpu", 0)
-        required_memory = resources.get("memory", 0)
-        required_gpu = resources.get("gpu", 0)
-        required_io = resources.get("io", 0)
-        required_net = resources.get("net", 0)
+        # 直接使用 Pod 上预先解析好的资源请求向量（CPU 为毫核）
+        requests = pod.request_vector
+        required_cpu = requests.cpu / 1000
+        required_memory = requests.memory
+        required_gpu = requests.gpu
+        required_io = requests.io
+        required_net = requests.net
 
         if self.can_schedule(required_cpu, required_memory, required_gpu, required_io, required_net):
             self.pods.append(pod)  # 添加 Pod 到节点
+            self.pod_requests[pod] = requests  # 记录实际分配的请求，移除时按此释放
             # 更新已分配的资源
             self.allocated_cpu += required_cpu
             self.allocated_memory += required_memory
             self.allocated_gpu += required_gpu
             self.allocated_io += required_io
             self.allocated_net += required_net
+            self._notify_resource_change()
             self._log_resource_warning()
         else:
             logging.error(f"Not enough resources on Node {self.name} to schedule Pod {pod.name}.")
             raise Exception(f"Not enough resources on Node {self.name} to schedule Pod {pod.name}.")
     
     def convert_resources(self,resource_dict):
-        # CPU转换（假设单位是m，即毫核）
-        cpu_str = resource_dict.get('cpu', '0m')
-        if 'm' in cpu_str:
-            cpu_value = int(cpu_str.replace('m', '')) / 1000  # 转换为核
-        else:
-            cpu_value = float(cpu_str)  # 如果没有m，直接转为浮动数值
-
-        # 内存转换（假设单位是Mi）
-        memory_str = resource_dict.get('memory', '0Mi')
-        if 'Mi' in memory_str:
-            memory_value = int(memory_str.replace('Mi', '')) * 1024 * 1024  # 转换为字节
-        else:
-            memory_value = int(memory_str)  # 其他单位可以按需转换
-
-        # GPU转换（假设单位是个数）
-        gpu_str = resource_dict.get('gpu', '0')
-        gpu_value = int(gpu_str)  # 转换为整数
-
+        """将资源请求字典转换为节点使用的单位：CPU 为核心数，内存为字节，GPU 为个数。"""
         return {
-            'cpu': cpu_value,
-            'memory': memory_value,
-            'gpu': gpu_value
+            'cpu': self.parse_cpu(resource_dict.get('cpu', 0)),
+            'memory': self.parse_memory(resource_dict.get('memory', 0)),
+            'gpu': self.parse_gpu(resource_dict.get('gpu', 0)),
         }
 
 # 示例
@@ -137,22 +125,24 @@ class Node:
             self.pods.remove(pod)  # 从节点中移除 Pod
             # 释放相应资源
             THRESHOLD = 1e-6  # 定义误差阈值
+            requests = self.pod_requests.pop(pod, pod.request_vector)
 
             # 释放相应资源
-            self.allocated_cpu -= self.parse_cpu(pod.resources.get('requests', {}).get('cpu', 0))
+            self.allocated_cpu -= requests.cpu / 1000
             self.allocated_cpu = 0.0 if abs(self.allocated_cpu) < THRESHOLD else self.allocated_cpu
 
-            self.allocated_memory -= self.parse_memory(pod.resources.get('requests', {}).get('memory', 0))
+            self.allocated_memory -= requests.memory
             self.allocated_memory = 0.0 if abs(self.allocated_memory) < THRESHOLD else self.allocated_memory
 
-            self.allocated_gpu -= self.parse_gpu(pod.resources.get('requests', {}).get('gpu', 0))
+            self.allocated_gpu -= requests.gpu
             self.allocated_gpu = 0.0 if abs(self.allocated_gpu) < THRESHOLD else self.allocated_gpu
 
-            self.allocated_io -= pod.resources.get("requests", {}).get("io", 0)
+            self.allocated_io -= requests.io
             self.allocated_io = 0.0 if abs(self.allocated_io) < THRESHOLD else self.allocated_io
 
-            self.allocated_net -= pod.resources.get("requests", {}).get("net", 0)
+            self.allocated_net -= requests.net
             self.allocated_net = 0.0 if abs(self.allocated_net) < THRESHOLD else self.allocated_net
+            self._notify_resource_change()
 
 
 
@@ -174,11 +164,20 @@ class Node:
     def set_status(self, status):
         """更新节点状态并同步至 etcd。"""
         self.status = status
+        self._notify_resource_change()
         logging.info(f"Node {self.name} status updated to {status}.")
         # self.etcd_client.put(f"/nodes/{self.name}/status", status)
 
     def to_dict(self):
         """将节点信息转换为字典形式，包含资源使用比例，便于序列化。"""
+        data = self.to_record()
+        del data["pod_count"]
+        data["pods"] = [pod.to_dict() for pod in self.pods]
+        return data
+
+    def to_record(self):
+        """写入 etcd 的固定大小节点记录：不内嵌 Pod 列表，只记录 Pod 数量；
+        Pod 与节点的绑定关系单独存放在 bindings/ 键下。"""
         return {
             "name": self.name,
             "ip_address": self.ip_address,
@@ -194,12 +193,17 @@ class Node:
             "allocated_net": self.allocated_net,
             "cpu_usage_ratio": self.allocated_cpu / self.total_cpu if self.total_cpu > 0 else 0,
             "memory_usage_ratio": self.allocated_memory / self.total_memory if self.total_memory > 0 else 0,
-            "pods": [pod.to_dict() for pod in self.pods],
+            "pod_count": len(self.pods),
             "status": self.status,
             "labels": self.labels,
             "annotations": self.annotations,
         }
 
+    def _notify_resource_change(self):
+        """通知所有监听者同步本节点的资源与状态。"""
+        for listener in self.resource_listeners:
+            listener.update_node(self)
+
     def _log_resource_warning(self):
         """检查资源使用比例，如果接近上限，则记录告警日志。"""
         if self.allocated_cpu / self.total_cpu > 0.8:
@@ -235,50 +239,18 @@ class Node:
         self.total_gpu = node_info['gpu']
         self.total_io = node_info['io']
         self.total_net = node_info['net']
+        self._notify_resource_change()
 
         logging.info(f"Node {self.name} loaded resources: {node_info}")
 
     def parse_cpu(self, cpu_str):
         """解析 CPU 请求，返回核心数"""
-        if isinstance(cpu_str, str):
-            # 使用正则表达式捕获数字部分和单位（m 或空）
-            match = re.match(r"(\d+(\.\d+)?)(m|)", cpu_str.strip())  # 加强正则表达式的匹配，允许小数部分
-            if match:
-                cpu_value, _, unit = match.groups()
-                cpu_value = float(cpu_value)  # 转换为浮动数
-
-                if unit == 'm':  # 如果是毫核，转换为核心数
-                    return round(cpu_value / 1000, 6)  # 将毫核转换为核心数并控制精度
-                else:
-                    return round(cpu_value, 6)  # 核心数本身，控制精度
-        return 0.0
+        return quantity.parse_cpu(cpu_str) / 1000
 
     def parse_memory(self, mem_str):
         """解析内存请求，返回字节数"""
-        if isinstance(mem_str, str):
-            match = re.match(r"(\d+)(Ki|Mi|Gi|Ti)", mem_str)
-            if match:
-                mem_value, unit = match.groups()
-                mem_value = float(mem_value)
-                if unit == 'Ki':  # KiB -> 字节
-                    return int(mem_value * 1024)
-                elif unit == 'Mi':  # MiB -> 字节
-                    return int(mem_value * 1024 * 1024)
-                elif unit == 'Gi':  # GiB -> 字节
-                    return int(mem_value * 1024 * 1024 * 1024)
-                elif unit == 'Ti':  # TiB -> 字节
-                    return int(mem_value * 1024 * 1024 * 1024 * 1024)
-        return 0
+        return quantity.parse_memory(mem_str)
 
     def parse_gpu(self, gpu_str):
         """解析 GPU 请求，返回 GPU 数量"""
-        if isinstance(gpu_str, str):
-            match = re.match(r"(\d+)(Gpu|)", gpu_str, re.IGNORECASE)  # 匹配数字和 'Gpu' 或空
-            if match:
-                gpu_value, unit = match.groups()
-                gpu_value = int(gpu_value)
-                if unit.lower() == 'gpu':  # 如果单位为 'GPU'，直接返回数量
-                    return gpu_value
-                else:
-                    return gpu_value  # 如果没有单位，也直接返回数量
-        return 0  # 默认返回 0，表示没有请求 GPU
+        return quantity.parse_gpu(gpu_str)
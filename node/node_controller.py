@@ -1,17 +1,57 @@
 import logging
 from .node import Node
+from .node_resource_matrix import NodeResourceMatrix
+from .load_balance_stats import LoadBalanceStats
 from pod.pod import Pod
+from etcd import storage_schema
+from etcd.informer import PendingWrites, same_record
+import asyncio
+import atexit
+import contextlib
 import json
+import threading
 #from etcd.etcd_client import EtcdClient
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class NodeController:
-    def __init__(self, etcd_client):
-        """初始化 NodeController，管理多个节点的操作，并连接 etcd 服务."""
+    def __init__(self, etcd_client, flush_interval=0.1, flush_batch_size=64, node_informer=None, binding_informer=None,
+                 async_etcd_client=None):
+        """初始化 NodeController，管理多个节点的操作，并连接 etcd 服务.
+        :param flush_interval: 脏节点写回 etcd 的间隔（秒）；为 0 时每次变更立即同步写入。
+                               大于 0 时 add_node、update_node_status 等方法只更新内存并返回，etcd 写入失败
+                               不会抛给调用方，而是计入 flush_failures 并在下一次刷新时重试；需要确认已持久化时
+                               调用 flush()，其返回值表示写回是否成功
+        :param flush_batch_size: 脏节点数量达到该值时立即在当前线程写回，不等待定时刷新
+        :param node_informer: 监听 nodes/ 的 Informer；与 binding_informer 同时提供且已同步时，get_all_nodes 直接读内存
+        :param binding_informer: 监听 bindings/ 的 Informer，需提供 'node' 索引
+        :param async_etcd_client: AsyncEtcdClient，供 *_async 方法在事件循环中访问 etcd；
+                                  未提供时 *_async 方法在线程池中调用同步版本
+        """
         self.nodes = {}
+        # 保护节点的内存状态（Node、NodeResourceMatrix、LoadBalanceStats）：请求处理、心跳监听与写回线程
+        # 并发修改或序列化节点时持有；持有期间不写 etcd，写回锁总在它之前获取，避免锁顺序反转
+        self._state_lock = threading.RLock()
         self.etcd_client = etcd_client
+        self.async_etcd_client = async_etcd_client
+        self.node_informer = node_informer
+        self.binding_informer = binding_informer
+        self.resource_matrix = NodeResourceMatrix()  # 供调度器向量化过滤与打分的节点资源矩阵
+        self.load_balance_stats = LoadBalanceStats()  # 增量维护的节点使用率统计，供奖励计算使用
+
+        # 写回缓冲：节点变更只标记为脏，由后台线程或批量阈值合并成一个 etcd 事务写入
+        self.flush_interval = flush_interval
+        self.flush_batch_size = max(int(flush_batch_size), 1)
+        self._dirty_nodes = set()
+        self._pending_bindings = {}  # 绑定键 -> 绑定记录 JSON；None 表示删除该绑定
+        self._dirty_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # 串行化写回，保证较新的快照不会被较旧的覆盖
+        self._flush_wakeup = threading.Event()
+        self._flusher = None
+        self.flush_failures = 0  # 累计写回失败次数（包括后台刷新）
+        self._pending_writes = PendingWrites()  # 本进程修改过、Informer 尚未观察到最新状态的节点
+        self._closed = False
 
     def add_node(self, name, ip_address, total_cpu, total_memory, total_gpu, total_io, total_net, labels=None, annotations=None):
         """添加一个新的节点，并在 etcd 中保存其信息."""
@@ -32,8 +72,13 @@ class NodeController:
 
         # 创建节点对象并保存
         node = Node(name, ip_address, total_cpu, total_memory, total_gpu, total_io, total_net, labels, annotations)
-        self.nodes[name] = node
-
+        with self._state_lock:
+            if name in self.nodes:
+                raise Exception(f"Node '{name}' already exists.")
+            self.nodes[name] = node
+            for listener in (self.resource_matrix, self.load_balance_stats):
+                listener.add_node(node)
+                node.resource_listeners.append(listener)
 
         # 将节点信息存储到 etcd
         self._update_etcd_node(node)
@@ -42,36 +87,59 @@ class NodeController:
         """移除一个节点，并在 etcd 中删除其信息.
         :param name: 节点名称
         """
+        self._detach_node(name)
+
+        # 从 etcd 中删除节点信息；持有写回锁，避免正在进行的刷新把已删除的节点重新写入
+        with self._flush_lock:
+            if not self.etcd_client.apply_batch((), [storage_schema.node_key(name)],
+                                                [storage_schema.binding_prefix(name)]):
+                logging.error(f"Failed to delete node '{name}' from etcd.")
+        logging.info(f"Node '{name}' removed.")
+
+    async def remove_node_async(self, name):
+        """remove_node 的异步版本，不阻塞事件循环."""
+        if self.async_etcd_client is None:
+            return await asyncio.to_thread(self.remove_node, name)
+        self._detach_node(name)
+        async with self._flush_lock_async():
+            if not await self.async_etcd_client.apply_batch((), [storage_schema.node_key(name)],
+                                                            [storage_schema.binding_prefix(name)]):
+                logging.error(f"Failed to delete node '{name}' from etcd.")
+        logging.info(f"Node '{name}' removed.")
+
+    def _detach_node(self, name):
+        """从内存状态、写回缓冲和资源统计中移除节点."""
+        with self._state_lock:
+            self._detach_node_locked(name)
+
+    def _detach_node_locked(self, name):
         if name not in self.nodes:
             logging.error(f"Node '{name}' does not exist.")
             raise Exception(f"Node '{name}' does not exist.")
         
         node = self.nodes[name]
         del self.nodes[name]
-
-        # 从 etcd 中删除节点信息
-        self.etcd_client.delete(f"nodes/{name}")
-        logging.info(f"Node '{name}' removed.")
+        self._pending_writes.mark(name)
+        with self._dirty_lock:
+            self._dirty_nodes.discard(name)
+            prefix = storage_schema.binding_prefix(name)
+            for key in [key for key in self._pending_bindings if key.startswith(prefix)]:
+                del self._pending_bindings[key]
+        for listener in (self.resource_matrix, self.load_balance_stats):
+            listener.remove_node(name)
+            if listener in node.resource_listeners:
+                node.resource_listeners.remove(listener)
 
     def list_nodes(self):
         """列出所有节点的信息.
         :return: 返回所有节点的字典"""
         node_info_list = {}
+        self.flush()  # 读之前先写回本进程的未提交变更
         try:
-            logging.info("Attempting to get nodes with prefix 'nodes/'")
-            response = self.etcd_client.get_with_prefix("nodes/")  # 确保使用前缀获取
-            logging.info(f"Response received: {response}")
-
-            if response is None :
-                logging.warning("No nodes found in etcd.")
-                return node_info_list  # 返回空字典
-
-            for node in response.kvs:  # 遍历返回的键值对
-                node_key = node.key.decode()
-                if node_key.startswith("nodes/"):  # 检查前缀
-                    node_info = node.value.decode()  # 处理字节编码
-                    node_info_list[node_key.split('/')[-1]] = node_info  # 以节点名称为键
-                    logging.info(f"Node '{node_key.split('/')[-1]}': {node_info}")
+            # 分页遍历，只在内存中保留当前页
+            for node_key, node_info in self.etcd_client.iter_prefix(storage_schema.NODE_PREFIX):
+                node_info_list[node_key.split('/')[-1]] = node_info  # 以节点名称为键
+            logging.info(f"Listed {len(node_info_list)} nodes from etcd.")
         except Exception as e:
             logging.error(f"Failed to list nodes from etcd: {e}")
             raise
@@ -89,28 +157,65 @@ class NodeController:
         
         return self.nodes[name]
 
-    def schedule_pod_to_node(self, pod, node_name):
+    def schedule_pod_to_node(self, pod, node_name, sync=True):
         """将一个 Pod 调度到指定节点.
         :param pod: Pod 对象
         :param node_name: 节点名称
+        :param sync: 是否将节点标记为待写回 etcd；批量调度时为 False，最后统一调用 sync_nodes
         """
-        self._check_node_existence(node_name)
-        
-        node = self.nodes[node_name]
-        node.add_pod(pod)
+        with self._state_lock:
+            self._check_node_existence(node_name)
+            node = self.nodes[node_name]
+            node.add_pod(pod)
+            self._stage_binding(node, pod)
 
         # 更新节点信息到 etcd
-        self._update_etcd_node(node)
+        if sync:
+            self._update_etcd_node(node)
+
+    def sync_nodes(self, node_names):
+        """在一个 etcd 事务中写入多个节点的信息，用于批量调度后的统一同步.
+        其他已标记为脏的节点会一并写入。
+        :param node_names: 节点名称列表
+        """
+        node_names = list(dict.fromkeys(node_names))
+        for node_name in node_names:
+            self._check_node_existence(node_name)
+        if not node_names:
+            return
+        self._mark_dirty(node_names)
+        if not self.flush():
+            logging.error(f"Failed to sync {len(node_names)} nodes to etcd.")
+            raise Exception(f"Failed to sync {len(node_names)} nodes to etcd.")
+
+    def rollback_placements(self, placements):
+        """撤销尚未写入 etcd 的批量放置（sync_nodes 失败时使用）：释放节点资源，绑定改为待删除，
+        节点记录在下一次 flush 时写回撤销后的状态.
+        :param placements: [(Pod 对象, 节点名称)]
+        """
+        node_names = []
+        with self._state_lock:
+            for pod, node_name in placements:
+                node = self.nodes.get(node_name)
+                if node is None:
+                    continue
+                node.remove_pod(pod)
+                self._stage_binding(node, pod, bound=False)
+                node_names.append(node_name)
+        if node_names:
+            self._mark_dirty(list(dict.fromkeys(node_names)))
+        logging.warning(f"Rolled back {len(node_names)} unpersisted pod placements.")
 
     def remove_pod_from_node(self, pod, node_name):
         """从指定节点移除一个 Pod.
         :param pod: Pod 对象
         :param node_name: 节点名称
         """
-        self._check_node_existence(node_name)
-
-        node = self.nodes[node_name]
-        node.remove_pod(pod)
+        with self._state_lock:
+            self._check_node_existence(node_name)
+            node = self.nodes[node_name]
+            node.remove_pod(pod)
+            self._stage_binding(node, pod, bound=False)
 
         # 更新节点信息到 etcd
         self._update_etcd_node(node)
@@ -120,15 +225,19 @@ class NodeController:
         遍历所有节点，移除节点上的所有 Pod。
         """
         # 遍历所有节点
-        for node_name, node in self.nodes.items():  # 解构元组为 `node_name` 和 `node_instance`
-            # 获取当前节点的所有 Pod
-            pods_to_remove = list(node.pods)  # 假设每个节点有一个 `pods` 集合/列表
-
-            # 遍历并移除每个 Pod
-            for pod in pods_to_remove:
-                node.remove_pod(pod)  # 调用方法移除 Pod
-            
-            # 更新节点信息到 etcd
+        with self._state_lock:
+            nodes = list(self.nodes.values())
+            for node in nodes:
+                # 获取当前节点的所有 Pod
+                pods_to_remove = list(node.pods)  # 假设每个节点有一个 `pods` 集合/列表
+
+                # 遍历并移除每个 Pod
+                for pod in pods_to_remove:
+                    node.remove_pod(pod)  # 调用方法移除 Pod
+                    self._stage_binding(node, pod, bound=False)
+
+        # 更新节点信息到 etcd
+        for node in nodes:
             self._update_etcd_node(node)
 
         logging.info("[NodeController-INFO]: All Pods have been removed from the cluster.")
@@ -141,25 +250,167 @@ class NodeController:
         :param node_name: 节点名称
         :param status: 节点状态（例如："Ready", "NotReady", "Maintenance"）
         """
-        self._check_node_existence(node_name)
-        
-        node = self.nodes[node_name]
-        node.set_status(status)
+        with self._state_lock:
+            self._check_node_existence(node_name)
+            node = self.nodes[node_name]
+            node.set_status(status)
 
         # 更新节点状态到 etcd
         self._update_etcd_node(node)
         logging.info(f"Node '{node_name}' status updated to '{status}'.")
 
+    def compare_and_set_status(self, node_name, expected, status):
+        """节点存在且当前状态为 expected 时改为 status，检查与修改在状态锁内原子完成；供心跳监听等后台线程使用.
+        :return: 是否修改了状态
+        """
+        with self._state_lock:
+            node = self.nodes.get(node_name)
+            if node is None or node.status != expected:
+                return False
+            node.set_status(status)
+        self._update_etcd_node(node)
+        logging.info(f"Node '{node_name}' status updated from '{expected}' to '{status}'.")
+        return True
+
     def _update_etcd_node(self, node):
-        """更新节点信息到 etcd."""
+        """更新节点信息到 etcd.
+        flush_interval 大于 0 时只将节点标记为脏，由 flush 合并写入，写入失败只记录在 flush_failures 中；
+        否则立即同步写入，失败时抛出异常。
+        """
+        self._mark_dirty([node.name])
+        if self.flush_interval > 0 and not self._closed:
+            return
+        if not self.flush():
+            logging.error(f"Failed to update node '{node.name}' in etcd.")
+            raise Exception(f"Failed to update node '{node.name}' in etcd.")
+
+    def _stage_binding(self, node, pod, bound=True):
+        """记录一次待写回的 Pod 绑定变更，与节点记录在同一次 flush 中写入.
+        :param bound: True 写入绑定键，False 删除绑定键
+        """
+        key = storage_schema.binding_key(node.name, pod.namespace, pod.name)
+        value = None
+        if bound:
+            value = json.dumps(storage_schema.binding_record(node.name, pod.namespace, pod.name, pod.request_vector))
+        with self._dirty_lock:
+            self._pending_bindings[key] = value
+
+    def _mark_dirty(self, node_names):
+        """将节点标记为待写回；达到批量阈值时在当前线程立即写回，否则确保后台刷新线程已启动，
+        由其在下一个 flush_interval 到期时合并写回."""
+        for name in node_names:
+            self._pending_writes.mark(name)
+        with self._dirty_lock:
+            self._dirty_nodes.update(node_names)
+            pending = len(self._dirty_nodes) + len(self._pending_bindings)
+        if pending >= self.flush_batch_size:
+            self.flush()
+        elif self.flush_interval > 0:
+            self._ensure_flusher()
+
+    def _ensure_flusher(self):
+        """按需启动后台刷新线程."""
+        if self._flusher is not None or self._closed:
+            return
+        with self._dirty_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="node-etcd-flusher", daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        """后台线程：每隔 flush_interval 秒合并写回一次脏节点."""
+        while not self._closed:
+            self._flush_wakeup.wait(self.flush_interval)
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"Background node flush failed: {e}")
+
+    def flush(self):
+        """将所有脏节点及待写回的绑定变更在一个 etcd 事务中写回.
+        节点在写回时才序列化，因此同一节点在两次刷新之间的多次变更只写入最新状态；
+        节点记录不内嵌 Pod，每次放置的写入量与节点上的 Pod 数量无关。
+        写入失败的变更会重新加入缓冲，等待下一次刷新重试。
+        :return: 写入成功（或没有待写回的变更）时返回 True
+        """
+        with self._flush_lock:
+            node_names, bindings, puts, deletes = self._take_pending()
+            if not puts and not deletes:
+                return True
+            if not self.etcd_client.apply_batch(puts, deletes):
+                self._restore_pending(node_names, bindings)
+                return False
+        logging.info(f"Flushed {len(node_names)} nodes and {len(bindings)} bindings to etcd in one transaction.")
+        return True
+
+    async def flush_async(self):
+        """flush 的异步版本：通过 AsyncEtcdClient 写回，等待写回锁时不阻塞事件循环."""
+        if self.async_etcd_client is None:
+            return await asyncio.to_thread(self.flush)
+        async with self._flush_lock_async():
+            node_names, bindings, puts, deletes = self._take_pending()
+            if not puts and not deletes:
+                return True
+            if not await self.async_etcd_client.apply_batch(puts, deletes):
+                self._restore_pending(node_names, bindings)
+                return False
+        logging.info(f"Flushed {len(node_names)} nodes and {len(bindings)} bindings to etcd in one transaction.")
+        return True
+
+    @contextlib.asynccontextmanager
+    async def _flush_lock_async(self):
+        """在事件循环中获取写回锁：锁空闲时直接获取，否则在线程池中阻塞等待，不占用事件循环.
+        写回锁同时被后台刷新线程使用，因此不能换成 asyncio.Lock。
+        """
+        if not self._flush_lock.acquire(blocking=False):
+            acquire = asyncio.ensure_future(asyncio.to_thread(self._flush_lock.acquire))
+            try:
+                await asyncio.shield(acquire)
+            except asyncio.CancelledError:
+                # 线程中的 acquire 无法取消，拿到锁后立即释放，避免锁永久被占用
+                acquire.add_done_callback(lambda future: self._flush_lock.release())
+                raise
         try:
-            # 将字典转换为 JSON 字符串
-            node_data = json.dumps(node.to_dict())
-            self.etcd_client.put(f"nodes/{node.name}", node_data)
-            logging.info(f"Node '{node.name}' updated in etcd.")
-        except Exception as e:
-            logging.error(f"Failed to update node '{node.name}' in etcd: {e}")
-            raise
+            yield
+        finally:
+            self._flush_lock.release()
+
+    def _take_pending(self):
+        """取出写回缓冲并序列化为 (节点名称, 绑定变更, puts, deletes)；调用方需持有写回锁."""
+        with self._dirty_lock:
+            node_names = list(self._dirty_nodes)
+            bindings = self._pending_bindings
+            self._dirty_nodes.clear()
+            self._pending_bindings = {}
+        with self._state_lock:
+            puts = [(storage_schema.node_key(name), json.dumps(self.nodes[name].to_record()))
+                    for name in node_names if name in self.nodes]
+        puts += [(key, value) for key, value in bindings.items() if value is not None]
+        deletes = [key for key, value in bindings.items() if value is None]
+        return node_names, bindings, puts, deletes
+
+    def _restore_pending(self, node_names, bindings):
+        """写回失败时把取出的变更放回缓冲；期间产生的更新的绑定变更优先."""
+        with self._dirty_lock:
+            self._dirty_nodes.update(name for name in node_names if name in self.nodes)
+            for key, value in bindings.items():
+                self._pending_bindings.setdefault(key, value)
+            self.flush_failures += 1
+        logging.error(f"Failed to flush {len(node_names)} nodes and {len(bindings)} bindings to etcd, will retry.")
+
+    def close(self):
+        """停止后台刷新线程并写回剩余的脏节点；之后的变更改为同步写入."""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush_wakeup.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join(timeout=max(self.flush_interval, 1))
+        self.flush()
 
     def _check_node_existence(self, node_name):
         """检查节点是否存在, 若不存在则抛出异常."""
@@ -167,22 +418,102 @@ class NodeController:
             logging.error(f"Node '{node_name}' does not exist.")
             raise Exception(f"Node '{node_name}' does not exist.")
         
+    @property
+    def resource_version(self):
+        """get_all_nodes 返回结果至少反映到的 etcd revision；未使用 Informer 时为 None."""
+        if not self._informers_synced():
+            return None
+        return min(self.node_informer.resource_version, self.binding_informer.resource_version)
+
+    def _informers_synced(self):
+        return (self.node_informer is not None and self.binding_informer is not None
+                and self.node_informer.has_synced() and self.binding_informer.has_synced())
+
+    def _get_all_nodes_cached(self):
+        """从 Informer 缓存组装节点列表，耗时与结果大小成正比.
+        只有本进程修改过、尚未写回或尚未被 watch 观察到的节点以内存状态覆盖（已删除的从结果中去掉），
+        保证读到自己的写入；Informer 追上后不再覆盖，其余节点不做序列化。
+        """
+        records, _ = self.node_informer.list()
+        node_info_list = {}
+        for record in records:
+            node_data = dict(record)
+            node_data['pods'], _ = self.binding_informer.list('node', node_data['name'])
+            node_info_list[node_data['name']] = node_data
+        with self._state_lock:
+            self._overlay_pending(node_info_list)
+        return node_info_list
+
+    def _overlay_pending(self, node_info_list):
+        for name, generation in self._pending_writes.snapshot():
+            node = self.nodes.get(name)
+            cached = self.node_informer.get(storage_schema.node_key(name))
+            if node is None:
+                if cached is None:
+                    self._pending_writes.observed(name, generation)
+                else:
+                    node_info_list.pop(name, None)
+                continue
+            node_data = node.to_record()
+            pods = [storage_schema.binding_record(name, pod.namespace, pod.name, pod.request_vector)
+                    for pod in node.pods]
+            cached_pods, _ = self.binding_informer.list('node', name)
+            if same_record(node_data, cached) and self._same_bindings(pods, cached_pods):
+                self._pending_writes.observed(name, generation)
+            node_data['pods'] = pods
+            node_info_list[name] = node_data
+
+    @staticmethod
+    def _same_bindings(bindings, cached_bindings):
+        def normalize(records):
+            return sorted(json.dumps(record, sort_keys=True) for record in records)
+        return normalize(bindings) == normalize(cached_bindings)
+
     def get_all_nodes(self):
         """获取所有节点的信息"""
+        if self._informers_synced():
+            return self._get_all_nodes_cached()
+        self.flush()  # 读之前先写回本进程的未提交变更，保证读到自己的写入
         try:
-            node_values = self.etcd_client.get_with_prefix("nodes/")  # 使用 EtcdClient 的方法
-            node_info_list = {}
-
-            for value in node_values:
-                node_data = json.loads(value)  # 解析 JSON 字符串
-                node_name = node_data['name']  # 获取节点名称
-                node_info_list[node_name] = node_data  # 存储节点数据
+            node_values = self.etcd_client.get_with_prefix(storage_schema.NODE_PREFIX)  # 使用 EtcdClient 的方法
+            binding_values = self.etcd_client.get_with_prefix(storage_schema.BINDING_PREFIX)
+            return self._assemble_nodes(node_values, binding_values)
+        except Exception as e:
+            logging.error(f"Failed to get all nodes: {e}")
+            return {}
 
-            logging.info(f"Retrieved all nodes: {node_info_list}")
-            return node_info_list
+    async def get_all_nodes_async(self):
+        """get_all_nodes 的异步版本；Informer 已同步时直接读内存."""
+        if self._informers_synced():
+            return self._get_all_nodes_cached()
+        if self.async_etcd_client is None:
+            return await asyncio.to_thread(self.get_all_nodes)
+        await self.flush_async()
+        try:
+            node_values = await self.async_etcd_client.get_with_prefix(storage_schema.NODE_PREFIX)
+            binding_values = await self.async_etcd_client.get_with_prefix(storage_schema.BINDING_PREFIX)
+            return self._assemble_nodes(node_values, binding_values)
         except Exception as e:
             logging.error(f"Failed to get all nodes: {e}")
             return {}
+
+    def _assemble_nodes(self, node_values, binding_values):
+        """由 etcd 中的节点记录与绑定记录组装节点列表."""
+        node_info_list = {}
+        for value in node_values:
+            node_data = json.loads(value)  # 解析 JSON 字符串
+            node_name = node_data['name']  # 获取节点名称
+            node_data['pods'] = []
+            node_info_list[node_name] = node_data  # 存储节点数据
+
+        # 节点记录不再内嵌 Pod，按绑定键补全每个节点上的 Pod
+        for value in binding_values:
+            binding = json.loads(value)
+            if binding['node'] in node_info_list:
+                node_info_list[binding['node']]['pods'].append(binding)
+
+        logging.info(f"Retrieved {len(node_info_list)} nodes from etcd.")
+        return node_info_list
         
     def add_pod_to_node(self, pod , node_name):
         """Schedule and add a Pod to a specified node if resources are sufficient.
@@ -197,7 +528,8 @@ class NodeController:
             # 尝试启动 Pod
         try:
             node.add_pod(pod)
-            self.etcd_client.put(f"/pods/{pod.namespace}/{pod.name}/status", "Running")
+            self._stage_binding(node, pod)
+            self._update_etcd_node(node)
             logging.info(f"Pod {pod.name} scheduled on Node {node.name}.")
         except Exception as e:
             logging.error(f"Failed to add Pod '{pod.name}': {e}")
@@ -211,8 +543,8 @@ class NodeController:
         if not node:
             logging.error(f"Node {node_name} does not exist.")
             raise ValueError(f"Node {node_name} does not exist.")
-        self.etcd_client.put(f"/nodes/{self.name}/status", status)
         node.set_status(status)
+        self._update_etcd_node(node)
         
         
         
@@ -0,0 +1,174 @@
+import json
+import logging
+import threading
+import time
+from etcd import storage_schema
+
+# 默认心跳租约 TTL（秒）；续约间隔为 TTL 的三分之一，容忍连续两次续约失败
+DEFAULT_HEARTBEAT_TTL = 10
+
+
+class NodeHeartbeat:
+    def __init__(self, etcd_client, node_name, ttl=DEFAULT_HEARTBEAT_TTL, interval=None):
+        """
+        节点代理侧的心跳：持有一个 etcd 租约，并把 heartbeats/{node} 绑定到该租约。
+        之后每个续约周期只发送一次 keep-alive，不再重写节点记录；
+        代理退出或失联超过 TTL 后租约过期，etcd 自动删除心跳键，由 HeartbeatMonitor 感知。
+        :param ttl: 租约 TTL（秒）
+        :param interval: 续约间隔（秒），默认为 ttl / 3
+        """
+        self.etcd_client = etcd_client
+        self.node_name = node_name
+        self.ttl = ttl
+        self.interval = interval if interval is not None else max(ttl / 3, 0.1)
+        self.lease_id = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """申请租约并写入心跳键，然后在后台线程中续约；首次申请或写入心跳键失败时由后台线程重试."""
+        self._stopped.clear()
+        self._acquire()
+        self._thread = threading.Thread(target=self._keepalive_loop, name=f"heartbeat-{self.node_name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, revoke=True):
+        """停止续约；revoke 为 True 时立即撤销租约，master 无需等待 TTL 即可将节点标记为 NotReady."""
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 1)
+        lease_id, self.lease_id = self.lease_id, None
+        if revoke and lease_id is not None:
+            self.etcd_client.revoke_lease(lease_id)
+
+    def _acquire(self):
+        """申请新租约并把心跳键绑定到该租约；成功返回 True."""
+        lease = self.etcd_client.lease(self.ttl)
+        if lease is None:
+            logging.error(f"Failed to acquire heartbeat lease for node '{self.node_name}'.")
+            return False
+        lease_id = getattr(lease, 'id', lease)
+        record = {"node": self.node_name, "ttl": self.ttl}
+        if not self.etcd_client.put(storage_schema.heartbeat_key(self.node_name), json.dumps(record), lease_id):
+            # 租约存活但心跳键不存在时 master 无法感知节点失联；撤销租约，由后台线程重新注册
+            logging.error(f"Failed to register heartbeat key of node '{self.node_name}', will retry.")
+            self.etcd_client.revoke_lease(lease_id)
+            return False
+        self.lease_id = lease_id
+        logging.info(f"Node '{self.node_name}' heartbeat registered with lease {self.lease_id} (TTL {self.ttl}s).")
+        return True
+
+    def _keepalive_loop(self):
+        while not self._stopped.wait(self.interval):
+            if self.lease_id is None:
+                self._acquire()
+                continue
+            remaining = self.etcd_client.refresh_lease(self.lease_id)
+            if remaining == 0:
+                # 续约失败时间超过 TTL，租约与心跳键均已被删除，需要重新注册
+                logging.warning(f"Heartbeat lease {self.lease_id} of node '{self.node_name}' expired, re-registering.")
+                self.lease_id = None
+                self._acquire()
+            elif remaining is None:
+                logging.warning(f"Failed to refresh heartbeat lease of node '{self.node_name}', will retry.")
+
+
+class HeartbeatMonitor:
+    def __init__(self, node_controller, etcd_client, retry_interval=1.0):
+        """
+        master 侧的心跳监听：watch heartbeats/ 前缀，心跳键被删除（租约过期或撤销）时将节点标记为 NotReady，
+        心跳恢复时再标记回 Ready。状态变化经 Node 的资源监听回调同步到 NodeResourceMatrix 的 ready 掩码，
+        节点在 O(1) 时间内退出或重新进入调度器的可行节点集合。
+        只有由本监听器标记为 NotReady 的节点才会被自动恢复，手动设置的状态（例如 Maintenance）不受影响；
+        从未上报过心跳的节点也保持原状态。
+        :param retry_interval: revision 被压缩后重新读取失败时的重试间隔（秒）
+        """
+        self.node_controller = node_controller
+        self.etcd_client = etcd_client
+        self.retry_interval = retry_interval
+        self._alive = set()  # 当前持有心跳的节点名称
+        self._expired = set()  # 因心跳过期被标记为 NotReady 的节点名称
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stopped = True
+
+    def start(self):
+        """读取当前心跳并从该 revision 之后开始 watch；读取失败时抛出异常."""
+        self._stopped = False
+        revision = self._relist()
+        self._watch(revision)
+
+    def stop(self):
+        self._stopped = True
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.cancel()
+
+    def alive_nodes(self):
+        with self._lock:
+            return set(self._alive)
+
+    def _relist(self):
+        items, revision = self.etcd_client.get_prefix_with_revision(storage_schema.HEARTBEAT_PREFIX)
+        alive = {key[len(storage_schema.HEARTBEAT_PREFIX):] for key, _ in items}
+        with self._lock:
+            lost = self._alive - alive
+            self._alive = alive
+        for name in alive:
+            self._on_alive(name)
+        for name in lost:
+            self._on_expired(name)
+        logging.info(f"Heartbeat monitor listed {len(alive)} live nodes at revision {revision}.")
+        return revision
+
+    def _watch(self, revision):
+        if self._stopped:
+            return
+        self._watcher = self.etcd_client.watch_prefix(storage_schema.HEARTBEAT_PREFIX, self._on_event,
+                                                      start_revision=revision + 1,
+                                                      on_compacted=self._on_compacted)
+
+    def _on_event(self, event):
+        name = event.key[len(storage_schema.HEARTBEAT_PREFIX):]
+        with self._lock:
+            if event.type == 'delete':
+                self._alive.discard(name)
+            else:
+                self._alive.add(name)
+        if event.type == 'delete':
+            self._on_expired(name)
+        else:
+            self._on_alive(name)
+
+    def _on_compacted(self, error):
+        """错过的事件已被压缩：重新读取心跳，对比得出期间失联的节点."""
+        logging.warning(f"Heartbeat monitor must relist: revision {error.compacted_revision} compacted.")
+        self._watcher = None
+        threading.Thread(target=self._resync, daemon=True).start()
+
+    def _resync(self):
+        while not self._stopped:
+            try:
+                self._watch(self._relist())
+                return
+            except Exception as e:
+                logging.error(f"Failed to relist node heartbeats: {e}")
+            time.sleep(self.retry_interval)
+
+    def _on_expired(self, name):
+        # 状态检查与修改由 NodeController 在其状态锁内完成，与请求处理和写回线程互斥
+        with self._lock:
+            if not self.node_controller.compare_and_set_status(name, 'Ready', 'NotReady'):
+                return
+            self._expired.add(name)
+        logging.warning(f"Heartbeat of node '{name}' expired, marked it NotReady.")
+
+    def _on_alive(self, name):
+        with self._lock:
+            if name not in self._expired:
+                return
+            self._expired.discard(name)
+            restored = self.node_controller.compare_and_set_status(name, 'NotReady', 'Ready')
+        if restored:
+            logging.info(f"Heartbeat of node '{name}' resumed, marked it Ready.")
@@ -0,0 +1,144 @@
+import logging
+import numpy as np
+
+# 矩阵列顺序，与 Node 上的 total_* / allocated_* 属性一一对应
+RESOURCE_KEYS = ('cpu', 'memory', 'gpu', 'io', 'net')
+RESOURCE_INDEX = {key: i for i, key in enumerate(RESOURCE_KEYS)}
+
+
+class NodeResourceMatrix:
+    def __init__(self, initial_capacity=16):
+        """
+        以 NumPy 矩阵维护集群中每个节点的总资源与已分配资源。
+        每个节点占一行，列顺序见 RESOURCE_KEYS；行顺序与节点加入顺序一致，
+        因此 argmin 的平局处理与按字典顺序排序的结果保持一致。
+        :param initial_capacity: 预分配的行数，不足时按倍数扩容
+        """
+        self.capacity = max(int(initial_capacity), 1)
+        self.size = 0
+        self.names = []  # 行号 -> 节点名称
+        self.index = {}  # 节点名称 -> 行号
+        self._total = np.zeros((self.capacity, len(RESOURCE_KEYS)), dtype=np.float64)
+        self._allocated = np.zeros((self.capacity, len(RESOURCE_KEYS)), dtype=np.float64)
+        self._ready = np.zeros(self.capacity, dtype=bool)
+
+    @property
+    def total(self):
+        """所有节点的总资源视图，形状 (size, 5)。"""
+        return self._total[:self.size]
+
+    @property
+    def allocated(self):
+        """所有节点的已分配资源视图，形状 (size, 5)。"""
+        return self._allocated[:self.size]
+
+    @property
+    def ready(self):
+        """节点是否处于 Ready 状态的布尔向量。"""
+        return self._ready[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def add_node(self, node):
+        """为新节点追加一行并同步其资源。"""
+        if node.name in self.index:
+            self.update_node(node)
+            return
+        if self.size == self.capacity:
+            self._grow()
+        row = self.size
+        self.index[node.name] = row
+        self.names.append(node.name)
+        self.size += 1
+        self.update_node(node)
+
+    def remove_node(self, name):
+        """删除节点所在行，后续行整体上移以保持节点顺序。"""
+        row = self.index.pop(name, None)
+        if row is None:
+            logging.warning(f"Node {name} is not tracked by the resource matrix.")
+            return
+        last = self.size - 1
+        if row < last:
+            self._total[row:last] = self._total[row + 1:self.size]
+            self._allocated[row:last] = self._allocated[row + 1:self.size]
+            self._ready[row:last] = self._ready[row + 1:self.size]
+        self._total[last] = 0
+        self._allocated[last] = 0
+        self._ready[last] = False
+        del self.names[row]
+        self.size -= 1
+        for i in range(row, self.size):
+            self.index[self.names[i]] = i
+
+    def update_node(self, node):
+        """从 Node 对象同步一行数据，O(1)。由 Node 在资源或状态变化时回调。"""
+        row = self.index.get(node.name)
+        if row is None:
+            return
+        self._total[row] = (node.total_cpu, node.total_memory, node.total_gpu, node.total_io, node.total_net)
+        self._allocated[row] = (node.allocated_cpu, node.allocated_memory, node.allocated_gpu,
+                                node.allocated_io, node.allocated_net)
+        self._ready[row] = node.status == 'Ready'
+
+    def _grow(self):
+        """容量翻倍。"""
+        new_capacity = self.capacity * 2
+        for attr in ('_total', '_allocated'):
+            old = getattr(self, attr)
+            new = np.zeros((new_capacity, len(RESOURCE_KEYS)), dtype=old.dtype)
+            new[:self.capacity] = old
+            setattr(self, attr, new)
+        ready = np.zeros(new_capacity, dtype=bool)
+        ready[:self.capacity] = self._ready
+        self._ready = ready
+        self.capacity = new_capacity
+
+    def feasible_mask(self, required_resources):
+        """
+        计算可调度节点掩码：节点 Ready 且每种请求的资源剩余量都不小于需求。
+        :param required_resources: 资源需求字典，仅检查其中出现的资源（例如 {'cpu': x, 'memory': y, 'gpu': z}）
+        :return: 形状 (size,) 的布尔数组
+        """
+        mask = self.ready.copy()
+        free = self.total - self.allocated
+        for key, value in required_resources.items():
+            column = RESOURCE_INDEX.get(key)
+            if column is None:
+                continue
+            mask &= free[:, column] >= value
+        return mask
+
+    def usage_ratios(self):
+        """已分配/总量比例矩阵，总量为 0 的位置记为 0。"""
+        total = self.total
+        return np.divide(self.allocated, total, out=np.zeros_like(total), where=total > 0)
+
+    def scores(self, weights):
+        """
+        按资源使用比例加权求和得到每个节点的负载评分（越低越优）。
+        :param weights: 资源权重字典，键为 RESOURCE_KEYS 中的名称
+        """
+        weight_vector = np.zeros(len(RESOURCE_KEYS), dtype=np.float64)
+        for key, value in weights.items():
+            column = RESOURCE_INDEX.get(key)
+            if column is not None:
+                weight_vector[column] = value
+        return self.usage_ratios() @ weight_vector
+
+    def select(self, required_resources, weights, bias=None):
+        """
+        一次性完成过滤与打分，返回评分最低的可行节点名称；无可行节点时返回 None。
+        :param bias: 可选，与行顺序对应的附加评分向量（例如镜像局部性加分取负值）
+        """
+        if self.size == 0:
+            return None
+        mask = self.feasible_mask(required_resources)
+        if not mask.any():
+            return None
+        scores = self.scores(weights)
+        if bias is not None:
+            scores = scores + bias
+        scores = np.where(mask, scores, np.inf)
+        return self.names[int(np.argmin(scores))]
@@ -1,108 +1,176 @@
 import numpy as np
 import tensorflow as tf
-from collections import deque
-import random
 import logging
-import re,datetime
+import datetime
 import matplotlib.pyplot as plt
 import os
+from utils import quantity
+from orchestrator.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+from orchestrator.ddqn_learner import DDQNLearner
 
-NODE_COUNT = 10
+NODE_FEATURES = 9  # 每个节点的状态特征数（节点资源 6 项 + Pod 请求 3 项）
+# 发布权重快照时支持的 Dense 层激活函数（numpy 实现）
+ACTIVATIONS = {
+    'relu': lambda x: np.maximum(x, 0),
+    'linear': lambda x: x,
+}
 
 class DDQNScheduler:
-    def __init__(self, node_controller):
-        # 初始化调度器
+    def __init__(self, node_controller, checkpointer=None):
+        # 初始化调度器；checkpointer 为 DDQNCheckpointer 时启动即加载最新检查点，并在训练中定期保存
         self.config = {
             'gamma': 0.95,  # 折扣因子
             'epsilon': 1.0,  # 初始探索率
             'epsilon_min': 0.01,  # 最小探索率
             'epsilon_decay': 0.995,  # 探索率衰减
             'learning_rate': 0.001,  # 学习率
-            'batch_size': 8  # 批次大小
+            'batch_size': 8,  # 批次大小
+            'memory_size': 2000,  # 经验回放容量
+            'prioritized_replay': False,  # 是否按 TD 误差优先级采样
+            'publish_interval': 1  # 每训练多少步发布一次推理用的权重快照
         }
         self.node_controller = node_controller  # 节点控制器
-        self.state_size = NODE_COUNT * 9  # 状态大小，包含节点和 Pod 的资源信息
-        self.action_size = NODE_COUNT #len(self.node_controller.nodes)  
-        # 动作大小，即节点数量
-        self.memory = deque(maxlen=2000)  # 经验回放内存
+        self.action_size = len(self.node_controller.nodes)  # 动作大小，即节点数量
+        self.state_size = NODE_FEATURES * self.action_size  # 状态大小，包含节点和 Pod 的资源信息
+        self.memory = self._build_memory()  # 经验回放内存
         self.model = self._build_model()  # 主模型
         self.target_model = self._build_model()  # 目标模型
         self.update_target_frequency = 10  # 更新目标网络的频率
         self.update_counter = 0  # 更新计数器
         self.schedule_history = []  # 每次调度的 Pod 名称、目标节点、奖励和时间戳
+        self.checkpointer = checkpointer
+        if checkpointer is not None:
+            checkpointer.restore(self)
+        self.learner = None  # start_learner() 后由后台线程训练
+        self.policy = None  # 推理用的只读权重快照
+        self.publish_weights()
 
     def _update_action_size(self):
-        # 更新 action_size 和模型的输出层大小
+        # 节点数变化：网络按单个节点打分，与节点数无关，保留已学到的权重
         self.action_size = len(self.node_controller.nodes)  # 动态获取节点数
-        self.state_size = 9 * self.action_size
-        self.model = self._build_model()  # 重新构建模型
-        self.target_model = self._build_model()  # 重新构建目标模型
+        self.state_size = NODE_FEATURES * self.action_size
+        # 旧经历的状态维度与当前集群不一致，无法与新经历组成批次；后台训练时由学习线程自行清空
+        if self.learner is None:
+            self.memory.clear(self.state_size)
 
-    def _build_model(self):
-        # 计算 state_size（节点数 * 每个节点的特征数量）
-        #self.state_size = len(self.node_controller.nodes) * 9  # 每个节点 9 个特征
+    def _build_memory(self):
+        # 状态大小在第一次写入时确定，节点数变化后由 _update_action_size 重新分配
+        if self.config['prioritized_replay']:
+            return PrioritizedReplayBuffer(self.config['memory_size'])
+        return ReplayBuffer(self.config['memory_size'])
 
+    def _build_model(self):
+        # 所有节点共享的打分网络：输入单个节点的特征与 Pod 请求，输出调度到该节点的 Q 值，
+        # 因此同一个模型适用于任意节点数
         model = tf.keras.Sequential()
-        model.add(tf.keras.layers.Input(shape=(self.state_size,)))  # 输入层
+        model.add(tf.keras.layers.Input(shape=(NODE_FEATURES,)))  # 输入层
         model.add(tf.keras.layers.Dense(4, activation='relu'))  # 隐藏层1
         model.add(tf.keras.layers.Dense(8, activation='relu'))  # 隐藏层2
-        model.add(tf.keras.layers.Dense(self.action_size, activation='linear'))  # 输出层
+        model.add(tf.keras.layers.Dense(1, activation='linear'))  # 输出层
         model.compile(loss='mse', optimizer=tf.keras.optimizers.Adam(learning_rate=self.config['learning_rate']))  # 编译模型
         return model
 
 
-    @tf.function
-    def train_model(self, state, target_f):
-        # 训练模型
-        with tf.GradientTape() as tape:  # 记录梯度
-            loss_fn = tf.keras.losses.MeanSquaredError()
-            loss = loss_fn(target_f, self.model(state))  # 计算损失
-        grads = tape.gradient(loss, self.model.trainable_variables)  # 计算梯度
-        self.model.optimizer.apply_gradients(zip(grads, self.model.trainable_variables))  # 应用梯度更新
-        return loss
+    @staticmethod
+    def q_values(model, states):
+        """
+        把 (batch, 节点数 * NODE_FEATURES) 的状态拆成逐节点的特征行，用共享网络一次前向打分.
+        :return: (batch, 节点数) 的 Q 值
+        """
+        states = tf.cast(states, tf.float32)
+        scores = model(tf.reshape(states, (-1, NODE_FEATURES)))
+        return tf.reshape(scores, (tf.shape(states)[0], -1))
 
     @tf.function
+    def train_batch(self, states, actions, rewards, next_states, dones, weights, gamma):
+        """
+        整批执行一次双 DQN 更新：在线网络为下一状态选出动作，目标网络评估该动作的价值，
+        两个网络各做一次批量前向，随后一次梯度更新。
+        损失与逐样本训练一致：只替换所选动作的 Q 值作为目标，对整行 Q 值求均方误差，
+        再按重要性采样权重 weights 加权（均匀采样时全为 1）。
+        :return: (损失, 各样本所选动作的 TD 误差)，TD 误差用于更新优先级
+        """
+        batch_size = tf.shape(states)[0]
+        next_q = self.q_values(self.target_model, next_states)
+        mask = tf.one_hot(actions, tf.shape(next_q)[1])
+        with tf.GradientTape() as tape:
+            # 当前状态与下一状态拼接后在线网络只前向一次
+            online_q = self.q_values(self.model, tf.concat([states, next_states], axis=0))
+            q_values = online_q[:batch_size]
+            next_actions = tf.argmax(online_q[batch_size:], axis=1, output_type=tf.int32)
+            targets = rewards + gamma * (1.0 - dones) * tf.gather(next_q, next_actions, axis=1, batch_dims=1)
+            target_f = tf.stop_gradient(q_values * (1.0 - mask) + targets[:, None] * mask)
+            loss = tf.reduce_mean(weights[:, None] * tf.square(target_f - q_values))
+        grads = tape.gradient(loss, self.model.trainable_variables)
+        self.model.optimizer.apply_gradients(zip(grads, self.model.trainable_variables))
+        td_errors = targets - tf.gather(q_values, actions, axis=1, batch_dims=1)
+        return loss, td_errors
+
+    def publish_weights(self):
+        """
+        把在线网络的权重复制为只读快照 [(kernel, bias, activation)]，以一次引用赋值替换 self.policy。
+        训练（可能在后台线程中）只修改 self.model，推理只读取快照，两者互不等待。
+        """
+        policy = []
+        for layer in self.model.layers:
+            kernel, bias = (weight.copy() for weight in layer.get_weights())
+            name = tf.keras.activations.serialize(layer.activation)
+            if name not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation '{name}' in layer {layer.name}.")
+            policy.append((kernel, bias, ACTIVATIONS[name]))
+        self.policy = tuple(policy)
+
     def predict(self, state):
-        # 使用模型进行预测
-        return self.model(state)
+        """用已发布的权重快照在 numpy 中做一次前向，不占用 TF 运行时.
+        :return: (batch, 节点数) 的 Q 值
+        """
+        state = np.asarray(state, dtype=np.float32)
+        x = state.reshape(-1, NODE_FEATURES)
+        for kernel, bias, activation in self.policy:
+            x = activation(x @ kernel + bias)
+        return x.reshape(state.shape[0], -1)
+
+    def start_learner(self, **options):
+        """启动后台学习线程：此后调度只提交经历，训练不再占用调度请求的时间."""
+        if self.learner is None:
+            self.learner = DDQNLearner(self, **options).start()
+        return self.learner
+
+    def stop_learner(self):
+        if self.learner is not None:
+            self.learner.stop()
+            self.learner = None
 
 
     def remember(self, state, action, reward, next_state, done):
         # 存储经历到经验回放内存
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.append(state, action, reward, next_state, done)
 
-    def act(self, state):
-        # 根据当前状态选择动作
+    def act(self, state, feasible=None):
+        # 根据当前状态选择动作；feasible 为各节点是否满足状态向量之外的 io、net 请求（None 表示不限制）
         if self.action_size == 0:
             logging.error("No nodes available for scheduling.")
             return 0  # 或者可以返回一个默认值，或者抛出异常
         if np.random.rand() <= self.config['epsilon']:  # 选择最佳动作
-            return self.select_best_node(state)
-        act_values = self.predict(state)  # 使用模型预测动作值
-        return np.argmax(act_values[0])  # 选择最大动作值对应的动作
+            return self.select_best_node(state, feasible)
+        act_values = self.predict(state)[0]  # 使用模型预测动作值
+        if feasible is not None and feasible.any():
+            act_values = np.where(feasible, act_values, -np.inf)
+        return np.argmax(act_values)  # 选择最大动作值对应的动作
 
     def replay(self):
+        """从经验回放内存中采样一批经历并训练一次；经历不足一个批次时不训练
+        :return: 本次训练的损失，未训练时返回 None
+        """
         if len(self.memory) < self.config['batch_size']:
-            return
-        minibatch = random.sample(self.memory, self.config['batch_size'])
-        for state, action, reward, next_state, done in minibatch:
-            target = reward
-            if not done:
-                next_state_prediction = self.target_model.predict(next_state)
-                target += self.config['gamma'] * np.amax(next_state_prediction)
-            
-            # 确保 target_f 是一个可变的 NumPy 数组
-            target_f = tf.Variable(self.predict(state))
-            target_f = tf.reshape(target_f, (1, -1))
-            target_f = target_f.numpy()  # 转为 NumPy 数组
-            target_f[0][action] = target  # 更新动作值
-
-            # 训练模型
-            self.train_model(
-                tf.convert_to_tensor(state, dtype=tf.float32),
-                tf.convert_to_tensor(target_f, dtype=tf.float32)
-            )
-        
+            return None
+        # 回放缓冲区直接给出连续数组，每个网络只做一次前向
+        batch = self.memory.sample(self.config['batch_size'])
+        loss, td_errors = self.train_batch(batch.states, batch.actions, batch.rewards, batch.next_states,
+                                           batch.dones, batch.weights,
+                                           tf.constant(self.config['gamma'], dtype=tf.float32))
+        self.memory.update_priorities(batch.indices, td_errors.numpy())
+
         # 更新 epsilon
         if self.config['epsilon'] > self.config['epsilon_min']:
             self.config['epsilon'] *= self.config['epsilon_decay']
@@ -111,6 +179,11 @@ class DDQNScheduler:
         self.update_counter += 1
         if self.update_counter % self.update_target_frequency == 0:
             self.update_target_network()
+        if self.update_counter % self.config['publish_interval'] == 0:
+            self.publish_weights()
+        if self.checkpointer is not None:
+            self.checkpointer.maybe_save(self)
+        return float(loss)
 
 
     def update_target_network(self):
@@ -119,24 +192,60 @@ class DDQNScheduler:
 
     def schedule_pod(self, pod):
         # 调度 Pod 到节点
-        #print(89898989898)
+        node_name, _ = self._place_pod(pod)
+        return node_name
+
+    def schedule_pods(self, pods):
+        """
+        批量调度一组 Pod：依次在同一份内存中的集群状态上放置（节点资源增量更新），
+        最后在一个 etcd 事务中写入所有被修改的节点；写入失败时撤销本批次的全部放置，对应的结果标记为失败。
+        :param pods: Pod 对象列表
+        :return: 每个 Pod 的调度结果列表 [{'pod_name', 'node_name', 'reward'} 或 {'pod_name', 'node_name': None, 'error'}]
+        """
+        results = []
+        touched_nodes = []
+        placed = []  # (结果下标, Pod, 节点名称)
+        history_start = len(self.schedule_history)
+        for pod in pods:
+            node_name, error = self._place_pod(pod, sync=False)
+            if error is not None:
+                results.append({'pod_name': pod.name, 'node_name': None, 'error': error})
+                continue
+            touched_nodes.append(node_name)
+            placed.append((len(results), pod, node_name))
+            results.append({'pod_name': pod.name, 'node_name': node_name,
+                            'reward': self.schedule_history[-1]['reward']})
+        try:
+            self.node_controller.sync_nodes(touched_nodes)
+        except Exception as e:
+            logging.error(f"[DDQN-Scheduler-ERROR]: Failed to persist batch of {len(placed)} Pods, rolling back: {e}")
+            self.node_controller.rollback_placements([(pod, node_name) for _, pod, node_name in placed])
+            del self.schedule_history[history_start:]
+            for index, pod, _ in placed:
+                results[index] = {'pod_name': pod.name, 'node_name': None, 'error': f"Failed to persist placement: {e}"}
+            return results
+        logging.info(f"[DDQN-Scheduler-INFO]: Batch scheduled {len(touched_nodes)}/{len(pods)} Pods.")
+        return results
+
+    def _place_pod(self, pod, sync=True):
+        """
+        为单个 Pod 选择节点并放置，同时记录经验并训练。
+        :param sync: 是否立即将节点信息写入 etcd
+        :return: (节点名称, 错误信息)，成功时错误信息为 None
+        """
         if self.action_size != len(self.node_controller.nodes):
             self._update_action_size()  # 每次调度前动态更新 action_size
         
-        #print(123123123123123)
         state = self._get_state(pod)  # 获取当前状态，传入 Pod
-        #print("aaaaaaaaaa")
-        action = self.act(state)  # 选择动作
-        #print(565656565656)
+        action = self.act(state, self._io_net_feasible(pod))  # 选择动作
         node_name = self._get_node_from_action(action)  # 根据动作获取节点名称
         
         # 记录调度信息
         logging.info(f"[DDQN-Scheduler-INFO]: Trying to schedule Pod {pod.name} to Node {node_name}. Action: {action}")
-        #print(6666666666666666666666)
         try:
             # 尝试将 Pod 调度到选定的节点
             reward = self._calculate_reward(node_name, pod)  # 计算奖励
-            self.node_controller.schedule_pod_to_node(pod, node_name)
+            self.node_controller.schedule_pod_to_node(pod, node_name, sync=sync)
             next_state = self._get_state(pod)  # 获取下一个状态
             
             
@@ -150,20 +259,25 @@ class DDQNScheduler:
                 'timestamp': datetime.datetime.now()
             })
             done = False  # 结束标志
-            self.remember(state, action, reward, next_state, done)  # 记住经历
-            self.replay()  # 进行回放训练
+            if self.learner is not None:
+                self.learner.submit(state, action, reward, next_state, done)  # 交给后台线程记忆并训练
+            else:
+                self.remember(state, action, reward, next_state, done)  # 记住经历
+                self.replay()  # 进行回放训练
         
         except Exception as e:
             logging.error(f"[DDQN-Scheduler-ERROR]: Failed to schedule Pod {pod.name} to Node {node_name}: {e}")  # 记录错误
+            return node_name, str(e)
 
-        return node_name
+        return node_name, None
 
     def _get_state(self, pod):
         # 获取当前系统状态，并加入 Pod 的资源需求
         states = []
-        required_cpu = self.parse_cpu(pod.resources.get('requests', {}).get('cpu', 0)) 
-        required_memory = self.parse_memory(pod.resources.get('requests', {}).get('memory', 0)) 
-        required_gpu = self.parse_gpu(pod.resources.get('requests', {}).get('gpu', 0) )
+        required_resources = self._required_resources(pod)
+        required_cpu = required_resources['cpu']
+        required_memory = required_resources['memory']
+        required_gpu = required_resources['gpu']
         for node in self.node_controller.nodes.values():
             states.append([
                 node.allocated_cpu,
@@ -178,6 +292,30 @@ class DDQNScheduler:
             ])
         return np.array(states).reshape(1, -1)
 
+    def _required_resources(self, pod):
+        """从 Pod 的资源请求向量中获取需求（CPU 换算为核心数，内存为字节）。
+        io、net 不在状态向量中，由 _io_net_feasible 与 _calculate_reward 单独检查。"""
+        requests = pod.request_vector
+        return {
+            'cpu': requests.cpu / 1000,
+            'memory': requests.memory,
+            'gpu': requests.gpu,
+            'io': requests.io,
+            'net': requests.net
+        }
+
+    def _io_net_feasible(self, pod):
+        """
+        各节点（按 nodes 顺序）剩余 io、net 是否满足 Pod 的请求，与 Node.add_pod 的检查一致.
+        :return: 布尔数组；Pod 不请求 io、net 时返回 None
+        """
+        required = self._required_resources(pod)
+        if not required['io'] and not required['net']:
+            return None
+        return np.array([node.total_io - node.allocated_io >= required['io'] and
+                         node.total_net - node.allocated_net >= required['net']
+                         for node in self.node_controller.nodes.values()])
+
     def _get_node_from_action(self, action):
         # 根据动作获取节点名称
         node_names = list(self.node_controller.nodes.keys())
@@ -188,9 +326,10 @@ class DDQNScheduler:
         node = self.node_controller.get_node(node_name)  # 获取节点信息
         if node.status == "Ready":  # 如果节点状态为就绪
             # 检查节点是否能满足 Pod 的资源需求
-            required_cpu = self.parse_cpu(pod.resources.get('requests', {}).get('cpu', 0)) 
-            required_memory = self.parse_memory(pod.resources.get('requests', {}).get('memory', 0)) 
-            required_gpu = self.parse_gpu(pod.resources.get('requests', {}).get('gpu', 0) )
+            required_resources = self._required_resources(pod)
+            required_cpu = required_resources['cpu']
+            required_memory = required_resources['memory']
+            required_gpu = required_resources['gpu']
             if (node.total_cpu - node.allocated_cpu) < required_cpu or \
                (node.total_memory - node.allocated_memory) < required_memory or \
                (node.total_gpu - node.allocated_gpu) < required_gpu:
@@ -199,6 +338,12 @@ class DDQNScheduler:
                 print(f"Remaining Memory: {node.total_memory - node.allocated_memory}, Required: {required_memory}")
                 print(f"Remaining GPU: {node.total_gpu - node.allocated_gpu}, Required: {required_gpu}")
                 return -1  # 资源不足，给予负奖励
+            feasible = self._io_net_feasible(pod)
+            if feasible is not None and not feasible[list(self.node_controller.nodes).index(node_name)]:
+                print(f"Node {node.name} insufficient io/net: "
+                      f"Remaining IO: {node.total_io - node.allocated_io}, Required: {required_resources['io']}, "
+                      f"Remaining Net: {node.total_net - node.allocated_net}, Required: {required_resources['net']}")
+                return -1
             
             cpu_usage_ratio = node.allocated_cpu / node.total_cpu if node.total_cpu > 0 else 0
             memory_usage_ratio = node.allocated_memory / node.total_memory if node.total_memory > 0 else 0
@@ -206,14 +351,10 @@ class DDQNScheduler:
             
             reward = 1 - (cpu_usage_ratio + memory_usage_ratio + gpu_usage_ratio) / 3  # 计算基础奖励
 
-            # 负载均衡因子
-            cpu_utilizations = [n.allocated_cpu / n.total_cpu if n.total_cpu > 0 else 0 for n in self.node_controller.nodes.values()]
-            memory_utilizations = [n.allocated_memory / n.total_memory if n.total_memory > 0 else 0 for n in self.node_controller.nodes.values()]
-            gpu_utilizations = [n.allocated_gpu / n.total_gpu if n.total_gpu > 0 else 0 for n in self.node_controller.nodes.values()]
-            
-            cpu_load_balance_factor = 1 / (1 + np.std(cpu_utilizations))  # CPU 负载均衡因子
-            memory_load_balance_factor = 1 / (1 + np.std(memory_utilizations))  # 内存负载均衡因子
-            gpu_load_balance_factor = 1 / (1 + np.std(gpu_utilizations))  # GPU 负载均衡因子
+            # 负载均衡因子（由 NodeController 增量维护的使用率统计得到，O(1)）
+            (cpu_load_balance_factor,
+             memory_load_balance_factor,
+             gpu_load_balance_factor) = self.node_controller.load_balance_stats.balance_factors()
 
             # 加权综合奖励
             reward += (cpu_load_balance_factor + memory_load_balance_factor + gpu_load_balance_factor) / 3 * 0.5
@@ -224,46 +365,15 @@ class DDQNScheduler:
     
     def parse_cpu(self, cpu_str):
         """解析 CPU 请求，返回核心数"""
-        if isinstance(cpu_str, str):
-            match = re.match(r"(\d+)(m|)", cpu_str)
-            if match:
-                cpu_value, unit = match.groups()
-                cpu_value = float(cpu_value)
-                if unit == 'm':  # 如果是毫核，转换为核心数
-                    return cpu_value / 1000  # 毫核转换为核心数
-                else:
-                    return cpu_value  # 核心数本身
-        return 0.0
+        return quantity.parse_cpu(cpu_str) / 1000
 
     def parse_memory(self, mem_str):
         """解析内存请求，返回字节数"""
-        if isinstance(mem_str, str):
-            match = re.match(r"(\d+)(Ki|Mi|Gi|Ti)", mem_str)
-            if match:
-                mem_value, unit = match.groups()
-                mem_value = float(mem_value)
-                if unit == 'Ki':  # KiB -> 字节
-                    return int(mem_value * 1024)
-                elif unit == 'Mi':  # MiB -> 字节
-                    return int(mem_value * 1024 * 1024)
-                elif unit == 'Gi':  # GiB -> 字节
-                    return int(mem_value * 1024 * 1024 * 1024)
-                elif unit == 'Ti':  # TiB -> 字节
-                    return int(mem_value * 1024 * 1024 * 1024 * 1024)
-        return 0
+        return quantity.parse_memory(mem_str)
 
     def parse_gpu(self, gpu_str):
         """解析 GPU 请求，返回 GPU 数量"""
-        if isinstance(gpu_str, str):
-            match = re.match(r"(\d+)(Gpu|)", gpu_str, re.IGNORECASE)  # 匹配数字和 'Gpu' 或空
-            if match:
-                gpu_value, unit = match.groups()
-                gpu_value = int(gpu_value)
-                if unit.lower() == 'gpu':  # 如果单位为 'GPU'，直接返回数量
-                    return gpu_value
-                else:
-                    return gpu_value  # 如果没有单位，也直接返回数量
-        return 0  # 默认返回 0，表示没有请求 GPU
+        return quantity.parse_gpu(gpu_str)
 
     def calculate_score(self, state):
         """
@@ -295,20 +405,23 @@ class DDQNScheduler:
 
         return score
 
-    def select_best_node(self, states):
+    def select_best_node(self, states, feasible=None):
         """
         选择最佳节点
         :param states: 所有节点的状态二维数组 (1, nodes_length * features)
-        :return: 最佳节点的序号（0 到 nodes_length-1）
+        :param feasible: 各节点是否满足 io、net 请求的布尔数组，None 表示不限制
+        :return: 最佳节点的序号（0 到 nodes_length-1），没有可用节点时为 -1
         """
         # 将二维数组转化为单节点状态列表
-        num_nodes = states.shape[1] // 9  # 每个节点状态有 9 个特征
-        reshaped_states = states.reshape(num_nodes, 9)
+        num_nodes = states.shape[1] // NODE_FEATURES
+        reshaped_states = states.reshape(num_nodes, NODE_FEATURES)
 
         best_node_index = -1
         best_score = float('inf')  # 初始化为正无穷
 
         for index, state in enumerate(reshaped_states):
+            if feasible is not None and not feasible[index]:
+                continue
             score = self.calculate_score(state)
             if score < best_score:
                 best_score = score
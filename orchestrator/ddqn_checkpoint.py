@@ -0,0 +1,169 @@
+import glob
+import json
+import logging
+import os
+import re
+import tempfile
+import numpy as np
+import yaml
+
+DEFAULT_CONFIG_FILE = 'config/config.yaml'
+DEFAULT_CHECKPOINT_DIR = 'checkpoints/ddqn'
+# 每训练多少步保存一次
+DEFAULT_CHECKPOINT_INTERVAL = 100
+# 保留最近的检查点数量
+DEFAULT_KEEP = 3
+CHECKPOINT_PATTERN = re.compile(r'^ckpt-(\d+)\.npz$')
+
+
+class DDQNCheckpointer:
+    def __init__(self, directory=DEFAULT_CHECKPOINT_DIR, interval=DEFAULT_CHECKPOINT_INTERVAL, keep=DEFAULT_KEEP):
+        """
+        DDQN 调度器的检查点：在线/目标网络权重、优化器状态、epsilon 与更新计数器保存为
+        {directory}/ckpt-{训练步数}.npz。先写同目录临时文件并 fsync，再 os.replace 原子替换，
+        进程在写入过程中退出也不会留下损坏的检查点。启动时加载最新的、与当前网络结构兼容的检查点。
+        :param directory: 检查点目录
+        :param interval: 每训练 interval 步保存一次
+        :param keep: 保留最近的检查点数量
+        """
+        if interval <= 0 or keep <= 0:
+            raise ValueError(f"Invalid checkpoint interval {interval} or keep {keep}.")
+        self.directory = directory
+        self.interval = interval
+        self.keep = keep
+
+    def checkpoints(self):
+        """:return: [(训练步数, 路径)]，按步数从新到旧排列"""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for name in os.listdir(self.directory):
+            match = CHECKPOINT_PATTERN.match(name)
+            if match:
+                found.append((int(match.group(1)), os.path.join(self.directory, name)))
+        return sorted(found, reverse=True)
+
+    def maybe_save(self, scheduler):
+        """训练步数到达 interval 的整数倍时保存；返回检查点路径，未保存时返回 None."""
+        if scheduler.update_counter % self.interval != 0:
+            return None
+        try:
+            return self.save(scheduler)
+        except Exception as e:
+            logging.error(f"Failed to save DDQN checkpoint to {self.directory}: {e}")
+            return None
+
+    def save(self, scheduler):
+        os.makedirs(self.directory, exist_ok=True)
+        meta = {
+            'epsilon': scheduler.config['epsilon'],
+            'update_counter': scheduler.update_counter,
+        }
+        arrays = {'meta': np.array(json.dumps(meta))}
+        for prefix, weights in (('model', scheduler.model.get_weights()),
+                                ('target', scheduler.target_model.get_weights()),
+                                ('optimizer', [v.numpy() for v in scheduler.model.optimizer.variables])):
+            for i, weight in enumerate(weights):
+                arrays[f'{prefix}_{i}'] = weight
+        path = os.path.join(self.directory, f'ckpt-{scheduler.update_counter:08d}.npz')
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.ckpt-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._fsync_directory()
+        self._prune()
+        logging.info(f"Saved DDQN checkpoint {path}.")
+        return path
+
+    def restore(self, scheduler):
+        """
+        从最新的兼容检查点恢复调度器；损坏或网络结构不一致的检查点被跳过.
+        :return: 加载的检查点路径，没有可用检查点时返回 None
+        """
+        for stale in glob.glob(os.path.join(self.directory, '.ckpt-*.tmp')):
+            os.unlink(stale)
+        for _, path in self.checkpoints():
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    arrays = {name: data[name] for name in data.files}
+                meta = json.loads(str(arrays.pop('meta')))
+                model = self._load_list(arrays, 'model')
+                target = self._load_list(arrays, 'target')
+                optimizer = self._load_list(arrays, 'optimizer')
+            except Exception as e:
+                logging.warning(f"Skipping unreadable DDQN checkpoint {path}: {e}")
+                continue
+            if not self._compatible(scheduler.model, model) or not self._compatible(scheduler.target_model, target):
+                logging.warning(f"Skipping DDQN checkpoint {path}: network shape does not match.")
+                continue
+            scheduler.model.set_weights(model)
+            scheduler.target_model.set_weights(target)
+            self._restore_optimizer(scheduler.model, optimizer)
+            scheduler.config['epsilon'] = meta['epsilon']
+            scheduler.update_counter = meta['update_counter']
+            logging.info(f"Restored DDQN scheduler from {path} (step {scheduler.update_counter}, "
+                         f"epsilon {scheduler.config['epsilon']:.3f}).")
+            return path
+        return None
+
+    @staticmethod
+    def _load_list(arrays, prefix):
+        count = sum(1 for name in arrays if name.startswith(f'{prefix}_'))
+        return [arrays[f'{prefix}_{i}'] for i in range(count)]
+
+    @staticmethod
+    def _compatible(model, weights):
+        current = model.get_weights()
+        return len(current) == len(weights) and all(a.shape == b.shape for a, b in zip(current, weights))
+
+    @staticmethod
+    def _restore_optimizer(model, values):
+        optimizer = model.optimizer
+        # 优化器变量在第一次更新时才创建，恢复前先按模型变量创建
+        if not optimizer.built:
+            optimizer.build(model.trainable_variables)
+        variables = optimizer.variables
+        if len(variables) != len(values) or any(tuple(v.shape) != a.shape for v, a in zip(variables, values)):
+            logging.warning("DDQN checkpoint optimizer state does not match, keeping a fresh optimizer.")
+            return
+        for variable, value in zip(variables, values):
+            variable.assign(value)
+
+    def _fsync_directory(self):
+        # rename 的持久化依赖目录项落盘；不支持对目录 fsync 的平台上忽略
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _prune(self):
+        for _, path in self.checkpoints()[self.keep:]:
+            try:
+                os.unlink(path)
+            except OSError as e:
+                logging.warning(f"Failed to remove old DDQN checkpoint {path}: {e}")
+
+
+def load_checkpointer(config_file=DEFAULT_CONFIG_FILE):
+    """按配置文件中的 ddqn_checkpoint 段创建检查点管理器（默认启用），enabled 为 false 时返回 None."""
+    options = {}
+    try:
+        with open(config_file, 'r') as f:
+            options = dict((yaml.safe_load(f) or {}).get('ddqn_checkpoint') or {})
+    except Exception as e:
+        logging.warning(f"Failed to load DDQN checkpoint config from {config_file}: {e}")
+    if not options.pop('enabled', True):
+        return None
+    return DDQNCheckpointer(**options)
@@ -0,0 +1,114 @@
+import logging
+import queue
+import threading
+import numpy as np
+import yaml
+
+DEFAULT_CONFIG_FILE = 'config/config.yaml'
+# 等待训练的经历上限，学习线程跟不上时丢弃新经历而不是阻塞调度请求
+DEFAULT_MAX_PENDING = 10000
+# 队列为空时检查停止标志的间隔（秒）
+DEFAULT_IDLE_INTERVAL = 0.1
+
+
+class DDQNLearner:
+    def __init__(self, scheduler, max_pending=DEFAULT_MAX_PENDING, idle_interval=DEFAULT_IDLE_INTERVAL):
+        """
+        DDQN 后台学习线程：调度请求只把经历放入队列，由本线程写入经验回放并逐条训练
+        （每条新经历一次 replay，与同步训练的频率相同）。训练后的权重由 DDQNScheduler.replay
+        发布为只读快照，请求路径上的推理只读取快照，不会等待训练。
+        经验回放缓冲区只由本线程访问。
+        :param scheduler: DDQNScheduler 实例
+        :param max_pending: 队列中等待训练的经历上限
+        :param idle_interval: 队列为空时检查停止标志的间隔（秒）
+        """
+        self.scheduler = scheduler
+        self.idle_interval = idle_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._loop, name="ddqn-learner", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止学习线程；队列中尚未训练的经历被丢弃（计入 dropped），等待中的 flush 随即返回."""
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        discarded = 0
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            discarded += 1
+        if discarded:
+            self.dropped += discarded
+            logging.warning(f"DDQN learner stopped with {discarded} untrained transitions, discarded them.")
+
+    def submit(self, state, action, reward, next_state, done):
+        """提交一条经历，不阻塞；队列已满时丢弃并返回 False."""
+        try:
+            self._queue.put_nowait((state, action, reward, next_state, done))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logging.warning(f"DDQN learner is falling behind, dropped transition ({self.dropped} in total).")
+            return False
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        """
+        阻塞直到已提交的经历全部训练完成.
+        :return: 是否全部训练完成；学习线程未运行或等待期间被停止时立即返回 False
+        """
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                if self._thread is None or self._stopped.is_set():
+                    return False
+                self._queue.all_tasks_done.wait(self.idle_interval)
+        return True
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            try:
+                transition = self._queue.get(timeout=self.idle_interval)
+            except queue.Empty:
+                continue
+            try:
+                self._learn(transition)
+            except Exception as e:
+                logging.error(f"DDQN background training failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _learn(self, transition):
+        memory = self.scheduler.memory
+        state_size = np.size(transition[0])
+        # 节点数变化后旧经历的状态维度不同，无法与新经历组成批次
+        if memory.state_size is not None and memory.state_size != state_size:
+            memory.clear(state_size)
+        memory.append(*transition)
+        self.scheduler.replay()
+
+
+def load_learner(scheduler, config_file=DEFAULT_CONFIG_FILE):
+    """按配置文件中的 ddqn_learner 段为调度器启动后台学习线程（默认启用），enabled 为 false 时返回 None."""
+    options = {}
+    try:
+        with open(config_file, 'r') as f:
+            options = dict((yaml.safe_load(f) or {}).get('ddqn_learner') or {})
+    except Exception as e:
+        logging.warning(f"Failed to load DDQN learner config from {config_file}: {e}")
+    if not options.pop('enabled', True):
+        return None
+    return scheduler.start_learner(**options)
@@ -0,0 +1,58 @@
+import logging
+import numpy as np
+from etcd import storage_schema
+from etcd.informer import Informer
+
+# 与 kube-scheduler 的 ImageLocality 插件一致：每个容器的镜像得分在 [23MiB, 1000MiB] 区间内线性映射到 [0, 1]，
+# 过小的镜像拉取很快，不值得为其牺牲负载均衡
+MIN_IMAGE_SIZE = 23 * 1024 ** 2
+MAX_IMAGE_SIZE = 1000 * 1024 ** 2
+
+
+def create_image_informer(etcd_client):
+    """监听 images/ 的 Informer，按镜像建立 镜像 -> 节点 的倒排索引，随 watch 事件增量更新."""
+    return Informer(etcd_client, storage_schema.IMAGE_PREFIX,
+                    indexers={'image': lambda key, state: list(state.get('images', {}))})
+
+
+class ImageLocality:
+    def __init__(self, informer, min_size=MIN_IMAGE_SIZE, max_size=MAX_IMAGE_SIZE):
+        """
+        镜像局部性打分：Pod 所需镜像已缓存在节点上时，按镜像大小给该节点加分，减少冷启动时的镜像拉取。
+        镜像大小乘以持有该镜像的节点比例（spread），避免所有 Pod 都集中到少数已有镜像的节点上。
+        :param informer: create_image_informer() 创建的 Informer
+        :param min_size: 每个容器的得分下限（字节），低于该值时得分为 0
+        :param max_size: 每个容器的得分上限（字节），达到该值时得分为 1
+        """
+        self.informer = informer
+        self.min_size = min_size
+        self.max_size = max_size
+
+    def scores(self, node_names, images, index=None):
+        """
+        :param node_names: 节点名称列表，通常为 NodeResourceMatrix.names
+        :param images: Pod 各容器的镜像名称列表
+        :param index: 节点名称 -> 在 node_names 中的下标，通常为 NodeResourceMatrix.index；未提供时按 node_names 构造
+        :return: 与 node_names 对应的 [0, 1] 得分数组，越大表示节点上已有的镜像越多
+        """
+        sums = np.zeros(len(node_names), dtype=np.float64)
+        if not node_names or not images:
+            return sums
+        rows = index if index is not None else {name: i for i, name in enumerate(node_names)}
+        for image in set(images):
+            states, _ = self.informer.list('image', image)
+            holders = [(rows[state['node']], state['images'][image]) for state in states
+                       if state.get('node') in rows]
+            spread = len(holders) / len(node_names)
+            for row, size in holders:
+                sums[row] += size * spread
+        max_size = self.max_size * len(images)
+        return (np.clip(sums, self.min_size, max_size) - self.min_size) / (max_size - self.min_size)
+
+    def node_images(self, node_name):
+        """:return: 节点上报的镜像名称 -> 大小；未上报时返回空字典"""
+        state = self.informer.get(storage_schema.image_state_key(node_name))
+        if state is None:
+            logging.debug(f"Node {node_name} has not reported its images.")
+            return {}
+        return dict(state.get('images', {}))
@@ -1,7 +1,8 @@
 import logging
-import re,datetime
+import datetime
 from node.node_controller import NodeController
 import numpy as np
+from utils import quantity
 import matplotlib.pyplot as plt
 import os
 
@@ -11,13 +12,16 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 
 class Kube_Scheduler_Plus:
-    def __init__(self, node_controller: NodeController, weights=None):
+    def __init__(self, node_controller: NodeController, weights=None, image_locality=None):
         """
         初始化 KubeSchedulerPlus，连接 NodeController 并加载节点信息。
         :param node_controller: NodeController 实例
-        :param weights: 资源权重字典（例如: {'cpu': 1.0, 'gpu': 2.0, 'memory': 1.5}）
+        :param weights: 资源权重字典（例如: {'cpu': 1.0, 'gpu': 2.0, 'memory': 1.5}），
+                        'image' 为镜像局部性得分的权重，默认 1.0
+        :param image_locality: ImageLocality 实例；提供时已缓存 Pod 所需镜像的节点评分更优
         """
         self.node_controller = node_controller
+        self.image_locality = image_locality
         self.weights = weights or {
             'cpu': 1.0,
             'gpu': 1.0,
@@ -26,14 +30,10 @@ class Kube_Scheduler_Plus:
         self.schedule_history = []  # 每次调度的 Pod 名称、目标节点、奖励和时间戳
 
     def filter_nodes(self, required_resources):
-        """过滤可用节点，检查状态和资源是否充足。"""
-        available_nodes = []
-        for node in self.node_controller.nodes.values():
-            if node.status != 'Ready':
-                continue
-            if self._has_sufficient_resources(node, required_resources):
-                available_nodes.append(node)
-        return available_nodes
+        """过滤可用节点，检查状态和资源是否充足（基于节点资源矩阵的一次向量运算）。"""
+        matrix = self.node_controller.resource_matrix
+        mask = matrix.feasible_mask(required_resources)
+        return [self.node_controller.nodes[matrix.names[i]] for i in np.flatnonzero(mask)]
 
     def _has_sufficient_resources(self, node, required_resources):
         """
@@ -54,8 +54,9 @@ class Kube_Scheduler_Plus:
             return False  # 资源不足，返回 False
         return True  # 资源充足，返回 True
 
-    def calculate_score(self, node):
-        """计算节点的资源负载综合评分。"""
+    def calculate_score(self, node, images=None, locality_bias=None):
+        """计算节点的资源负载综合评分；提供 Pod 的镜像列表时减去镜像局部性加分。
+        locality_bias 为该节点已算好的镜像局部性加分，提供时不再按 images 重新计算。"""
         total_score = 0
         cpu_ratio=node.allocated_cpu / node.total_cpu if node.total_cpu > 0 else 0
         total_score += cpu_ratio * self.weights.get('cpu', 1.0)
@@ -63,33 +64,75 @@ class Kube_Scheduler_Plus:
         total_score += gpu_ratio * self.weights.get('gpu', 1.0)
         mem_ratio=node.allocated_memory / node.total_memory if node.total_memory > 0 else 0
         total_score += mem_ratio * self.weights.get('mem', 1.0)
+        if locality_bias is None:
+            bias = self._locality_bias(images)
+            if bias is not None:
+                locality_bias = bias[self.node_controller.resource_matrix.index[node.name]]
+        if locality_bias is not None:
+            total_score += locality_bias
         return total_score
 
-    def prioritize_nodes(self, available_nodes):
-        """对可用节点进行优选排序。"""
-        return sorted(available_nodes, key=self.calculate_score)
+    def prioritize_nodes(self, available_nodes, images=None):
+        """对可用节点进行优选排序；镜像局部性加分对所有节点只计算一次。"""
+        bias = self._locality_bias(images)
+        if bias is None:
+            return sorted(available_nodes, key=self.calculate_score)
+        index = self.node_controller.resource_matrix.index
+        return sorted(available_nodes, key=lambda node: self.calculate_score(node, locality_bias=bias[index[node.name]]))
+
+    def _score_weights(self):
+        """与 calculate_score 保持一致的各资源权重，用于矩阵打分。"""
+        return {
+            'cpu': self.weights.get('cpu', 1.0),
+            'gpu': self.weights.get('gpu', 1.0),
+            'memory': self.weights.get('mem', 1.0),
+        }
+
+    def _locality_bias(self, images):
+        """镜像局部性加分（取负值，越低越优），与资源矩阵的行顺序对应；未启用或无镜像时返回 None。"""
+        if self.image_locality is None or not images:
+            return None
+        matrix = self.node_controller.resource_matrix
+        return -self.weights.get('image', 1.0) * self.image_locality.scores(matrix.names, images, matrix.index)
+
+    def _pod_images(self, pod):
+        return [container.image for container in getattr(pod, 'containers', []) if getattr(container, 'image', None)]
+
+    def select_node(self, required_resources, images=None):
+        """
+        在节点资源矩阵上一次性完成过滤与打分，返回评分最低的可行节点。
+        :param images: Pod 各容器的镜像，用于镜像局部性打分
+        :return: Node 对象；没有可行节点时返回 None
+        """
+        node_name = self.node_controller.resource_matrix.select(required_resources, self._score_weights(),
+                                                                self._locality_bias(images))
+        if node_name is None:
+            return None
+        return self.node_controller.nodes[node_name]
+
+    def _required_resources(self, pod):
+        """从 Pod 的资源请求向量中获取需求（CPU 换算为核心数，内存为字节）。
+        io、net 与 Node.add_pod 的检查保持一致，过滤时一并考虑。"""
+        requests = pod.request_vector
+        return {
+            'cpu': requests.cpu / 1000,
+            'memory': requests.memory,
+            'gpu': requests.gpu,
+            'io': requests.io,
+            'net': requests.net
+        }
 
     def schedule_pod(self, pod):
         """为 Pod 选择合适的节点。"""
         # 从 Pod 中获取资源需求
-        required_resources = {
-            'cpu': self.parse_cpu(pod.resources.get('requests', {}).get('cpu', "0")),
-            'memory': self.parse_memory(pod.resources.get('requests', {}).get('memory', "0")),
-            'gpu': self.parse_gpu(pod.resources.get('requests', {}).get('gpu', 0))
-        }
+        required_resources = self._required_resources(pod)
 
-        # 过滤节点，找到满足资源需求的可用节点
-        available_nodes = self.filter_nodes(required_resources)
-        if not available_nodes:
+        # 过滤并打分，选择负载评分最低的可用节点
+        selected_node = self.select_node(required_resources, self._pod_images(pod))
+        if selected_node is None:
             logging.error("No available nodes with sufficient resources.")
             raise Exception("No available nodes with sufficient resources.")
 
-        # 根据负载评分对节点进行优先级排序
-        prioritized_nodes = self.prioritize_nodes(available_nodes)
-
-        # 选择优先级最高的节点
-        selected_node = prioritized_nodes[0]
-
         logging.info(f"Scheduled Pod {pod.name} on node {selected_node.name}.")
 
         # 调用 NodeController 将 Pod 调度到目标节点
@@ -105,57 +148,78 @@ class Kube_Scheduler_Plus:
         logging.info(f"[DDQN-Scheduler-INFO]: Pod {pod.name} scheduled to Node {selected_node.name} with reward: {reward}")
         return selected_node.name
 
+    def schedule_pods(self, pods):
+        """
+        批量调度一组 Pod：一次性解析全部资源需求，在同一份集群快照上依次放置，
+        每次放置后节点资源矩阵增量更新，最后在一个 etcd 事务中写入所有被修改的节点。
+        写入失败时撤销本批次的全部放置，对应的结果标记为失败。
+        :param pods: Pod 对象列表
+        :return: 每个 Pod 的调度结果列表 [{'pod_name', 'node_name', 'reward'} 或 {'pod_name', 'node_name': None, 'error'}]
+        """
+        requests = [(pod, self._required_resources(pod)) for pod in pods]
+        results = []
+        touched_nodes = []
+        placed = []  # (结果下标, Pod, 节点名称)
+        history_start = len(self.schedule_history)
+
+        for pod, required_resources in requests:
+            selected_node = self.select_node(required_resources, self._pod_images(pod))
+            if selected_node is None:
+                logging.error(f"No available nodes with sufficient resources for Pod {pod.name}.")
+                results.append({'pod_name': pod.name, 'node_name': None,
+                                'error': "No available nodes with sufficient resources."})
+                continue
+            try:
+                reward = self._calculate_reward(selected_node.name, pod)
+                self.node_controller.schedule_pod_to_node(pod, selected_node.name, sync=False)
+            except Exception as e:
+                logging.error(f"Failed to schedule Pod {pod.name} on node {selected_node.name}: {e}")
+                results.append({'pod_name': pod.name, 'node_name': None, 'error': str(e)})
+                continue
+
+            touched_nodes.append(selected_node.name)
+            placed.append((len(results), pod, selected_node.name))
+            self.schedule_history.append({
+                'pod_name': pod.name,
+                'node_name': selected_node.name,
+                'reward': reward,
+                'timestamp': datetime.datetime.now()
+            })
+            results.append({'pod_name': pod.name, 'node_name': selected_node.name, 'reward': reward})
+
+        try:
+            self.node_controller.sync_nodes(touched_nodes)
+        except Exception as e:
+            logging.error(f"Failed to persist batch of {len(placed)} Pods, rolling back: {e}")
+            self.node_controller.rollback_placements([(pod, node_name) for _, pod, node_name in placed])
+            del self.schedule_history[history_start:]
+            for index, pod, _ in placed:
+                results[index] = {'pod_name': pod.name, 'node_name': None, 'error': f"Failed to persist placement: {e}"}
+            return results
+        logging.info(f"Batch scheduled {len(touched_nodes)}/{len(requests)} Pods onto {len(set(touched_nodes))} nodes.")
+        return results
+
     def parse_cpu(self, cpu_str):
         """解析 CPU 请求，返回核心数"""
-        if isinstance(cpu_str, str):
-            match = re.match(r"(\d+)(m|)", cpu_str)
-            if match:
-                cpu_value, unit = match.groups()
-                cpu_value = float(cpu_value)
-                if unit == 'm':  # 如果是毫核，转换为核心数
-                    return cpu_value / 1000
-                return cpu_value
-        logging.warning(f"Invalid CPU format: {cpu_str}")
-        return 0.0
+        return quantity.parse_cpu(cpu_str) / 1000
 
     def parse_memory(self, mem_str):
         """解析内存请求，返回字节数"""
-        if isinstance(mem_str, str):
-            match = re.match(r"(\d+)(Ki|Mi|Gi|Ti|)", mem_str)
-            if match:
-                mem_value, unit = match.groups()
-                mem_value = float(mem_value)
-                unit_conversion = {
-                    'Ki': 1024,
-                    'Mi': 1024 ** 2,
-                    'Gi': 1024 ** 3,
-                    'Ti': 1024 ** 4,
-                }
-                return int(mem_value * unit_conversion.get(unit, 1))  # 默认为字节
-        logging.warning(f"Invalid memory format: {mem_str}")
-        return 0
+        return quantity.parse_memory(mem_str)
     
     def parse_gpu(self, gpu_str):
         """解析 GPU 请求，返回 GPU 数量"""
-        if isinstance(gpu_str, str):
-            match = re.match(r"(\d+)(Gpu|)", gpu_str, re.IGNORECASE)  # 匹配数字和 'Gpu' 或空
-            if match:
-                gpu_value, unit = match.groups()
-                gpu_value = int(gpu_value)
-                if unit.lower() == 'gpu':  # 如果单位为 'GPU'，直接返回数量
-                    return gpu_value
-                else:
-                    return gpu_value  # 如果没有单位，也直接返回数量
-        return 0  # 默认返回 0，表示没有请求 GPU
+        return quantity.parse_gpu(gpu_str)
     
     def _calculate_reward(self, node_name, pod):
         # 计算调度到指定节点的奖励
         node = self.node_controller.get_node(node_name)  # 获取节点信息
         if node.status == "Ready":  # 如果节点状态为就绪
             # 检查节点是否能满足 Pod 的资源需求
-            required_cpu = self.parse_cpu(pod.resources.get('requests', {}).get('cpu', 0)) 
-            required_memory = self.parse_memory(pod.resources.get('requests', {}).get('memory', 0)) 
-            required_gpu = self.parse_gpu(pod.resources.get('requests', {}).get('gpu', 0) )
+            required_resources = self._required_resources(pod)
+            required_cpu = required_resources['cpu']
+            required_memory = required_resources['memory']
+            required_gpu = required_resources['gpu']
             if (node.total_cpu - node.allocated_cpu) < required_cpu or \
                (node.total_memory - node.allocated_memory) < required_memory or \
                (node.total_gpu - node.allocated_gpu) < required_gpu:
@@ -171,14 +235,10 @@ class Kube_Scheduler_Plus:
             
             reward = 1 - (cpu_usage_ratio + memory_usage_ratio + gpu_usage_ratio) / 3  # 计算基础奖励
 
-            # 负载均衡因子
-            cpu_utilizations = [n.allocated_cpu / n.total_cpu if n.total_cpu > 0 else 0 for n in self.node_controller.nodes.values()]
-            memory_utilizations = [n.allocated_memory / n.total_memory if n.total_memory > 0 else 0 for n in self.node_controller.nodes.values()]
-            gpu_utilizations = [n.allocated_gpu / n.total_gpu if n.total_gpu > 0 else 0 for n in self.node_controller.nodes.values()]
-            
-            cpu_load_balance_factor = 1 / (1 + np.std(cpu_utilizations))  # CPU 负载均衡因子
-            memory_load_balance_factor = 1 / (1 + np.std(memory_utilizations))  # 内存负载均衡因子
-            gpu_load_balance_factor = 1 / (1 + np.std(gpu_utilizations))  # GPU 负载均衡因子
+            # 负载均衡因子（由 NodeController 增量维护的使用率统计得到，O(1)）
+            (cpu_load_balance_factor,
+             memory_load_balance_factor,
+             gpu_load_balance_factor) = self.node_controller.load_balance_stats.balance_factors()
 
             # 加权综合奖励
             reward += (cpu_load_balance_factor + memory_load_balance_factor + gpu_load_balance_factor) / 3 * 0.5
@@ -0,0 +1,175 @@
+import logging
+from collections import namedtuple
+import numpy as np
+
+# 一次采样得到的批次；indices 用于回写优先级，weights 为重要性采样权重（均匀采样时全为 1）
+ReplayBatch = namedtuple('ReplayBatch', ['states', 'actions', 'rewards', 'next_states', 'dones', 'indices', 'weights'])
+
+
+class ReplayBuffer:
+    def __init__(self, capacity, state_size=None, seed=None):
+        """
+        预分配的环形经验回放缓冲区：state / next_state 存放在连续的 float32 数组中，
+        action / reward / done 各占一个数组，插入 O(1)，采样为一次向量化的索引。
+        :param capacity: 最多保存的经历数，写满后覆盖最旧的经历
+        :param state_size: 状态向量长度；为 None 时在第一次插入时按状态大小分配
+        :param seed: 采样用随机数种子
+        """
+        if capacity <= 0:
+            raise ValueError(f"Replay buffer capacity must be positive, got {capacity}.")
+        self.capacity = capacity
+        self.state_size = None
+        self._rng = np.random.default_rng(seed)
+        self._size = 0
+        self._next = 0
+        if state_size is not None:
+            self._allocate(state_size)
+
+    def _allocate(self, state_size):
+        self.state_size = state_size
+        self.states = np.zeros((self.capacity, state_size), dtype=np.float32)
+        self.next_states = np.zeros((self.capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(self.capacity, dtype=np.int32)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.dones = np.zeros(self.capacity, dtype=np.float32)
+        logging.debug(f"Allocated replay buffer of {self.capacity} x {state_size} "
+                      f"({self.states.nbytes * 2 / 1024 ** 2:.1f} MiB of states).")
+
+    def __len__(self):
+        return self._size
+
+    def append(self, state, action, reward, next_state, done):
+        """写入一条经历；state / next_state 可以是任意形状，按展开后的长度存储.
+        :return: 该经历在缓冲区中的位置
+        """
+        state = np.asarray(state, dtype=np.float32).reshape(-1)
+        next_state = np.asarray(next_state, dtype=np.float32).reshape(-1)
+        if self.state_size is None:
+            self._allocate(state.size)
+        if state.size != self.state_size or next_state.size != self.state_size:
+            raise ValueError(f"Expected states of size {self.state_size}, "
+                             f"got {state.size} and {next_state.size}.")
+        index = self._next
+        self.states[index] = state
+        self.next_states[index] = next_state
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.dones[index] = float(done)
+        self._next = (index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return index
+
+    def clear(self, state_size=None):
+        """清空缓冲区；state_size 变化（例如节点数变化）时按新的大小重新分配."""
+        self._size = 0
+        self._next = 0
+        if state_size is not None and state_size != self.state_size:
+            self._allocate(state_size)
+        elif state_size is None and self.state_size is not None:
+            # 未指定大小时释放数组，下一次插入时按新状态大小分配
+            self.state_size = None
+            del self.states, self.next_states, self.actions, self.rewards, self.dones
+
+    def _batch(self, indices, weights):
+        return ReplayBatch(self.states[indices], self.actions[indices], self.rewards[indices],
+                           self.next_states[indices], self.dones[indices], indices, weights)
+
+    def sample(self, batch_size):
+        """有放回地均匀采样一个批次，代价与缓冲区大小无关."""
+        if self._size == 0:
+            raise ValueError("Cannot sample from an empty replay buffer.")
+        indices = self._rng.integers(0, self._size, size=batch_size)
+        return self._batch(indices, np.ones(batch_size, dtype=np.float32))
+
+    def update_priorities(self, indices, td_errors):
+        """均匀采样不使用优先级."""
+
+
+class SumTree:
+    def __init__(self, capacity):
+        """
+        数组实现的求和树：叶子存放各位置的优先级，内部节点为子节点之和，
+        支持向量化的批量更新与按前缀和查找，均为 O(log n)。
+        """
+        self.capacity = capacity
+        self._leaves = 1
+        while self._leaves < capacity:
+            self._leaves *= 2
+        self.tree = np.zeros(2 * self._leaves, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def get(self, indices):
+        return self.tree[np.asarray(indices) + self._leaves]
+
+    def update(self, indices, priorities):
+        nodes = np.asarray(indices) + self._leaves
+        self.tree[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values):
+        """:return: 对每个 value，前缀和首次超过它的叶子位置"""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        while nodes[0] < self._leaves:
+            left = 2 * nodes
+            go_right = values >= self.tree[left]
+            values = np.where(go_right, values - self.tree[left], values)
+            nodes = np.where(go_right, left + 1, left)
+        return nodes - self._leaves
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    def __init__(self, capacity, state_size=None, alpha=0.6, beta=0.4, beta_increment=0.001, epsilon=1e-6,
+                 seed=None):
+        """
+        按 TD 误差优先级采样的经验回放（Schaul et al., Prioritized Experience Replay）：
+        采样概率正比于 priority^alpha，并以重要性采样权重 (N * P)^-beta 修正偏差。
+        新经历以当前最大优先级写入，保证至少被采样一次。
+        :param alpha: 优先级指数，0 时退化为均匀采样
+        :param beta: 重要性采样权重的初始指数，每次采样增加 beta_increment，直到 1
+        :param epsilon: 加在 |TD 误差| 上的小量，避免优先级为 0 的经历永远不被采样
+        """
+        super().__init__(capacity, state_size, seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def append(self, state, action, reward, next_state, done):
+        index = super().append(state, action, reward, next_state, done)
+        self.tree.update([index], [self.max_priority])
+        return index
+
+    def clear(self, state_size=None):
+        super().clear(state_size)
+        self.tree = SumTree(self.capacity)
+        self.max_priority = 1.0
+
+    def sample(self, batch_size):
+        """分层采样：把总优先级等分为 batch_size 段，每段内均匀取一个值."""
+        if self._size == 0:
+            raise ValueError("Cannot sample from an empty replay buffer.")
+        segment = self.tree.total / batch_size
+        values = (np.arange(batch_size) + self._rng.random(batch_size)) * segment
+        # 浮点误差可能落到尚未写入的叶子上
+        indices = np.minimum(self.tree.find(values), self._size - 1)
+        probabilities = self.tree.get(indices) / self.tree.total
+        weights = (self._size * probabilities) ** -self.beta
+        weights /= weights.max()
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return self._batch(indices, weights.astype(np.float32))
+
+    def update_priorities(self, indices, td_errors):
+        priorities = (np.abs(np.asarray(td_errors, dtype=np.float64)) + self.epsilon) ** self.alpha
+        self.tree.update(indices, priorities)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
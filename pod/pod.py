@@ -1,5 +1,6 @@
 import logging
 import json
+from utils import quantity
 
 class Pod:
     def __init__(self, name: str, containers: list = None, namespace: str = 'default', volumes=None):
@@ -12,10 +13,15 @@ class Pod:
         }
         self.volumes = volumes or {}
         self.status = 'Pending'
+        self.request_vector = quantity.ResourceVector()  # 解析后的资源请求向量，容器变化时重新计算
         self._aggregate_resources()
 
     def _aggregate_resources(self):
-        """从所有容器中提取资源并计算总量。"""
+        """从所有容器中提取资源并计算总量，同时一次性解析资源请求。"""
+        self.resources = {
+            'requests': {},
+            'limits': {}
+        }
         for container in self.containers:
             if not hasattr(container, 'resources'):
                 logging.warning(f"Container {container} has no 'resources' attribute.")
@@ -27,6 +33,8 @@ class Pod:
             self._add_resource_totals(self.resources['requests'], requests)
             self._add_resource_totals(self.resources['limits'], limits)
 
+        self.request_vector = quantity.ResourceVector.from_requests(self.resources['requests'])
+
     def _add_resource_totals(self, total_resources, container_resources):
         """合并容器资源到总资源。"""
         for resource_type, value in container_resources.items():
@@ -44,40 +52,19 @@ class Pod:
                 )
 
     def _combine_resources(self, current, new, resource_type):
-        """合并两种资源值，支持 CPU、内存、GPU。"""
+        """合并两种资源值，支持 CPU、内存、GPU、IO 和网络。"""
         if resource_type == 'cpu':
-            return f"{self._parse_cpu(current) + self._parse_cpu(new)}m"
+            return quantity.format_cpu(quantity.parse_cpu(current) + quantity.parse_cpu(new))
         elif resource_type == 'memory':
-            return f"{self._parse_memory(current) + self._parse_memory(new)}Mi"
+            return quantity.format_memory(quantity.parse_memory(current) + quantity.parse_memory(new))
         elif resource_type == 'gpu':
-            return str(self._parse_gpu(current) + self._parse_gpu(new))
+            return str(quantity.parse_gpu(current) + quantity.parse_gpu(new))
+        elif resource_type in ('io', 'net'):
+            return str(quantity.parse_count(current) + quantity.parse_count(new))
         else:
             logging.warning(f"Unknown resource type: {resource_type}.")
             return current
 
-    def _parse_cpu(self, cpu_str):
-        """解析 CPU 值，支持 'm' 单位。"""
-        if cpu_str.endswith('m'):
-            return int(cpu_str[:-1])  # 转换为 millicores
-        return int(cpu_str) * 1000  # 假设为 cores，转换为 millicores
-
-    def _parse_memory(self, memory_str):
-        """解析内存值，支持 'Mi' 和 'Gi' 单位。"""
-        if memory_str.endswith('Gi'):
-            return int(memory_str[:-2]) * 1024  # 转换为 Mi
-        elif memory_str.endswith('Mi'):
-            return int(memory_str[:-2])  # 保留 Mi
-        logging.warning(f"Unexpected memory format: {memory_str}. Defaulting to 0.")
-        return 0
-
-    def _parse_gpu(self, gpu_str):
-        """解析 GPU 值，确保返回整数。"""
-        try:
-            return int(gpu_str)
-        except ValueError:
-            logging.warning(f"Invalid GPU format: {gpu_str}. Defaulting to 0.")
-            return 0
-
     def to_dict(self):
         return {
             'name': self.name,
@@ -94,6 +81,7 @@ class Pod:
             logging.error(f"Cannot add container '{container.name}' to running Pod '{self.name}'.")
             return
         self.containers.append(container)
+        self._aggregate_resources()
         logging.info(f"Container '{container.name}' added to Pod '{self.name}' in namespace '{self.namespace}'.")
         # 将新的容器状态写入 etcd
         #self.etcd_client.put(f"/pods/{self.name}/containers/{container.name}/status", "Pending")
@@ -104,6 +92,7 @@ class Pod:
             logging.error(f"Cannot remove container '{container_name}' from running Pod '{self.name}'.")
             return
         self.containers = [c for c in self.containers if c.name != container_name]
+        self._aggregate_resources()
         logging.info(f"Container '{container_name}' removed from Pod '{self.name}' in namespace '{self.namespace}'.")
         # 从 etcd 中删除该容器的状态记录
         #self.etcd_client.delete(f"/pods/{self.name}/containers/{container_name}")
@@ -1,18 +1,62 @@
+import asyncio
 import logging
+import threading
 import yaml
 import json
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from .pod import Pod
 from container.container import Container
+from etcd import storage_schema
+from etcd.informer import PendingWrites, same_record
 
 class PodController:
-    def __init__(self, etcd_client, container_manager, container_runtime):
+    def __init__(self, etcd_client, container_manager, container_runtime, pod_informer=None, async_etcd_client=None,
+                 max_container_workers=16, max_parallel_containers_per_pod=4, image_handler=None):
+        """
+        :param max_container_workers: 所有 Pod 共享的容器操作线程数，限制同时运行的 ctr 进程总数
+        :param max_parallel_containers_per_pod: 单个 Pod 同时进行启动/停止的容器数上限
+        :param image_handler: ImageHandler，提供时创建容器前先确保镜像在本地，共享同一镜像的容器只拉取一次
+        """
         self.pods = {}  # 命名空间到 Pod 字典的映射
         self.etcd_client = etcd_client
+        self.async_etcd_client = async_etcd_client  # AsyncEtcdClient，供 *_async 方法使用；未提供时在线程池中调用同步版本
+        self.pod_informer = pod_informer  # 监听 pods/ 的 Informer（需提供 'namespace' 索引），已同步时列表查询直接读内存
+        self._pending_writes = PendingWrites()  # 本进程修改过、Informer 尚未观察到最新状态的 Pod (namespace, name)
         self.container_manager = container_manager
         self.container_runtime = container_runtime
+        self.image_handler = image_handler
+        self.max_container_workers = max(int(max_container_workers), 1)
+        self.max_parallel_containers_per_pod = max(int(max_parallel_containers_per_pod), 1)
+        self._container_executor = None
+        self._executor_lock = threading.Lock()
 
     def create_pod(self, name: str, containers: list, namespace: str = 'default'):
         """Creates a new Pod with a list of containers in the specified namespace."""
+        pod = self._add_pod(name, containers, namespace)
+        try:
+            # 将 Pod 状态同步到 etcd
+            self.etcd_client.put(storage_schema.pod_key(namespace, name), json.dumps(pod.to_dict()))
+            logging.info(f"Pod '{name}' created successfully in namespace '{namespace}' with containers: {[c.name for c in containers]}.")
+        except Exception as e:
+            logging.error("An error occurred", exc_info=True)
+            logging.error(f"Failed to create Pod '{name}' in namespace '{namespace}'. Containers: {containers}. Error: {e}")
+            raise
+
+    async def create_pod_async(self, name: str, containers: list, namespace: str = 'default'):
+        """create_pod 的异步版本，不阻塞事件循环."""
+        if self.async_etcd_client is None:
+            return await asyncio.to_thread(self.create_pod, name, containers, namespace)
+        pod = self._add_pod(name, containers, namespace)
+        try:
+            await self.async_etcd_client.put(storage_schema.pod_key(namespace, name), json.dumps(pod.to_dict()))
+            logging.info(f"Pod '{name}' created successfully in namespace '{namespace}' with containers: {[c.name for c in containers]}.")
+        except Exception as e:
+            logging.error(f"Failed to create Pod '{name}' in namespace '{namespace}'. Containers: {containers}. Error: {e}")
+            raise
+
+    def _add_pod(self, name, containers, namespace):
+        """在内存中登记新的 Pod."""
         # 初始化命名空间的 Pods 字典
         if namespace not in self.pods:
             self.pods[namespace] = {}
@@ -22,18 +66,9 @@ class PodController:
             raise ValueError(f"Pod '{name}' already exists in namespace '{namespace}'.")
 
         pod = Pod(name=name, containers=containers, namespace=namespace)
-        try:
-            self.pods[namespace][name] = pod
-            # 将 Pod 状态同步到 etcd
-            #print(pod_data)
-            pod_data=json.dumps(pod.to_dict())
-            self.etcd_client.put(f"pods/{namespace}/{name}", pod_data)
-            self.etcd_client.put(f"/pods/{namespace}/{name}/status", "Created")
-            logging.info(f"Pod '{name}' created successfully in namespace '{namespace}' with containers: {[c.name for c in containers]}.")
-        except Exception as e:
-            logging.error("An error occurred", exc_info=True)
-            logging.error(f"Failed to create Pod '{name}' in namespace '{namespace}'. Containers: {containers}. Error: {e}")
-            raise
+        self.pods[namespace][name] = pod
+        self._pending_writes.mark((namespace, name))
+        return pod
 
     def create_pod_from_yaml(self, yaml_file: str):
         """Creates a Pod from a YAML file."""
@@ -77,9 +112,28 @@ class PodController:
         try:
             self.stop_pod(name, namespace)
             del self.pods[namespace][name]
-            # 从 etcd 中删除该 Pod 的状态记录
-            self.etcd_client.delete_with_prefix(f"/pods/{namespace}/{name}")
-            self.etcd_client.delete(f"pods/{namespace}/{name}")
+            self._pending_writes.mark((namespace, name))
+            # 在一个事务中删除该 Pod 的记录及其容器状态
+            self.etcd_client.apply_batch((), [storage_schema.pod_key(namespace, name)],
+                                         [storage_schema.pod_status_prefix(namespace, name)])
+            logging.info(f"Pod '{name}' deleted successfully from namespace '{namespace}'.")
+        except Exception as e:
+            logging.error(f"Failed to delete Pod '{name}' from namespace '{namespace}': {e}")
+            raise
+
+    async def delete_pod_async(self, name: str, namespace: str = 'default'):
+        """delete_pod 的异步版本，不阻塞事件循环."""
+        if self.async_etcd_client is None:
+            return await asyncio.to_thread(self.delete_pod, name, namespace)
+        if namespace not in self.pods or name not in self.pods[namespace]:
+            logging.error(f"Pod '{name}' not found in namespace '{namespace}'.")
+            raise ValueError(f"Pod '{name}' not found in namespace '{namespace}'.")
+        try:
+            await self.stop_pod_async(name, namespace)
+            del self.pods[namespace][name]
+            self._pending_writes.mark((namespace, name))
+            await self.async_etcd_client.apply_batch((), [storage_schema.pod_key(namespace, name)],
+                                                     [storage_schema.pod_status_prefix(namespace, name)])
             logging.info(f"Pod '{name}' deleted successfully from namespace '{namespace}'.")
         except Exception as e:
             logging.error(f"Failed to delete Pod '{name}' from namespace '{namespace}': {e}")
@@ -103,116 +157,314 @@ class PodController:
             logging.info(f"Listing all pods in all namespaces: {all_pods}")
             return all_pods
 
+    def images_in_use(self):
+        """返回本控制器管理的所有 Pod 引用的镜像名称集合，这些镜像不会被镜像回收删除"""
+        return {container.image for pods in list(self.pods.values()) for pod in list(pods.values())
+                for container in pod.containers}
+
     def start_pod(self, name: str, namespace: str = 'default'):
         """Starts a Pod in the specified namespace and updates etcd status."""
-        pod = self.pods.get(namespace, {}).get(name)
-        if not pod:
-            logging.error(f"Pod '{name}' not found in namespace '{namespace}'.")
-            raise ValueError(f"Pod '{name}' not found in namespace '{namespace}'.")
+        pod = self._require_pod(name, namespace)
+        try:
+            updates = self._start_containers(pod)
+            if updates is None:
+                return
+            self.etcd_client.put_many(updates)
+            logging.info(f"Pod '{name}' started successfully in namespace '{namespace}'.")
+        except Exception as e:
+            logging.error(f"Failed to start Pod '{name}' in namespace '{namespace}': {e}")
+            raise
 
+    async def start_pod_async(self, name: str, namespace: str = 'default'):
+        """start_pod 的异步版本：容器通过异步命令执行器并发启动，etcd 写入使用 AsyncEtcdClient."""
+        if self.async_etcd_client is None:
+            return await asyncio.to_thread(self.start_pod, name, namespace)
+        pod = self._require_pod(name, namespace)
         try:
-            if pod.status != 'Pending' and pod.status != 'Stopped':
-                logging.error(f"Pod '{pod.name}' is already running or terminated.")
+            if not self._can_start(pod):
                 return
-            
-            all_started = True
-            for container in pod.containers:
-                try:
-                    self.container_manager.create_container(container)
-                    self.container_runtime.start_container(container)
-                    logging.info(f"Container '{container.name}' started successfully.")
-                    # 将容器状态更新到 etcd
-                    self.etcd_client.put(f"/pods/{namespace}/{name}/containers/{container.name}/status", "Running")
-                except Exception as e:
-                    logging.error(f"Failed to start container '{container.name}': {e}")
-                    all_started = False
-            
-            if all_started:
-                pod.status = 'Running'
-                logging.info(f"Pod '{pod.name}' in namespace '{namespace}' is now running.")
-            pod_data=json.dumps(pod.to_dict())
-            self.etcd_client.put(f"pods/{namespace}/{name}", pod_data)
-            self.etcd_client.put(f"/pods/{namespace}/{name}/status", "Running")
+            updates = await self._run_container_ops_async(pod, self._start_container_async, 'Running', 'Running')
+            await self.async_etcd_client.put_many(updates)
             logging.info(f"Pod '{name}' started successfully in namespace '{namespace}'.")
         except Exception as e:
             logging.error(f"Failed to start Pod '{name}' in namespace '{namespace}': {e}")
             raise
 
+    def start_pods(self, names, namespace: str = 'default'):
+        """并发启动多个 Pod：所有 Pod 的容器共享容器操作线程池，状态在一次批量写入中同步到 etcd.
+        :return: Pod 名称 -> 启动后的 Pod 状态
+        """
+        pods = [self._require_pod(name, namespace) for name in names]
+        startable = [pod for pod in pods if self._can_start(pod)]
+        updates = self._run_container_ops(startable, self._start_container, 'Running', 'Running')
+        if startable:
+            self.etcd_client.put_many([item for pod_updates in updates for item in pod_updates])
+        logging.info(f"Started {len(startable)} pods in namespace '{namespace}'.")
+        return {pod.name: pod.status for pod in pods}
+
+    def _start_containers(self, pod):
+        """并发启动 Pod 的所有容器.
+        :return: 需在一个事务中写入 etcd 的容器状态与 Pod 记录；Pod 不可启动时返回 None
+        """
+        if not self._can_start(pod):
+            return None
+        return self._run_container_ops([pod], self._start_container, 'Running', 'Running')[0]
+
+    def _can_start(self, pod):
+        if pod.status != 'Pending' and pod.status != 'Stopped':
+            logging.error(f"Pod '{pod.name}' is already running or terminated.")
+            return False
+        return True
+
+    def _start_container(self, container):
+        if self.image_handler is not None and not self.image_handler.ensure_image(container.image):
+            raise Exception(f"Failed to pull image '{container.image}'")
+        self.container_manager.create_container(container)
+        self.container_runtime.start_container(container)
+        logging.info(f"Container '{container.name}' started successfully.")
+
     def stop_pod(self, name: str, namespace: str = 'default'):
         """Stops a Pod in the specified namespace and updates etcd status."""
-        pod = self.pods.get(namespace, {}).get(name)
-        if not pod:
-            logging.error(f"Pod '{name}' not found in namespace '{namespace}'.")
-            raise ValueError(f"Pod '{name}' not found in namespace '{namespace}'.")
-
+        pod = self._require_pod(name, namespace)
         try:
-            if pod.status != 'Running':
-                logging.error(f"Pod '{pod.name}' is not running.")
+            updates = self._stop_containers(pod)
+            if updates is None:
                 return
-            
-            all_stopped = True
-            for container in pod.containers:
-                try:
-                    self.container_runtime.stop_container(container.name)
-                    logging.info(f"Container '{container.name}' stopped successfully.")
-                    self.etcd_client.put(f"/pods/{namespace}/{name}/containers/{container.name}/status", "Stopped")
-                except Exception as e:
-                    logging.error(f"Failed to stop container '{container.name}': {e}")
-                    all_stopped = False
-
-            if all_stopped:
-                pod.status = 'Stopped'
+            self.etcd_client.put_many(updates)
+            logging.info(f"Pod '{name}' stopped successfully in namespace '{namespace}'.")
+        except Exception as e:
+            logging.error(f"Failed to stop Pod '{name}' in namespace '{namespace}': {e}")
+            raise
 
-                logging.info(f"Pod '{pod.name}' in namespace '{namespace}' has been stopped.")
-            pod_data=json.dumps(pod.to_dict())
-            self.etcd_client.put(f"pods/{namespace}/{name}", pod_data)
-            self.etcd_client.put(f"/pods/{namespace}/{name}/status", "Stopped")
+    async def stop_pod_async(self, name: str, namespace: str = 'default'):
+        """stop_pod 的异步版本：容器通过异步命令执行器并发停止，etcd 写入使用 AsyncEtcdClient."""
+        if self.async_etcd_client is None:
+            return await asyncio.to_thread(self.stop_pod, name, namespace)
+        pod = self._require_pod(name, namespace)
+        try:
+            if not self._can_stop(pod):
+                return
+            updates = await self._run_container_ops_async(pod, self._stop_container_async, 'Stopped', 'Stopped')
+            await self.async_etcd_client.put_many(updates)
             logging.info(f"Pod '{name}' stopped successfully in namespace '{namespace}'.")
         except Exception as e:
             logging.error(f"Failed to stop Pod '{name}' in namespace '{namespace}': {e}")
             raise
 
+    def stop_pods(self, names, namespace: str = 'default'):
+        """并发停止多个 Pod，语义同 start_pods.
+        :return: Pod 名称 -> 停止后的 Pod 状态
+        """
+        pods = [self._require_pod(name, namespace) for name in names]
+        running = [pod for pod in pods if self._can_stop(pod)]
+        updates = self._run_container_ops(running, self._stop_container, 'Stopped', 'Stopped')
+        if running:
+            self.etcd_client.put_many([item for pod_updates in updates for item in pod_updates])
+        logging.info(f"Stopped {len(running)} pods in namespace '{namespace}'.")
+        return {pod.name: pod.status for pod in pods}
 
-    def restart_pod(self, name: str, namespace: str = 'default'):
-        """Restarts a Pod and updates etcd status based on namespace"""
-        # 获取指定命名空间下的 Pod 字典
-        namespace_pods = self.pods.get(namespace, {})
-        
-        pod = namespace_pods.get(name)
+    def _stop_containers(self, pod):
+        """并发停止 Pod 的所有容器.
+        :return: 需在一个事务中写入 etcd 的容器状态与 Pod 记录；Pod 未运行时返回 None
+        """
+        if not self._can_stop(pod):
+            return None
+        return self._run_container_ops([pod], self._stop_container, 'Stopped', 'Stopped')[0]
+
+    def _can_stop(self, pod):
+        if pod.status != 'Running':
+            logging.error(f"Pod '{pod.name}' is not running.")
+            return False
+        return True
+
+    def _stop_container(self, container):
+        self.container_runtime.stop_container(container.name)
+        logging.info(f"Container '{container.name}' stopped successfully.")
+
+    async def _start_container_async(self, container):
+        if self.image_handler is not None and not await self.image_handler.ensure_image_async(container.image):
+            raise Exception(f"Failed to pull image '{container.image}'")
+        await self.container_manager.create_container_async(container)
+        await self.container_runtime.start_container_async(container)
+        logging.info(f"Container '{container.name}' started successfully.")
+
+    async def _stop_container_async(self, container):
+        await self.container_runtime.stop_container_async(container.name)
+        logging.info(f"Container '{container.name}' stopped successfully.")
+
+    def _executor(self):
+        if self._container_executor is None:
+            with self._executor_lock:
+                if self._container_executor is None:
+                    self._container_executor = ThreadPoolExecutor(max_workers=self.max_container_workers,
+                                                                   thread_name_prefix="pod-containers")
+        return self._container_executor
+
+    def _run_container_ops(self, pods, operation, container_status, pod_status):
+        """在共享线程池中对多个 Pod 的容器并发执行 operation(container)，每个 Pod 同时最多
+        max_parallel_containers_per_pod 个容器在执行，Pod 的耗时接近其最慢的容器。
+        所有容器成功时 Pod 状态置为 pod_status，失败的容器状态记为 Failed。
+        :return: 与 pods 对应的列表，每项为该 Pod 需在一个事务中写入 etcd 的容器状态与 Pod 记录
+        """
+        queues = {id(pod): deque(pod.containers) for pod in pods}
+        running = {id(pod): 0 for pod in pods}
+        errors = {id(pod): {} for pod in pods}
+        in_flight = {}  # future -> (pod id, container)
+
+        def submit_ready():
+            for pod_id, queue in queues.items():
+                while queue and running[pod_id] < self.max_parallel_containers_per_pod:
+                    container = queue.popleft()
+                    in_flight[self._executor().submit(operation, container)] = (pod_id, container)
+                    running[pod_id] += 1
+
+        submit_ready()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                pod_id, container = in_flight.pop(future)
+                running[pod_id] -= 1
+                error = future.exception()
+                if error is not None:
+                    logging.error(f"Container operation failed for '{container.name}': {error}")
+                    errors[pod_id][container.name] = error
+            submit_ready()
+
+        return [self._collect_updates(pod, errors[id(pod)], container_status, pod_status) for pod in pods]
+
+    async def _run_container_ops_async(self, pod, operation, container_status, pod_status):
+        """_run_container_ops 的异步版本：协程 operation(container) 并发执行，
+        每个 Pod 同时最多 max_parallel_containers_per_pod 个，子进程总数由命令执行器限制。"""
+        semaphore = asyncio.Semaphore(self.max_parallel_containers_per_pod)
+
+        async def run(container):
+            async with semaphore:
+                try:
+                    await operation(container)
+                except Exception as e:
+                    logging.error(f"Container operation failed for '{container.name}': {e}")
+                    return e
+            return None
+
+        results = await asyncio.gather(*(run(container) for container in pod.containers))
+        errors = {container.name: error for container, error in zip(pod.containers, results) if error is not None}
+        return self._collect_updates(pod, errors, container_status, pod_status)
+
+    def _collect_updates(self, pod, failed, container_status, pod_status):
+        """汇总各容器的执行结果：全部成功时 Pod 状态置为 pod_status，失败的容器状态记为 Failed.
+        :param failed: 失败的容器名称 -> 异常
+        :return: 需在一个事务中写入 etcd 的容器状态与 Pod 记录
+        """
+        updates = [(storage_schema.container_status_key(pod.namespace, pod.name, container.name),
+                    "Failed" if container.name in failed else container_status)
+                   for container in pod.containers]  # 容器状态与 Pod 记录最后在一个事务中写入 etcd
+        if not failed:
+            pod.status = pod_status
+            logging.info(f"Pod '{pod.name}' in namespace '{pod.namespace}' is now {pod_status.lower()}.")
+        else:
+            logging.error(f"{len(failed)} of {len(pod.containers)} containers of Pod '{pod.name}' failed.")
+        self._pending_writes.mark((pod.namespace, pod.name))
+        updates.append((storage_schema.pod_key(pod.namespace, pod.name), json.dumps(pod.to_dict())))
+        return updates
+
+    def _require_pod(self, name, namespace):
+        pod = self.pods.get(namespace, {}).get(name)
         if not pod:
             logging.error(f"Pod '{name}' not found in namespace '{namespace}'.")
             raise ValueError(f"Pod '{name}' not found in namespace '{namespace}'.")
-        
+        return pod
+
+
+    def restart_pod(self, name: str, namespace: str = 'default'):
+        """Restarts a Pod and updates etcd status based on namespace"""
+        self._require_pod(name, namespace)
         try:
+            # stop_pod 与 start_pod 各自在一个事务中更新 etcd 中的 Pod 状态
             self.stop_pod(name, namespace)  # 需要加上命名空间参数
             self.start_pod(name, namespace)  # 需要加上命名空间参数
-            # 更新 etcd 中的 Pod 状态
-            pod_data=json.dumps(pod.to_dict())
-            self.etcd_client.put(f"pods/{namespace}/{name}", pod_data)
-            self.etcd_client.put(f"/pods/{namespace}/{name}/status", "Running")
             logging.info(f"Pod '{name}' in namespace '{namespace}' restarted successfully.")
         except Exception as e:
             logging.error(f"Failed to restart Pod '{name}' in namespace '{namespace}': {e}")
             raise
 
-    def get_all_pods(self):
-        """获取所有 Pods 的信息，按命名空间区分"""
+    async def restart_pod_async(self, name: str, namespace: str = 'default'):
+        """restart_pod 的异步版本，不阻塞事件循环."""
+        self._require_pod(name, namespace)
         try:
-            pod_values = self.etcd_client.get_with_prefix("pods/")  # 使用 EtcdClient 的方法
-            pod_info_list = {}
+            await self.stop_pod_async(name, namespace)
+            await self.start_pod_async(name, namespace)
+            logging.info(f"Pod '{name}' in namespace '{namespace}' restarted successfully.")
+        except Exception as e:
+            logging.error(f"Failed to restart Pod '{name}' in namespace '{namespace}': {e}")
+            raise
 
-            for value in pod_values:
-                pod_data = json.loads(value)  # 解析 JSON 字符串
-                namespace = pod_data['namespace']  # 获取 Pod 所在的命名空间
-                pod_name = pod_data['name']  # 获取 Pod 名称
+    @property
+    def resource_version(self):
+        """get_all_pods 返回结果至少反映到的 etcd revision；未使用 Informer 时为 None."""
+        if self.pod_informer is None or not self.pod_informer.has_synced():
+            return None
+        return self.pod_informer.resource_version
 
-                if namespace not in pod_info_list:
-                    pod_info_list[namespace] = {}
+    def _get_all_pods_cached(self):
+        """从 Informer 缓存按命名空间索引组装 Pod 列表.
+        只有本进程修改过、Informer 尚未观察到最新状态的 Pod 以内存状态覆盖（已删除的从结果中去掉），
+        Informer 追上后不再覆盖，因此序列化开销只与未同步的 Pod 数量有关。
+        """
+        pod_info_list = {}
+        for namespace in self.pod_informer.index_values('namespace'):
+            pods, _ = self.pod_informer.list('namespace', namespace)
+            pod_info_list[namespace] = {pod_data['name']: pod_data for pod_data in pods}
+        for (namespace, name), generation in self._pending_writes.snapshot():
+            pod = self.pods.get(namespace, {}).get(name)
+            cached = self.pod_informer.get(storage_schema.pod_key(namespace, name))
+            if pod is None:
+                if cached is None:
+                    self._pending_writes.observed((namespace, name), generation)
+                else:
+                    pod_info_list.get(namespace, {}).pop(name, None)
+                continue
+            pod_data = pod.to_dict()
+            if same_record(pod_data, cached):
+                self._pending_writes.observed((namespace, name), generation)
+            else:
+                pod_info_list.setdefault(namespace, {})[name] = pod_data
+        return {namespace: pods for namespace, pods in pod_info_list.items() if pods}
 
-                pod_info_list[namespace][pod_name] = pod_data  # 存储按命名空间分类的 Pod 数据
+    def get_all_pods(self):
+        """获取所有 Pods 的信息，按命名空间区分"""
+        if self.resource_version is not None:
+            return self._get_all_pods_cached()
+        try:
+            pod_values = self.etcd_client.get_with_prefix(storage_schema.POD_PREFIX)  # 使用 EtcdClient 的方法
+            return self._assemble_pods(pod_values)
+        except Exception as e:
+            logging.error(f"Failed to get all pods: {e}")
+            return {}
 
-            logging.info(f"Retrieved all pods: {pod_info_list}")
-            return pod_info_list
+    async def get_all_pods_async(self):
+        """get_all_pods 的异步版本；Informer 已同步时直接读内存."""
+        if self.resource_version is not None:
+            return self._get_all_pods_cached()
+        if self.async_etcd_client is None:
+            return await asyncio.to_thread(self.get_all_pods)
+        try:
+            return self._assemble_pods(await self.async_etcd_client.get_with_prefix(storage_schema.POD_PREFIX))
         except Exception as e:
             logging.error(f"Failed to get all pods: {e}")
             return {}
+
+    def _assemble_pods(self, pod_values):
+        """由 etcd 中的 Pod 记录组装按命名空间分类的 Pod 列表."""
+        pod_info_list = {}
+        for value in pod_values:
+            pod_data = json.loads(value)  # 解析 JSON 字符串
+            namespace = pod_data['namespace']  # 获取 Pod 所在的命名空间
+            pod_name = pod_data['name']  # 获取 Pod 名称
+
+            if namespace not in pod_info_list:
+                pod_info_list[namespace] = {}
+
+            pod_info_list[namespace][pod_name] = pod_data  # 存储按命名空间分类的 Pod 数据
+
+        logging.info(f"Retrieved {sum(len(pods) for pods in pod_info_list.values())} pods from etcd.")
+        return pod_info_list
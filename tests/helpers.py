@@ -0,0 +1,34 @@
+"""测试共用的容器、Pod 与集群构造函数."""
+from types import SimpleNamespace
+from pod.pod import Pod
+
+GiB = 1024 ** 3
+
+
+def make_container(name, image=None, **requests):
+    """
+    构造只包含调度与控制器所需字段的容器.
+    :param image: 镜像名称，为 None 时不设置 image 属性
+    :param requests: 资源请求，例如 cpu="500m", memory="256Mi"
+    """
+    container = SimpleNamespace(name=name, resources={'requests': dict(requests), 'limits': {}},
+                                to_dict=lambda: {'name': name})
+    if image is not None:
+        container.image = image
+    return container
+
+
+def make_pod(name, cpu="500m", memory="256Mi", gpu="0", image=None, **requests):
+    """构造只有一个容器的 Pod；其余资源请求（如 io、net）通过关键字参数传入."""
+    return Pod(name=name, containers=[make_container(f"{name}-c", image, cpu=cpu, memory=memory, gpu=gpu,
+                                                     **requests)])
+
+
+def add_nodes(controller, *nodes, io=100, net=100):
+    """
+    按 (名称, CPU 核数, GPU 数) 向 NodeController 依次添加节点，
+    内存为 CPU 核数 GiB，IP 为 10.0.0.{序号}.
+    """
+    for i, (name, cpu, gpu) in enumerate(nodes, 1):
+        controller.add_node(name, f"10.0.0.{i}", cpu, cpu * GiB, gpu, io, net)
+    return controller
@@ -15,11 +15,12 @@ IMAGES = [
 ]
 
 class SystemTester:
-    def __init__(self, base_url=BASE_URL, node_count=NODE_COUNT, pod_count=POD_COUNT, schedule_method=SCHEDULE_METHOD):
+    def __init__(self, base_url=BASE_URL, node_count=NODE_COUNT, pod_count=POD_COUNT, schedule_method=SCHEDULE_METHOD, batch=False):
         self.base_url = base_url
         self.node_count = node_count
         self.pod_count = pod_count
         self.schedule_method = schedule_method
+        self.batch = batch
 
     def create_nodes(self):
         node_names = []
@@ -117,6 +118,25 @@ class SystemTester:
                 print(f"Pod {pod_name} scheduling failed with status code {response.status_code}: {error_details}")
             time.sleep(1)
     
+    def schedule_pods_batch(self):
+        pods = [
+            {"metadata": {"name": f"example-pod-{l}", "namespace": "default"}}
+            for l in range(1, self.pod_count + 1)
+        ]
+        response = requests.post(f"{self.base_url}/{self.schedule_method}/batch", json={"pods": pods})
+        if response.status_code == 200:
+            for result in response.json().get("results", []):
+                if result.get("node_name"):
+                    print(f"Pod {result['pod_name']} scheduled to {result['node_name']}, reward: {result.get('reward')}")
+                else:
+                    print(f"Pod {result['pod_name']} scheduling failed: {result.get('error')}")
+        else:
+            try:
+                error_details = response.json()
+            except ValueError:
+                error_details = response.text
+            print(f"Batch scheduling failed with status code {response.status_code}: {error_details}")
+
     def save_schedule_history(self):
         try:
             response = requests.post(
@@ -150,7 +170,10 @@ class SystemTester:
     def run_test(self):
         self.create_nodes()
         self.create_pods()
-        self.schedule_pods()
+        if self.batch:
+            self.schedule_pods_batch()
+        else:
+            self.schedule_pods()
         self.save_schedule_history()
         self.cleanup()
 
@@ -2,6 +2,9 @@ import unittest
 from unittest.mock import MagicMock
 from orchestrator.DDQN_scheduler import DDQNScheduler
 import numpy as np
+from utils.quantity import ResourceVector
+from node.node_controller import NodeController
+from tests.helpers import make_pod
 
 class TestDDQNScheduler(unittest.TestCase):
     def setUp(self):
@@ -31,6 +34,7 @@ class TestDDQNScheduler(unittest.TestCase):
     def test_schedule_pod(self):
         pod = MagicMock(name='pod')
         pod.name = 'test_pod'
+        pod.request_vector = ResourceVector()
         
         # 调度 Pod 到节点并确保没有抛出异常
         try:
@@ -41,5 +45,77 @@ class TestDDQNScheduler(unittest.TestCase):
         # 确保调度方法被调用
         self.node_controller.schedule_pod_to_node.assert_called()
 
+    def test_replay_trains_on_whole_batch(self):
+        scheduler = self.scheduler
+        self.assertIsNone(scheduler.replay())
+        rng = np.random.default_rng(0)
+        for i in range(scheduler.config['batch_size']):
+            state = rng.random((1, scheduler.state_size))
+            next_state = rng.random((1, scheduler.state_size))
+            scheduler.remember(state, i % scheduler.action_size, float(i), next_state, i % 2 == 0)
+        memory = scheduler.memory
+        n = len(memory)
+        states, next_states = memory.states[:n], memory.next_states[:n]
+        # 双 DQN 目标：在线网络选动作，目标网络评估；先按更新前的权重计算缓冲区内每条经历的损失
+        q = scheduler.q_values(scheduler.model, states).numpy()
+        next_actions = np.argmax(scheduler.q_values(scheduler.model, next_states).numpy(), axis=1)
+        next_q = scheduler.q_values(scheduler.target_model, next_states).numpy()[np.arange(n), next_actions]
+        target_f = q.copy()
+        target_f[np.arange(n), memory.actions[:n]] = \
+            memory.rewards[:n] + scheduler.config['gamma'] * (1 - memory.dones[:n]) * next_q
+        per_sample = np.mean(np.square(target_f - q), axis=1)
+        weights = [w.copy() for w in scheduler.model.get_weights()]
+
+        scheduler.target_model.predict = MagicMock()
+        batches = []
+        sample = memory.sample
+        memory.sample = lambda batch_size: batches.append(sample(batch_size)) or batches[-1]
+        loss = scheduler.replay()
+        scheduler.target_model.predict.assert_not_called()
+        self.assertAlmostEqual(loss, per_sample[batches[0].indices].mean(), places=4)
+        self.assertTrue(any(not np.allclose(a, b) for a, b in zip(weights, scheduler.model.get_weights())))
+
+    def test_node_count_change_keeps_model(self):
+        model, target_model = self.scheduler.model, self.scheduler.target_model
+        state = np.random.rand(1, 2 * 9)
+        self.assertEqual(self.scheduler.predict(state).shape, (1, 2))
+        self.scheduler.remember(state, 0, 1.0, state, False)
+        self.node_controller.nodes['node3'] = MagicMock(allocated_cpu=0, allocated_memory=0, allocated_gpu=0,
+                                                        total_cpu=4, total_memory=16, total_gpu=2, status='Ready')
+        self.scheduler._update_action_size()
+        self.assertIs(self.scheduler.model, model)
+        self.assertIs(self.scheduler.target_model, target_model)
+        self.assertEqual(len(self.scheduler.memory), 0)
+        # 共享网络对已有节点的打分不受新节点影响
+        bigger = np.hstack([state, np.random.rand(1, 9)])
+        np.testing.assert_allclose(self.scheduler.predict(bigger)[0, :2], self.scheduler.predict(state)[0], rtol=1e-6)
+    def test_io_request_filters_nodes(self):
+        controller = NodeController(MagicMock())
+        controller.add_node("small-io", "10.0.0.1", 8, 8 * 1024 ** 3, 0, 10, 100)
+        controller.add_node("big-io", "10.0.0.2", 4, 4 * 1024 ** 3, 0, 100, 100)
+        scheduler = DDQNScheduler(controller)
+        scheduler.replay = MagicMock()
+        # 探索：按评分 small-io 更优，但剩余 IO 不足
+        self.assertEqual(scheduler.schedule_pod(make_pod("light", io="5")), "small-io")
+        self.assertEqual(scheduler.schedule_pod(make_pod("heavy", io="50")), "big-io")
+        # 利用：模型偏好 small-io 时同样跳过
+        scheduler.config['epsilon'] = 0
+        scheduler.predict = MagicMock(return_value=np.array([[1.0, 0.0]]))
+        self.assertEqual(scheduler.schedule_pod(make_pod("heavy2", io="40")), "big-io")
+        self.assertEqual(scheduler._calculate_reward("small-io", make_pod("heavy3", io="20")), -1)
+        self.assertGreater(scheduler._calculate_reward("big-io", make_pod("heavy3", io="5")), -1)
+    def test_failed_batch_sync_rolls_back(self):
+        etcd_client = MagicMock()
+        controller = NodeController(etcd_client, flush_interval=0)
+        controller.add_node("node1", "10.0.0.1", 4, 4 * 1024 ** 3, 0, 100, 100)
+        etcd_client.apply_batch.return_value = False
+        scheduler = DDQNScheduler(controller)
+        scheduler.replay = MagicMock()
+        results = scheduler.schedule_pods([make_pod("a"), make_pod("b")])
+        self.assertEqual([r['node_name'] for r in results], [None, None])
+        self.assertEqual(scheduler.get_schedule_history(), [])
+        self.assertEqual(controller.get_node("node1").allocated_cpu, 0)
+
+
 if __name__ == '__main__':
     unittest.main()
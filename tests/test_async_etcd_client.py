@@ -0,0 +1,249 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+import grpc
+from etcd3 import etcdrpc
+from etcd3.etcdrpc import kv_pb2
+from etcd.async_etcd_client import AsyncEtcdClient, _Stubs
+from node.node_controller import NodeController
+from pod.pod_controller import PodController
+from tests.helpers import make_container
+
+
+def unavailable():
+    return grpc.aio.AioRpcError(grpc.StatusCode.UNAVAILABLE, details="endpoint down")
+
+
+class FakeKV:
+    """按键排序保存数据的内存 KV stub，Range 支持 limit 分页."""
+
+    def __init__(self, data=None, delay=0):
+        self.data = dict(data or {})
+        self.delay = delay
+        self.requests = []
+        self.error = None
+
+    async def _call(self, name, request):
+        self.requests.append((name, request))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+
+    async def Range(self, request, timeout=None):
+        await self._call('Range', request)
+        keys = sorted(k for k in self.data if k >= request.key and (not request.range_end or k < request.range_end)) \
+            if request.range_end else [k for k in self.data if k == request.key]
+        response = etcdrpc.RangeResponse(count=len(keys))
+        response.header.revision = 7
+        if request.count_only:
+            return response
+        page = keys[:request.limit] if request.limit else keys
+        response.more = len(page) < len(keys)
+        response.kvs.extend(kv_pb2.KeyValue(key=k, value=self.data[k]) for k in page)
+        return response
+
+    async def Put(self, request, timeout=None):
+        await self._call('Put', request)
+        self.data[request.key] = request.value
+        return etcdrpc.PutResponse()
+
+    async def Txn(self, request, timeout=None):
+        await self._call('Txn', request)
+        return etcdrpc.TxnResponse(succeeded=True)
+
+    async def DeleteRange(self, request, timeout=None):
+        await self._call('DeleteRange', request)
+        return etcdrpc.DeleteRangeResponse(deleted=1)
+
+
+class FakeWatchCall:
+    def __init__(self, responses, error=None):
+        self.responses = responses
+        self.error = error
+        self.created = None
+
+    async def write(self, request):
+        self.created = request.create_request
+
+    def cancel(self):
+        pass
+
+    async def __aiter__(self):
+        for response in self.responses:
+            yield response
+        if self.error is not None:
+            raise self.error
+        await asyncio.Event().wait()
+
+
+def watch_response(revision, key, value):
+    return etcdrpc.WatchResponse(events=[kv_pb2.Event(type=kv_pb2.Event.PUT, kv=kv_pb2.KeyValue(
+        key=key, value=value, mod_revision=revision))])
+
+
+class TestAsyncEtcdClient(unittest.TestCase):
+
+    def make_client(self, *kvs, **kwargs):
+        client = AsyncEtcdClient(endpoints=[f"e{i}:2379" for i in range(len(kvs))], **kwargs)
+        for endpoint, kv in zip(client.endpoints, kvs):
+            client._stubs[endpoint] = _Stubs(MagicMock(), kv, MagicMock(), MagicMock())
+        return client
+
+    def test_get_put_and_paged_prefix_read(self):
+        kv = FakeKV({b"nodes/a": b"1", b"nodes/b": b"2", b"nodes/c": b"3", b"pods/x": b"4"})
+        client = self.make_client(kv)
+
+        async def run():
+            await client.put("nodes/d", "4")
+            items = [item async for item in client.iter_prefix("nodes/", page_size=2)]
+            return await client.get("nodes/a"), items, await client.count_prefix("nodes/")
+
+        value, items, count = asyncio.run(run())
+        self.assertEqual(value, "1")
+        self.assertEqual(items, [("nodes/a", "1"), ("nodes/b", "2"), ("nodes/c", "3"), ("nodes/d", "4")])
+        self.assertEqual(count, 4)
+        ranges = [request for name, request in kv.requests if name == 'Range' and request.limit == 2]
+        self.assertEqual(len(ranges), 2)
+        self.assertEqual(ranges[1].revision, 7)  # 后续页固定在第一页的 revision 上
+
+    def test_apply_batch_is_chunked(self):
+        kv = FakeKV()
+        client = self.make_client(kv, max_txn_ops=2)
+        ok = asyncio.run(client.apply_batch([("a", "1"), ("b", "2")], ["c"], ["d/"]))
+        self.assertTrue(ok)
+        txns = [request for name, request in kv.requests if name == 'Txn']
+        self.assertEqual([len(request.success) for request in txns], [2, 2])
+        self.assertEqual(txns[1].success[1].request_delete_range.range_end, b"d0")
+
+    def test_unavailable_endpoint_fails_over(self):
+        down, up = FakeKV(), FakeKV({b"key": b"value"})
+        down.error = unavailable()
+        client = self.make_client(down, up)
+
+        async def run():
+            await client.put("key", "new")
+            return await client.get("key")
+
+        self.assertEqual(asyncio.run(run()), "new")
+        self.assertEqual(client._primary, 1)
+
+    def test_slow_requests_do_not_serialize(self):
+        client = self.make_client(FakeKV({b"key": b"value"}, delay=0.2))
+
+        async def run():
+            return await asyncio.gather(*(client.get("key") for _ in range(5)))
+
+        start = time.monotonic()
+        self.assertEqual(asyncio.run(run()), ["value"] * 5)
+        self.assertLess(time.monotonic() - start, 0.6)
+
+    def test_watch_resumes_after_last_revision(self):
+        client = self.make_client(FakeKV(), retry_interval=0.01)
+        calls = [FakeWatchCall([watch_response(5, b"nodes/a", b"1")], error=unavailable()),
+                 FakeWatchCall([watch_response(6, b"nodes/b", b"2")])]
+        client._stubs[client.endpoints[0]].watch.Watch.side_effect = calls
+        events = []
+
+        async def run():
+            handle = client.watch_prefix("nodes/", events.append, start_revision=3)
+            while len(events) < 2:
+                await asyncio.sleep(0.01)
+            handle.cancel()
+            return handle
+
+        handle = asyncio.run(run())
+        self.assertEqual([(e.key, e.value, e.revision) for e in events], [("nodes/a", "1", 5), ("nodes/b", "2", 6)])
+        self.assertEqual(calls[0].created.start_revision, 3)
+        self.assertEqual(calls[1].created.start_revision, 6)
+        self.assertEqual(handle.revision, 6)
+
+
+class TestControllerAsyncMethods(unittest.TestCase):
+
+    def test_node_controller_flushes_then_reads_asynchronously(self):
+        async_client = AsyncMock()
+        async_client.apply_batch.return_value = True
+        async_client.get_with_prefix.side_effect = lambda prefix: {
+            "nodes/": [json.dumps({"name": "n1"})],
+            "bindings/": [json.dumps({"node": "n1", "namespace": "default", "pod": "p"})],
+        }[prefix]
+        etcd_client = MagicMock()
+        controller = NodeController(etcd_client, flush_interval=10, async_etcd_client=async_client)
+        controller.add_node("n1", "10.0.0.1", 4, 8, 0, 0, 0)
+
+        nodes = asyncio.run(controller.get_all_nodes_async())
+
+        etcd_client.apply_batch.assert_not_called()
+        puts, deletes = async_client.apply_batch.call_args[0]
+        self.assertEqual([key for key, _ in puts], ["nodes/n1"])
+        self.assertEqual(nodes["n1"]["pods"][0]["pod"], "p")
+
+    def test_flush_async_waits_for_lock_held_by_another_thread(self):
+        async_client = AsyncMock()
+        async_client.apply_batch.return_value = True
+        controller = NodeController(MagicMock(), flush_interval=10, async_etcd_client=async_client)
+        controller.add_node("n1", "10.0.0.1", 4, 8, 0, 0, 0)
+
+        async def run():
+            controller._flush_lock.acquire()
+            flush = asyncio.ensure_future(controller.flush_async())
+            await asyncio.sleep(0.05)
+            self.assertFalse(flush.done())
+            async_client.apply_batch.assert_not_called()
+            controller._flush_lock.release()
+            self.assertTrue(await flush)
+
+            # 等待期间被取消时，稍后拿到的锁会被释放
+            controller._flush_lock.acquire()
+            cancelled = asyncio.ensure_future(controller.flush_async())
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            controller._flush_lock.release()
+            with self.assertRaises(asyncio.CancelledError):
+                await cancelled
+            await asyncio.sleep(0.05)
+            self.assertTrue(controller._flush_lock.acquire(timeout=1))
+            controller._flush_lock.release()
+
+        asyncio.run(run())
+        async_client.apply_batch.assert_called_once()
+
+    def test_remove_node_async(self):
+        async_client = AsyncMock()
+        async_client.apply_batch.return_value = True
+        controller = NodeController(MagicMock(), flush_interval=10, async_etcd_client=async_client)
+        controller.add_node("n1", "10.0.0.1", 4, 8, 0, 0, 0)
+        asyncio.run(controller.remove_node_async("n1"))
+        self.assertNotIn("n1", controller.nodes)
+        async_client.apply_batch.assert_called_once_with((), ["nodes/n1"], ["bindings/n1/"])
+
+    def test_pod_controller_start_and_delete_async(self):
+        async_client = AsyncMock()
+        etcd_client = MagicMock()
+        controller = PodController(etcd_client, AsyncMock(), AsyncMock(), async_etcd_client=async_client)
+
+        async def run():
+            await controller.create_pod_async("web", [make_container("c0")])
+            await controller.start_pod_async("web")
+            await controller.delete_pod_async("web")
+
+        asyncio.run(run())
+        etcd_client.put.assert_not_called()
+        etcd_client.put_many.assert_not_called()
+        self.assertEqual(async_client.put_many.call_count, 2)  # start 与 delete 前的 stop
+        items = dict(async_client.put_many.call_args_list[0][0][0])
+        self.assertEqual(json.loads(items["pods/default/web"])['status'], 'Running')
+        async_client.apply_batch.assert_called_once_with((), ["pods/default/web"], ["/pods/default/web/"])
+
+    def test_async_methods_fall_back_to_sync_client(self):
+        etcd_client = MagicMock()
+        controller = PodController(etcd_client, MagicMock(), MagicMock())
+        asyncio.run(controller.create_pod_async("web", [make_container("c0")]))
+        etcd_client.put.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+from node.node_controller import NodeController
+from orchestrator.kube_scheduler_plus import Kube_Scheduler_Plus
+from tests.helpers import add_nodes, make_pod
+
+
+class TestKubeSchedulerPlusBatch(unittest.TestCase):
+
+    def make_cluster(self):
+        etcd_client = MagicMock()
+        etcd_client.apply_batch.return_value = True
+        controller = NodeController(etcd_client, flush_interval=0)
+        add_nodes(controller, ("node1", 4, 2), ("node2", 2, 1))
+        etcd_client.reset_mock()
+        return controller, Kube_Scheduler_Plus(controller)
+
+    def test_batch_matches_sequential_placement(self):
+        _, sequential = self.make_cluster()
+        expected = [sequential.schedule_pod(make_pod(f"pod{i}", cpu="700m")) for i in range(6)]
+
+        _, batch = self.make_cluster()
+        results = batch.schedule_pods([make_pod(f"pod{i}", cpu="700m") for i in range(6)])
+        self.assertEqual([r['node_name'] for r in results], expected)
+
+    def test_batch_writes_nodes_in_one_transaction(self):
+        controller, scheduler = self.make_cluster()
+        scheduler.schedule_pods([make_pod(f"pod{i}") for i in range(10)])
+
+        controller.etcd_client.put.assert_not_called()
+        controller.etcd_client.apply_batch.assert_called_once()
+        items = dict(controller.etcd_client.apply_batch.call_args[0][0])
+        node_items = {key: value for key, value in items.items() if key.startswith("nodes/")}
+        self.assertEqual(set(node_items), {"nodes/node1", "nodes/node2"})
+        pod_count = sum(json.loads(value)['pod_count'] for value in node_items.values())
+        self.assertEqual(pod_count, 10)
+        self.assertEqual(len([key for key in items if key.startswith("bindings/")]), 10)
+
+    def test_batch_reports_unschedulable_pods(self):
+        controller, scheduler = self.make_cluster()
+        results = scheduler.schedule_pods([make_pod("small"), make_pod("huge", cpu="64")])
+        self.assertIsNotNone(results[0]['node_name'])
+        self.assertIsNone(results[1]['node_name'])
+        self.assertIn('error', results[1])
+        self.assertEqual(len(scheduler.get_schedule_history()), 1)
+
+    def test_failed_sync_rolls_back_batch(self):
+        controller, scheduler = self.make_cluster()
+        controller.etcd_client.apply_batch.return_value = False
+        results = scheduler.schedule_pods([make_pod(f"pod{i}") for i in range(4)])
+        self.assertEqual([r['node_name'] for r in results], [None] * 4)
+        self.assertTrue(all('Failed to persist' in r['error'] for r in results))
+        self.assertEqual(scheduler.get_schedule_history(), [])
+        for node in controller.nodes.values():
+            self.assertEqual(node.pods, [])
+            self.assertEqual(node.allocated_cpu, 0)
+        self.assertEqual(controller.resource_matrix.allocated.sum(), 0)
+
+        # 下一次写回时节点记录恢复为撤销后的状态，未写入的绑定改为删除
+        controller.etcd_client.apply_batch.return_value = True
+        self.assertTrue(controller.flush())
+        puts, deletes = controller.etcd_client.apply_batch.call_args[0]
+        self.assertEqual({key: json.loads(value)['pod_count'] for key, value in puts},
+                         {"nodes/node1": 0, "nodes/node2": 0})
+        self.assertEqual(len(deletes), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import stat
+import subprocess
+import tempfile
+import textwrap
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from container.command_executor import CommandExecutor
+from container.container_runtime import ContainerRuntime
+from container.image_handler import ImageHandler
+
+# 假的 ctr：记录参数；镜像名中包含 slow 时休眠，包含 missing 时失败
+FAKE_CTR = textwrap.dedent('''\
+    #!/bin/sh
+    echo "$@" >> "$FAKE_CTR_LOG"
+    case "$*" in
+        *slow*) sleep "${FAKE_CTR_SLEEP:-0.3}" ;;
+        *missing*) echo "image not found" >&2; exit 1 ;;
+        "images list") echo "REF TYPE"; echo "alpine:latest application/vnd" ;;
+    esac
+    exit 0
+''')
+FAKE_SUDO = '#!/bin/sh\nexec "$@"\n'
+
+
+class TestCommandExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name, content in (('ctr', FAKE_CTR), ('sudo', FAKE_SUDO)):
+            path = os.path.join(self.tmp.name, name)
+            with open(path, 'w') as f:
+                f.write(content)
+            os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        self.log = os.path.join(self.tmp.name, 'ctr.log')
+        self.env = {'PATH': f"{self.tmp.name}{os.pathsep}{os.environ['PATH']}", 'FAKE_CTR_LOG': self.log}
+        self._old_env = {key: os.environ.get(key) for key in self.env}
+        os.environ.update(self.env)
+        self.addCleanup(self._restore_env)
+
+    def _restore_env(self):
+        for key, value in self._old_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    def calls(self):
+        with open(self.log) as f:
+            return f.read().splitlines()
+
+    def test_image_handler_async(self):
+        handler = ImageHandler(CommandExecutor())
+
+        async def run():
+            return (await handler.pull_image_async("alpine:latest"), await handler.pull_image_async("missing:1"),
+                    await handler.list_images_async())
+
+        pulled, missing, images = asyncio.run(run())
+        self.assertTrue(pulled)
+        self.assertFalse(missing)
+        self.assertEqual(images, ["REF TYPE", "alpine:latest application/vnd"])
+        self.assertEqual(self.calls()[0], "images pull alpine:latest")
+
+    def test_timeout_kills_process(self):
+        executor = CommandExecutor(default_timeout=0.05)
+        start = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            asyncio.run(executor.run(['ctr', 'images', 'pull', 'slow:1']))
+        self.assertLess(time.monotonic() - start, 0.3)
+
+    def test_concurrency_limit(self):
+        executor = CommandExecutor(max_concurrency=2)
+        os.environ['FAKE_CTR_SLEEP'] = '0.2'
+        self.addCleanup(os.environ.pop, 'FAKE_CTR_SLEEP', None)
+
+        async def run():
+            return await asyncio.gather(*(executor.run(['ctr', 'images', 'pull', f'slow:{i}']) for i in range(4)))
+
+        start = time.monotonic()
+        results = asyncio.run(run())
+        self.assertGreaterEqual(time.monotonic() - start, 0.4)
+        self.assertEqual([result.returncode for result in results], [0] * 4)
+
+    def test_cancellation_stops_waiting(self):
+        executor = CommandExecutor()
+
+        async def run():
+            task = asyncio.ensure_future(executor.run(['ctr', 'images', 'pull', 'slow:1']))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        start = time.monotonic()
+        asyncio.run(run())
+        self.assertLess(time.monotonic() - start, 0.25)
+
+    def test_event_loop_is_not_blocked(self):
+        runtime = ContainerRuntime(MagicMock(), CommandExecutor())
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def run():
+            await asyncio.gather(runtime.start_container_async(SimpleNamespace(name='slow-c')), ticker())
+
+        asyncio.run(run())
+        self.assertEqual(len(ticks), 5)
+        self.assertLess(ticks[-1] - ticks[0], 0.25)
+        self.assertEqual(self.calls(), ["task start slow-c"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import numpy as np
+from orchestrator.DDQN_scheduler import DDQNScheduler
+from orchestrator.ddqn_checkpoint import DDQNCheckpointer, load_checkpointer
+
+
+def make_scheduler(checkpointer=None):
+    node_controller = MagicMock()
+    node_controller.nodes = {'node1': MagicMock(), 'node2': MagicMock()}
+    return DDQNScheduler(node_controller, checkpointer=checkpointer)
+
+
+def train(scheduler, steps):
+    rng = np.random.default_rng(0)
+    for i in range(scheduler.config['batch_size']):
+        scheduler.remember(rng.random((1, scheduler.state_size)), i % 2, 1.0,
+                           rng.random((1, scheduler.state_size)), False)
+    for _ in range(steps):
+        scheduler.replay()
+
+
+class TestDDQNCheckpointer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, 'ddqn')
+        self.checkpointer = DDQNCheckpointer(self.directory, interval=2, keep=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_periodic_save_and_prune(self):
+        train(make_scheduler(self.checkpointer), 7)
+        self.assertEqual([step for step, _ in self.checkpointer.checkpoints()], [6, 4])
+        self.assertEqual([name for name in os.listdir(self.directory) if name.endswith('.tmp')], [])
+
+    def test_restore_warm_starts_scheduler(self):
+        scheduler = make_scheduler(self.checkpointer)
+        train(scheduler, 4)
+        restored = make_scheduler(self.checkpointer)
+        self.assertEqual(restored.update_counter, 4)
+        self.assertEqual(restored.config['epsilon'], scheduler.config['epsilon'])
+        for a, b in zip(scheduler.model.get_weights(), restored.model.get_weights()):
+            np.testing.assert_array_equal(a, b)
+        for a, b in zip(scheduler.target_model.get_weights(), restored.target_model.get_weights()):
+            np.testing.assert_array_equal(a, b)
+        for a, b in zip(scheduler.model.optimizer.variables, restored.model.optimizer.variables):
+            np.testing.assert_array_equal(a.numpy(), b.numpy())
+
+    def test_skips_corrupt_and_incompatible_checkpoints(self):
+        scheduler = make_scheduler(self.checkpointer)
+        train(scheduler, 2)
+        with open(os.path.join(self.directory, 'ckpt-00000009.npz'), 'wb') as f:
+            f.write(b'truncated')
+        open(os.path.join(self.directory, '.ckpt-abc.tmp'), 'wb').close()
+        restored = make_scheduler(self.checkpointer)
+        self.assertEqual(restored.update_counter, 2)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, '.ckpt-abc.tmp')))
+
+        with patch('orchestrator.DDQN_scheduler.NODE_FEATURES', 10):
+            fresh = make_scheduler(self.checkpointer)
+        self.assertEqual(fresh.update_counter, 0)
+        self.assertEqual(fresh.config['epsilon'], 1.0)
+
+    def test_failed_write_keeps_previous_checkpoint(self):
+        scheduler = make_scheduler(self.checkpointer)
+        train(scheduler, 2)
+        with patch('orchestrator.ddqn_checkpoint.np.savez', side_effect=OSError("disk full")):
+            train(scheduler, 2)
+        self.assertEqual([step for step, _ in self.checkpointer.checkpoints()], [2])
+        self.assertEqual(os.listdir(self.directory), ['ckpt-00000002.npz'])
+
+    def test_load_checkpointer_from_config(self):
+        config_file = os.path.join(self.tmp.name, 'config.yaml')
+        with open(config_file, 'w') as f:
+            f.write("ddqn_checkpoint:\n  directory: /tmp/x\n  interval: 5\n")
+        checkpointer = load_checkpointer(config_file)
+        self.assertEqual((checkpointer.directory, checkpointer.interval), ('/tmp/x', 5))
+        with open(config_file, 'w') as f:
+            f.write("ddqn_checkpoint:\n  enabled: false\n")
+        self.assertIsNone(load_checkpointer(config_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+from orchestrator.DDQN_scheduler import DDQNScheduler
+from orchestrator.ddqn_learner import DDQNLearner
+from utils.quantity import ResourceVector
+
+
+def make_node(name):
+    return MagicMock(allocated_cpu=0, allocated_memory=0, allocated_gpu=0, total_cpu=4, total_memory=16,
+                     total_gpu=2, status='Ready')
+
+
+class TestDDQNLearner(unittest.TestCase):
+
+    def setUp(self):
+        self.node_controller = MagicMock()
+        self.node_controller.nodes = {'node1': make_node('node1'), 'node2': make_node('node2')}
+        self.node_controller.get_node.side_effect = lambda name: self.node_controller.nodes[name]
+        self.node_controller.load_balance_stats.balance_factors.return_value = (1.0, 1.0, 1.0)
+        self.scheduler = DDQNScheduler(self.node_controller)
+        self.rng = np.random.default_rng(0)
+
+    def transition(self, nodes=2):
+        return (self.rng.random((1, 9 * nodes)), 0, 1.0, self.rng.random((1, 9 * nodes)), False)
+
+    def test_predict_uses_published_snapshot(self):
+        state = self.rng.random((3, 18))
+        np.testing.assert_allclose(self.scheduler.predict(state),
+                                   self.scheduler.q_values(self.scheduler.model, state).numpy(), rtol=1e-5, atol=1e-6)
+        self.scheduler.config['publish_interval'] = 1000
+        before = self.scheduler.predict(state)
+        for _ in range(self.scheduler.config['batch_size']):
+            self.scheduler.remember(*self.transition())
+        for _ in range(5):
+            self.scheduler.replay()
+        # 训练只修改在线网络，发布之前推理结果不变
+        np.testing.assert_array_equal(self.scheduler.predict(state), before)
+        self.scheduler.publish_weights()
+        self.assertFalse(np.allclose(self.scheduler.predict(state), before))
+
+    def test_schedule_pod_only_submits_transition(self):
+        learner = DDQNLearner(self.scheduler)  # 不启动线程，经历停留在队列中
+        self.scheduler.learner = learner
+        self.scheduler.replay = MagicMock()
+        pod = MagicMock()
+        pod.name = 'web'
+        pod.request_vector = ResourceVector()
+        self.assertIn(self.scheduler.schedule_pod(pod), ('node1', 'node2'))
+        self.assertEqual(learner.pending(), 1)
+        self.assertEqual(len(self.scheduler.memory), 0)
+        self.scheduler.replay.assert_not_called()
+
+    def test_background_training(self):
+        learner = self.scheduler.start_learner()
+        try:
+            for _ in range(10):
+                self.assertTrue(learner.submit(*self.transition()))
+            learner.flush()
+            self.assertEqual(len(self.scheduler.memory), 10)
+            self.assertEqual(self.scheduler.update_counter, 3)
+            # 节点数变化后旧经历被丢弃
+            learner.submit(*self.transition(nodes=3))
+            learner.flush()
+            self.assertEqual(len(self.scheduler.memory), 1)
+            self.assertEqual(self.scheduler.memory.state_size, 27)
+        finally:
+            self.scheduler.stop_learner()
+        self.assertIsNone(self.scheduler.learner)
+
+    def test_full_queue_drops_transitions(self):
+        learner = DDQNLearner(self.scheduler, max_pending=1)
+        self.assertTrue(learner.submit(*self.transition()))
+        self.assertFalse(learner.submit(*self.transition()))
+        self.assertEqual(learner.dropped, 1)
+
+    def test_flush_returns_when_not_running(self):
+        learner = DDQNLearner(self.scheduler)
+        self.assertTrue(learner.flush())
+        learner.submit(*self.transition())
+        self.assertFalse(learner.flush())  # 线程未启动，不会一直等待
+        learner.start()
+        learner.stop()
+        learner.submit(*self.transition())
+        self.assertFalse(learner.flush())
+
+    def test_stop_discards_pending_transitions(self):
+        learner = DDQNLearner(self.scheduler)
+        for _ in range(3):
+            learner.submit(*self.transition())
+        with self.assertLogs(level='WARNING'):
+            learner.stop()
+        self.assertEqual(learner.pending(), 0)
+        self.assertEqual(learner.dropped, 3)
+        self.assertEqual(len(self.scheduler.memory), 0)
+        self.assertTrue(learner.flush())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from etcd.etcd_client import EtcdClient
+
+
+class TestEtcdClient(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('etcd.etcd_client.etcd3.client')
+        self.mock_factory = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client = self.mock_factory.return_value
+        self.client = EtcdClient()
+
+    def test_put_many_uses_single_transaction(self):
+        result = self.client.put_many([("a", "1"), ("b", "2")])
+        self.assertTrue(result)
+        self.mock_client.transaction.assert_called_once()
+        self.assertEqual(len(self.mock_client.transaction.call_args.kwargs['success']), 2)
+
+    def test_put_many_empty_is_noop(self):
+        self.assertTrue(self.client.put_many([]))
+        self.mock_client.transaction.assert_not_called()
+
+    def test_put_many_failure_returns_false(self):
+        self.mock_client.transaction.side_effect = Exception("unavailable")
+        self.assertFalse(self.client.put_many({"a": "1"}))
+
+    def test_apply_batch_combines_puts_and_deletes(self):
+        self.assertTrue(self.client.apply_batch([("a", "1")], ["b", "c"]))
+        self.mock_client.transaction.assert_called_once()
+        self.assertEqual(len(self.mock_client.transaction.call_args.kwargs['success']), 3)
+        self.mock_client.transactions.delete.assert_any_call("b")
+
+    def test_apply_batch_chunks_under_max_txn_ops(self):
+        self.client.max_txn_ops = 2
+        self.assertTrue(self.client.put_many([(f"k{i}", "v") for i in range(5)]))
+        sizes = [len(call.kwargs['success']) for call in self.mock_client.transaction.call_args_list]
+        self.assertEqual(sizes, [2, 2, 1])
+
+    def test_apply_batch_stops_at_failed_chunk(self):
+        self.client.max_txn_ops = 1
+        self.mock_client.transaction.side_effect = [None, Exception("unavailable"), None]
+        self.assertFalse(self.client.delete_many(["a", "b", "c"]))
+        self.assertEqual(self.mock_client.transaction.call_count, 2)
+
+    def test_apply_batch_prefix_delete_is_range_op(self):
+        self.client.apply_batch((), (), ["pods/default/web/"])
+        self.mock_client.transactions.delete.assert_called_once_with("pods/default/web/", range_end=b"pods/default/web0")
+
+    def test_delete_prefix_is_single_rpc(self):
+        self.mock_client.delete_prefix.return_value.deleted = 3
+        self.assertTrue(self.client.delete_with_prefix("bindings/node1/"))
+        self.mock_client.delete_prefix.assert_called_once_with("bindings/node1/")
+        self.mock_client.get_prefix.assert_not_called()
+        self.mock_client.delete.assert_not_called()
+
+
+def range_page(keys, more=False, revision=7):
+    kvs = [SimpleNamespace(key=key.encode(), value=f"v-{key}".encode()) for key in keys]
+    return SimpleNamespace(kvs=kvs, more=more, count=len(keys), header=SimpleNamespace(revision=revision))
+
+
+class TestEtcdClientRangeReads(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('etcd.etcd_client.etcd3.client')
+        self.mock_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.client = EtcdClient()
+        self.range = self.mock_client.kvstub.Range
+
+    def requests(self):
+        return [call.args[0] for call in self.range.call_args_list]
+
+    def test_iter_prefix_pages_with_key_continuation(self):
+        self.range.side_effect = [range_page(["pods/a", "pods/b"], more=True, revision=9),
+                                  range_page(["pods/c"], revision=12)]
+        items = list(self.client.iter_prefix("pods/", page_size=2))
+        self.assertEqual(items, [("pods/a", "v-pods/a"), ("pods/b", "v-pods/b"), ("pods/c", "v-pods/c")])
+        first, second = self.requests()
+        self.assertEqual(first.limit, 2)
+        self.assertEqual(first.range_end, b"pods0")
+        self.assertEqual(first.revision, 0)
+        self.assertEqual(second.key, b"pods/b\0")
+        self.assertEqual(second.revision, 9)
+
+    def test_iter_prefix_keys_only(self):
+        self.range.return_value = range_page(["pods/a"])
+        self.assertEqual(list(self.client.iter_prefix("pods/", keys_only=True)), [("pods/a", None)])
+        self.assertTrue(self.requests()[0].keys_only)
+
+    def test_count_and_exists_are_count_only(self):
+        self.range.return_value = SimpleNamespace(count=42)
+        self.assertEqual(self.client.count_prefix("pods/"), 42)
+        self.assertTrue(self.client.exists("pods/a"))
+        self.assertTrue(all(request.count_only for request in self.requests()))
+        self.assertEqual(self.requests()[1].range_end, b"")
+
+    def test_get_with_prefix_returns_values_from_pages(self):
+        self.range.side_effect = [range_page(["a/1"], more=True), range_page(["a/2"])]
+        self.assertEqual(self.client.get_with_prefix("a/"), ["v-a/1", "v-a/2"])
+
+    def test_get_prefix_with_revision_uses_first_page_revision(self):
+        self.range.side_effect = [range_page(["a/1"], more=True, revision=3), range_page(["a/2"], revision=5)]
+        items, revision = self.client.get_prefix_with_revision("a/")
+        self.assertEqual(len(items), 2)
+        self.assertEqual(revision, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
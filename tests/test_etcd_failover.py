@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from etcd3 import exceptions
+from etcd.etcd_client import EtcdClient
+
+
+class TestEtcdClientFailover(unittest.TestCase):
+
+    def setUp(self):
+        self.clients = {}
+
+        def make_client(host, port):
+            client = MagicMock(name=f"{host}:{port}")
+            client.get.return_value = (b"value", None)
+            self.clients[f"{host}:{port}"] = client
+            return client
+
+        patcher = patch('etcd.etcd_client.etcd3.client', side_effect=make_client)
+        self.factory = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = EtcdClient(endpoints=["e1:2379", "e2:2379", "e3:2379"])
+        self.e1, self.e2, self.e3 = (self.clients[f"e{i}:2379"] for i in (1, 2, 3))
+
+    def test_channels_are_created_once_per_endpoint(self):
+        for _ in range(5):
+            self.client.get("key")
+            self.client.put("key", "value")
+        self.assertEqual(self.factory.call_count, 3)
+
+    def test_reads_are_spread_over_endpoints(self):
+        for _ in range(6):
+            self.assertEqual(self.client.get("key"), "value")
+        self.assertEqual([c.get.call_count for c in (self.e1, self.e2, self.e3)], [2, 2, 2])
+
+    def test_write_fails_over_and_switches_primary(self):
+        self.e1.put.side_effect = exceptions.ConnectionFailedError()
+        self.client.put("a", "1")
+        self.client.put("b", "2")
+        self.assertEqual(self.e1.put.call_count, 1)
+        self.assertEqual(self.e2.put.call_count, 2)
+        self.assertIs(self.client.client, self.e2)
+
+    def test_unavailable_endpoint_is_tried_last_until_backoff_expires(self):
+        self.e1.get.side_effect = exceptions.ConnectionTimeoutError()
+        for _ in range(6):
+            self.assertEqual(self.client.get("key"), "value")
+        self.assertEqual(self.e1.get.call_count, 1)
+
+    def test_all_endpoints_down_raises_last_error(self):
+        for client in (self.e1, self.e2, self.e3):
+            client.status.side_effect = exceptions.ConnectionFailedError()
+        with self.assertRaises(exceptions.ConnectionFailedError):
+            self.client._execute(lambda client: client.status(), read=True)
+
+    def test_other_errors_do_not_fail_over(self):
+        self.e1.status.side_effect = ValueError("bad request")
+        with self.assertRaises(ValueError):
+            self.client._execute(lambda client: client.status())
+        self.e2.status.assert_not_called()
+
+
+class TestSharedEtcdClient(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('etcd.etcd_client.etcd3.client')
+        self.factory = patcher.start()
+        self.addCleanup(patcher.stop)
+        EtcdClient._shared = None
+        self.addCleanup(setattr, EtcdClient, '_shared', None)
+
+    def test_shared_client_uses_configured_endpoints(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as config:
+            config.write("etcd:\n  nodes:\n    - 10.0.0.1:2379\n    - 10.0.0.2:2379\n")
+        self.addCleanup(os.remove, config.name)
+        shared = EtcdClient.shared(config.name)
+        self.assertIs(EtcdClient.shared(config.name), shared)
+        self.assertEqual(shared.endpoints, ["10.0.0.1:2379", "10.0.0.2:2379"])
+
+    def test_container_reuses_shared_client(self):
+        from container.container import Container
+        first = Container(name="c1", image="alpine")
+        second = Container(name="c2", image="alpine")
+        self.assertIs(first.etcd_client, second.etcd_client)
+        self.assertEqual(self.factory.call_count, len(first.etcd_client.endpoints))
+
+
+if __name__ == '__main__':
+    unittest.main()
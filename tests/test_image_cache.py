@@ -0,0 +1,176 @@
+import asyncio
+import json
+import subprocess
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from container.image_cache import ImageCacheIndex, parse_pull_digest
+from container.image_handler import ImageHandler
+from etcd.prefix_watcher import WatchEvent
+from node.image_prepuller import ImagePrePuller
+from pod.pod_controller import PodController
+from tests.helpers import make_container
+
+DIGEST_A = "sha256:" + "a" * 64
+DIGEST_B = "sha256:" + "b" * 64
+LISTING = [
+    "REF                             TYPE                                                      DIGEST  SIZE     PLATFORMS    LABELS",
+    f"docker.io/library/nginx:latest  application/vnd.oci.image.index.v1+json  {DIGEST_A} 67.3 MiB linux/amd64 -",
+    f"docker.io/library/nginx:1.27    application/vnd.oci.image.index.v1+json  {DIGEST_A} 67.3 MiB linux/amd64 -",
+    f"docker.io/library/alpine:latest application/vnd.oci.image.index.v1+json  {DIGEST_B} 3.5 MiB  linux/amd64 -",
+]
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+class TestImageCacheIndex(unittest.TestCase):
+
+    def test_refresh_groups_refs_by_digest(self):
+        cache = ImageCacheIndex()
+        self.assertEqual(cache.refresh(LISTING, now=1), 2)
+        record = cache.get("docker.io/library/nginx:1.27")
+        self.assertEqual(record.digest, DIGEST_A)
+        self.assertEqual(record.size, int(67.3 * 1024 ** 2))
+        self.assertEqual(record.refs, {"docker.io/library/nginx:latest", "docker.io/library/nginx:1.27"})
+        self.assertEqual(cache.total_size(), int(67.3 * 1024 ** 2) + int(3.5 * 1024 ** 2))
+
+    def test_refresh_keeps_last_used_and_drops_missing(self):
+        cache = ImageCacheIndex()
+        cache.record_pull("docker.io/library/alpine:latest", now=5)
+        cache.record_pull("busybox:latest", now=5)
+        cache.refresh(LISTING, now=10)
+        self.assertEqual(cache.get("docker.io/library/alpine:latest").last_used, 5)
+        self.assertEqual(cache.get("docker.io/library/alpine:latest").digest, DIGEST_B)
+        self.assertNotIn("busybox:latest", cache)
+
+    def test_remove_last_ref_drops_digest(self):
+        cache = ImageCacheIndex()
+        cache.refresh(LISTING)
+        cache.remove("docker.io/library/nginx:latest")
+        self.assertEqual(len(cache), 2)
+        cache.remove("docker.io/library/nginx:1.27")
+        self.assertEqual(len(cache), 1)
+        self.assertFalse(cache.touch("docker.io/library/nginx:1.27"))
+
+    def test_parse_pull_digest(self):
+        output = f"resolved docker.io/library/alpine:latest\nunpacking linux/amd64 {DIGEST_B}...\ndone: 1.2s\n"
+        self.assertEqual(parse_pull_digest(output), DIGEST_B)
+        self.assertIsNone(parse_pull_digest(MagicMock()))
+
+
+class TestImagePullDeduplication(unittest.TestCase):
+
+    @patch('subprocess.run')
+    def test_concurrent_pulls_share_one_ctr_call(self, mock_run):
+        def slow_pull(*args, **kwargs):
+            time.sleep(0.1)
+            return MagicMock(returncode=0, stdout=f"unpacking linux/amd64 {DIGEST_A}...")
+
+        mock_run.side_effect = slow_pull
+        handler = ImageHandler()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(handler.ensure_image("nginx:latest")))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [True] * 5)
+        self.assertEqual(mock_run.call_count, 1)
+        self.assertEqual(handler.cache.get("nginx:latest").digest, DIGEST_A)
+
+        self.assertTrue(handler.ensure_image("nginx:latest"))
+        self.assertEqual(mock_run.call_count, 1)
+
+    @patch('subprocess.run')
+    def test_failed_pull_is_not_cached(self, mock_run):
+        mock_run.side_effect = subprocess.CalledProcessError(1, 'cmd', stderr='not found')
+        handler = ImageHandler()
+        self.assertFalse(handler.ensure_image("missing:1"))
+        self.assertFalse(handler.ensure_image("missing:1"))
+        self.assertEqual(mock_run.call_count, 2)
+
+    def test_async_pulls_share_one_task(self):
+        calls = []
+
+        async def run(cmd, timeout=None, check=False):
+            calls.append(cmd)
+            await asyncio.sleep(0.05)
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+
+        handler = ImageHandler(SimpleNamespace(run=run))
+
+        async def main():
+            waiter = asyncio.ensure_future(handler.pull_image_async("nginx:latest"))
+            await asyncio.sleep(0)
+            waiter.cancel()  # 取消一个等待方不影响其他等待方
+            return await asyncio.gather(*(handler.ensure_image_async("nginx:latest") for _ in range(4)))
+
+        self.assertEqual(asyncio.run(main()), [True] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertIn("nginx:latest", handler.cache)
+
+
+class TestImagePrePuller(unittest.TestCase):
+
+    def setUp(self):
+        self.etcd_client = MagicMock()
+        pods = {
+            "pods/default/web": {"containers": [{"image": "nginx:latest"}, {"image": "redis:7"}]},
+            "pods/default/api": {"containers": [{"image": "nginx:latest"}]},
+        }
+        self.etcd_client.get.side_effect = lambda key: json.dumps(pods[key]) if key in pods else None
+        self.etcd_client.get_prefix_with_revision.return_value = (
+            [("bindings/n1/default/web", json.dumps({"node": "n1", "namespace": "default", "pod": "web"}))], 3)
+        self.handler = MagicMock()
+        self.handler.cache = ImageCacheIndex()
+        self.handler.pull_image.side_effect = lambda image: self.handler.cache.record_pull(image) or True
+        self.prepuller = ImagePrePuller(self.handler, self.etcd_client, "n1")
+        self.addCleanup(self.prepuller.stop)
+
+    def test_pulls_images_of_bound_pods(self):
+        self.prepuller.start()
+        self.assertEqual(self.etcd_client.watch_prefix.call_args[0][0], "bindings/n1/")
+        self.assertEqual(self.etcd_client.watch_prefix.call_args[1]['start_revision'], 4)
+        self.assertTrue(wait_until(lambda: self.handler.pull_image.call_count == 2))
+        self.assertEqual({call[0][0] for call in self.handler.pull_image.call_args_list}, {"nginx:latest", "redis:7"})
+
+        on_event = self.etcd_client.watch_prefix.call_args[0][1]
+        on_event(WatchEvent('put', "bindings/n1/default/api",
+                            json.dumps({"node": "n1", "namespace": "default", "pod": "api"}), 5))
+        time.sleep(0.05)
+        self.assertEqual(self.handler.pull_image.call_count, 2)
+
+    def test_enqueue_skips_duplicates(self):
+        self.assertEqual(self.prepuller.enqueue(["nginx:latest", "nginx:latest", None]), 1)
+        self.assertEqual(self.prepuller.pending(), {"nginx:latest"})
+
+
+class TestPodStartEnsuresImages(unittest.TestCase):
+
+    def test_start_pod_ensures_images(self):
+        handler = MagicMock()
+        handler.ensure_image.return_value = True
+        controller = PodController(MagicMock(), MagicMock(), MagicMock(), image_handler=handler)
+        containers = [make_container(f"c{i}", image="nginx:latest") for i in range(2)]
+        controller.create_pod("web", containers)
+        controller.start_pod("web")
+        self.assertEqual(handler.ensure_image.call_count, 2)
+        self.assertEqual(controller.get_pod("web").status, 'Running')
+
+        handler.ensure_image.return_value = False
+        controller.create_pod("db", [make_container("d0", image="missing:1")])
+        controller.start_pod("db")
+        created = [call[0][0].name for call in controller.container_manager.create_container.call_args_list]
+        self.assertEqual(sorted(created), ["c0", "c1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
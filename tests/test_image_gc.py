@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock
+from container.image_cache import ImageCacheIndex
+from node.image_gc import ImageGarbageCollector
+from pod.pod_controller import PodController
+from tests.helpers import make_container
+
+MiB = 1024 ** 2
+
+
+class TestImageGarbageCollector(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ImageCacheIndex()
+        for ref, digest, size, last_used in (("old:1", "sha256:old", 40 * MiB, 100),
+                                             ("older:1", "sha256:older", 30 * MiB, 50),
+                                             ("busy:1", "sha256:busy", 80 * MiB, 10),
+                                             ("fresh:1", "sha256:fresh", 50 * MiB, 990)):
+            self.cache.record_pull(ref, digest, size, now=last_used)
+        self.cache.record_pull("old:latest", "sha256:old", now=100)
+        self.handler = MagicMock()
+        self.handler.cache = self.cache
+        self.handler.remove_image.side_effect = lambda ref: self.cache.remove(ref) or True
+        self.in_use = {"busy:1"}
+        self.usage = (1000 * MiB, 900 * MiB, 100 * MiB)
+
+    def make_gc(self, **kwargs):
+        return ImageGarbageCollector(self.handler, lambda: self.in_use, disk_usage=lambda path: self.usage,
+                                     min_age=60, **kwargs)
+
+    def test_below_high_watermark_does_nothing(self):
+        self.usage = (1000 * MiB, 800 * MiB, 200 * MiB)
+        self.assertEqual(self.make_gc().collect(now=1000), [])
+        self.handler.list_images.assert_not_called()
+
+    def test_evicts_least_recently_used_until_low_watermark(self):
+        # 需从 900 MiB 降到 800 MiB：按 LRU 依次删除 older（30）、old（40，两个引用），仍不足时不动 busy 与 fresh
+        removed = self.make_gc().collect(now=1000)
+        self.assertEqual(removed, ["older:1", "old:1", "old:latest"])
+        self.assertIn("busy:1", self.cache)
+        self.assertIn("fresh:1", self.cache)
+        self.handler.list_images.assert_called_once()
+
+    def test_stops_once_enough_space_is_freed(self):
+        self.usage = (1000 * MiB, 860 * MiB, 140 * MiB)
+        self.assertEqual(self.make_gc().collect(now=1000), ["older:1", "old:1", "old:latest"])
+        self.usage = (1000 * MiB, 850 * MiB, 150 * MiB)
+        self.cache.record_pull("older:1", "sha256:older", 30 * MiB, now=50)
+        self.cache.record_pull("old:1", "sha256:old", 40 * MiB, now=100)
+        self.assertEqual(self.make_gc(low_threshold=83).collect(now=1000), ["older:1"])
+
+    def test_failed_removal_does_not_count(self):
+        self.handler.remove_image.side_effect = lambda ref: ref != "older:1" and (self.cache.remove(ref) or True)
+        self.assertEqual(self.make_gc().collect(now=1000), ["old:1", "old:latest"])
+
+    def test_invalid_thresholds(self):
+        with self.assertRaises(ValueError):
+            self.make_gc(high_threshold=70, low_threshold=80)
+
+    def test_pod_images_are_in_use(self):
+        controller = PodController(MagicMock(), MagicMock(), MagicMock())
+        controller.create_pod("web", [make_container("c0", image="busy:1")])
+        gc = ImageGarbageCollector(self.handler, controller.images_in_use, disk_usage=lambda path: self.usage,
+                                   min_age=0)
+        self.assertNotIn("busy:1", gc.collect(now=1000))
+        self.assertIn("busy:1", self.cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+from container.image_cache import ImageCacheIndex
+from container.image_handler import ImageHandler
+from etcd.prefix_watcher import WatchEvent
+from node.image_reporter import ImageStateReporter
+from node.node_controller import NodeController
+from orchestrator.image_locality import ImageLocality, create_image_informer
+from orchestrator.kube_scheduler_plus import Kube_Scheduler_Plus
+from tests.helpers import add_nodes, make_pod
+
+MiB = 1024 ** 2
+TOMCAT = "docker.m.daocloud.io/library/tomcat:latest"
+BUSYBOX = "docker.m.daocloud.io/library/busybox:latest"
+
+
+def image_state(node, images):
+    return f"images/{node}", json.dumps({"node": node, "images": images})
+
+
+class TestImageLocality(unittest.TestCase):
+
+    def setUp(self):
+        self.etcd_client = MagicMock()
+        self.etcd_client.get_prefix_with_revision.return_value = ([
+            image_state("node1", {BUSYBOX: 4 * MiB}),
+            image_state("node2", {TOMCAT: 500 * MiB, BUSYBOX: 4 * MiB}),
+        ], 10)
+        self.informer = create_image_informer(self.etcd_client)
+        self.informer.start()
+        self.locality = ImageLocality(self.informer)
+
+    def test_scores_scale_with_size_and_spread(self):
+        scores = self.locality.scores(["node1", "node2", "node3"], [TOMCAT])
+        expected = (500 * MiB / 3 - 23 * MiB) / (977 * MiB)
+        self.assertEqual(scores[0], 0)
+        self.assertAlmostEqual(scores[1], expected)
+        self.assertEqual(scores[2], 0)
+        # 小镜像低于下限，不影响调度
+        self.assertEqual(list(self.locality.scores(["node1", "node2"], [BUSYBOX])), [0, 0])
+
+    def test_watch_events_update_index(self):
+        on_event = self.etcd_client.watch_prefix.call_args[0][1]
+        key, value = image_state("node1", {TOMCAT: 500 * MiB})
+        on_event(WatchEvent('put', key, value, 11))
+        self.assertEqual(self.locality.node_images("node1"), {TOMCAT: 500 * MiB})
+        scores = self.locality.scores(["node1", "node2"], [TOMCAT])
+        self.assertEqual(scores[0], scores[1])
+        on_event(WatchEvent('delete', "images/node2", None, 12))
+        self.assertEqual(self.locality.scores(["node1", "node2"], [TOMCAT])[1], 0)
+
+    def test_scheduler_prefers_node_with_cached_image(self):
+        controller = NodeController(MagicMock(), flush_interval=0)
+        add_nodes(controller, ("node1", 4, 0), ("node2", 4, 0))
+        busy = make_pod("busy", cpu="400m")
+        controller.schedule_pod_to_node(busy, "node2")
+
+        plain = Kube_Scheduler_Plus(controller)
+        self.assertEqual(plain.select_node({'cpu': 0.5}, [TOMCAT]).name, "node1")
+
+        scheduler = Kube_Scheduler_Plus(controller, image_locality=self.locality)
+        self.assertEqual(scheduler.select_node({'cpu': 0.5}, [TOMCAT]).name, "node2")
+        self.assertEqual(scheduler.select_node({'cpu': 0.5}, [BUSYBOX]).name, "node1")
+        self.assertEqual([node.name for node in scheduler.prioritize_nodes(list(controller.nodes.values()),
+                                                                           [TOMCAT])], ["node2", "node1"])
+        self.assertEqual(scheduler.schedule_pod(make_pod("web", image=TOMCAT)), "node2")
+        # 移除 Pod 后资源矩阵随之增量更新
+        controller.remove_pod_from_node(busy, "node2")
+        self.assertAlmostEqual(controller.resource_matrix.allocated[controller.resource_matrix.index["node2"], 0], 0.5)
+
+    def test_prioritize_nodes_scores_locality_once(self):
+        controller = NodeController(MagicMock(), flush_interval=0)
+        add_nodes(controller, ("node1", 4, 0), ("node2", 4, 0), ("node3", 4, 0))
+        self.locality.scores = MagicMock(side_effect=self.locality.scores)
+        scheduler = Kube_Scheduler_Plus(controller, image_locality=self.locality)
+        ranked = scheduler.prioritize_nodes(list(controller.nodes.values()), [TOMCAT])
+        self.assertEqual(ranked[0].name, "node2")
+        self.locality.scores.assert_called_once_with(controller.resource_matrix.names, [TOMCAT],
+                                                     controller.resource_matrix.index)
+
+
+class TestImageStateReporter(unittest.TestCase):
+
+    def test_reports_only_when_image_set_changes(self):
+        etcd_client = MagicMock()
+        etcd_client.put_many.return_value = True
+        cache = ImageCacheIndex()
+        reporter = ImageStateReporter(cache, etcd_client, "node1")
+        self.assertTrue(reporter.report())
+        cache.record_pull(TOMCAT, "sha256:t", 500 * MiB)
+        self.assertTrue(reporter.report())
+        self.assertEqual(etcd_client.put_many.call_args[0][0],
+                         [image_state("node1", {TOMCAT: 500 * MiB})])
+        cache.touch(TOMCAT)
+        self.assertFalse(reporter.report())
+        self.assertEqual(etcd_client.put_many.call_count, 2)
+
+    def test_failed_report_is_retried(self):
+        etcd_client = MagicMock()
+        etcd_client.put_many.return_value = False
+        reporter = ImageStateReporter(ImageCacheIndex(), etcd_client, "node1")
+        self.assertFalse(reporter.report())
+        etcd_client.put_many.return_value = True
+        self.assertTrue(reporter.report())
+
+    @patch('subprocess.run')
+    def test_pulled_image_size_is_refreshed_before_report(self, mock_run):
+        digest = "sha256:" + "a" * 64
+        outputs = {
+            'pull': f"unpacking linux/amd64 {digest}...\ndone\n",
+            'list': "REF TYPE DIGEST SIZE PLATFORMS LABELS\n"
+                    f"{TOMCAT} application/vnd.oci.image.index.v1+json {digest} 200.0 MiB linux/amd64 -\n",
+        }
+        mock_run.side_effect = lambda cmd, **kwargs: MagicMock(returncode=0, stdout=outputs[cmd[2]])
+        etcd_client = MagicMock()
+        etcd_client.put_many.return_value = True
+        handler = ImageHandler()
+        reporter = ImageStateReporter(handler.cache, etcd_client, "node1", refresh=handler.list_images)
+        self.assertTrue(handler.pull_image(TOMCAT))
+        self.assertEqual(handler.cache.image_sizes(), {TOMCAT: 0})
+        self.assertTrue(reporter.report())
+        self.assertEqual(etcd_client.put_many.call_args[0][0], [image_state("node1", {TOMCAT: 200 * MiB})])
+        # 大小已知后不再调用 ctr images list
+        self.assertFalse(reporter.report())
+        self.assertEqual(mock_run.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
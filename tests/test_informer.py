@@ -0,0 +1,163 @@
+import json
+import time
+import unittest
+from unittest.mock import MagicMock
+from etcd3 import exceptions
+from etcd.informer import Informer
+from etcd.prefix_watcher import WatchEvent
+from node.node_controller import NodeController
+from pod.pod_controller import PodController
+from tests.helpers import make_container, make_pod
+
+
+class FakeEtcdClient:
+    def __init__(self, items, revision):
+        self.items = items
+        self.revision = revision
+        self.watches = []  # (start_revision, callback, on_compacted, handle)
+
+    def get_prefix_with_revision(self, prefix):
+        return list(self.items), self.revision
+
+    def watch_prefix(self, prefix, callback, start_revision=None, on_compacted=None):
+        handle = MagicMock()
+        self.watches.append((start_revision, callback, on_compacted, handle))
+        return handle
+
+
+def pod(name, namespace="default"):
+    return json.dumps({"name": name, "namespace": namespace})
+
+
+class TestInformer(unittest.TestCase):
+
+    def setUp(self):
+        self.etcd = FakeEtcdClient([("pods/default/a", pod("a")), ("pods/kube/b", pod("b", "kube"))], revision=10)
+        self.informer = Informer(self.etcd, "pods/", retry_interval=0.01,
+                                 indexers={'namespace': lambda key, obj: [obj['namespace']]})
+        self.informer.start()
+
+    def callback(self):
+        return self.etcd.watches[-1][1]
+
+    def test_initial_list_and_watch_revision(self):
+        self.assertTrue(self.informer.has_synced())
+        items, version = self.informer.list()
+        self.assertEqual(len(items), 2)
+        self.assertEqual(version, 10)
+        self.assertEqual(self.etcd.watches[0][0], 11)
+
+    def test_events_update_store_and_index(self):
+        self.callback()(WatchEvent('put', "pods/kube/c", pod("c", "kube"), 11))
+        self.callback()(WatchEvent('delete', "pods/default/a", None, 12))
+        kube, version = self.informer.list('namespace', 'kube')
+        self.assertEqual(sorted(p['name'] for p in kube), ["b", "c"])
+        self.assertEqual(version, 12)
+        self.assertEqual(self.informer.list('namespace', 'default')[0], [])
+        self.assertEqual(self.informer.index_values('namespace'), ['kube'])
+        self.assertIsNone(self.informer.get("pods/default/a"))
+
+    def test_compacted_revision_triggers_relist(self):
+        self.etcd.items = [("pods/default/z", pod("z"))]
+        self.etcd.revision = 50
+        on_compacted = self.etcd.watches[-1][2]
+        on_compacted(exceptions.RevisionCompactedError(40))
+        deadline = time.time() + 2
+        while len(self.etcd.watches) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.etcd.watches[1][0], 51)
+        self.assertEqual([p['name'] for p in self.informer.list()[0]], ["z"])
+
+    def test_stop_cancels_watch_and_ignores_late_events(self):
+        callback = self.callback()
+        self.informer.stop()
+        self.etcd.watches[0][3].cancel.assert_called_once()
+        callback(WatchEvent('put', "pods/default/x", pod("x"), 30))
+        self.assertIsNone(self.informer.get("pods/default/x"))
+
+
+class TestNodeControllerInformer(unittest.TestCase):
+
+    def test_get_all_nodes_served_from_cache(self):
+        remote = {"name": "remote", "total_cpu": 8, "pod_count": 1}
+        binding = {"node": "remote", "namespace": "default", "pod": "p", "requests": {}}
+        node_informer = Informer(FakeEtcdClient([("nodes/remote", json.dumps(remote))], 5), "nodes/")
+        binding_informer = Informer(FakeEtcdClient([("bindings/remote/default/p", json.dumps(binding))], 7),
+                                    "bindings/", indexers={'node': lambda key, obj: [obj['node']]})
+        etcd_client = MagicMock()
+        controller = NodeController(etcd_client, flush_interval=60,
+                                    node_informer=node_informer, binding_informer=binding_informer)
+        self.addCleanup(controller.close)
+        self.assertIsNone(controller.resource_version)
+        node_informer.start()
+        binding_informer.start()
+        controller.add_node("local", "10.0.0.1", 4, 1024 ** 3, 0, 100, 100)
+
+        nodes = controller.get_all_nodes()
+        self.assertEqual(set(nodes), {"remote", "local"})
+        self.assertEqual(nodes["remote"]["pods"], [binding])
+        self.assertEqual(nodes["local"]["pod_count"], 0)
+        self.assertEqual(controller.resource_version, 5)
+        etcd_client.get_with_prefix.assert_not_called()
+
+
+    def test_only_unobserved_nodes_are_serialized(self):
+        etcd_client = MagicMock()
+        etcd_client.apply_batch.return_value = True
+        node_etcd = FakeEtcdClient([], 5)
+        binding_etcd = FakeEtcdClient([], 5)
+        node_informer = Informer(node_etcd, "nodes/")
+        binding_informer = Informer(binding_etcd, "bindings/", indexers={'node': lambda key, obj: [obj['node']]})
+        node_informer.start()
+        binding_informer.start()
+        controller = NodeController(etcd_client, flush_interval=60,
+                                    node_informer=node_informer, binding_informer=binding_informer)
+        self.addCleanup(controller.close)
+        controller.add_node("local", "10.0.0.1", 4, 1024 ** 3, 0, 100, 100)
+        controller.schedule_pod_to_node(make_pod("p"), "local")
+        # 尚未写回：以内存状态为准
+        self.assertEqual(controller.get_all_nodes()["local"]["pod_count"], 1)
+
+        controller.flush()
+        puts, _ = etcd_client.apply_batch.call_args[0]
+        for revision, (key, value) in enumerate(puts, 6):
+            watch = node_etcd if key.startswith("nodes/") else binding_etcd
+            watch.watches[0][1](WatchEvent('put', key, value, revision))
+        self.assertEqual(controller.get_all_nodes()["local"]["pods"][0]["pod"], "p")
+        self.assertEqual(len(controller._pending_writes), 0)
+
+        node = controller.get_node("local")
+        node.to_record = MagicMock(side_effect=node.to_record)
+        self.assertEqual(controller.get_all_nodes()["local"]["pod_count"], 1)
+        node.to_record.assert_not_called()
+
+        # 已删除但 watch 尚未观察到的节点不再出现
+        controller.remove_node("local")
+        self.assertEqual(controller.get_all_nodes(), {})
+
+    def test_only_unobserved_pods_are_serialized(self):
+        pod_etcd = FakeEtcdClient([], 5)
+        pod_informer = Informer(pod_etcd, "pods/", indexers={'namespace': lambda key, obj: [obj['namespace']]})
+        pod_informer.start()
+        etcd_client = MagicMock()
+        controller = PodController(etcd_client, MagicMock(), MagicMock(), pod_informer=pod_informer)
+        controller.create_pod("web", [make_container("c0")])
+        self.assertEqual(controller.get_all_pods()["default"]["web"]["status"], "Pending")
+
+        key, value = etcd_client.put.call_args[0]
+        pod_etcd.watches[0][1](WatchEvent('put', key, value, 6))
+        self.assertEqual(set(controller.get_all_pods()["default"]), {"web"})
+        self.assertEqual(len(controller._pending_writes), 0)
+
+        web = controller.get_pod("web")
+        web.to_dict = MagicMock(side_effect=web.to_dict)
+        controller.get_all_pods()
+        web.to_dict.assert_not_called()
+
+        controller.start_pod("web")
+        self.assertEqual(controller.get_all_pods()["default"]["web"]["status"], "Running")
+        controller.delete_pod("web")
+        self.assertEqual(controller.get_all_pods(), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+from node.node_controller import NodeController
+from tests.helpers import add_nodes, make_pod
+
+
+class TestLoadBalanceStats(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = NodeController(MagicMock())
+        add_nodes(self.controller, ("node1", 4, 2), ("node2", 8, 4), ("node3", 2, 0))
+        self.stats = self.controller.load_balance_stats
+
+    def expected_std(self):
+        nodes = self.controller.nodes.values()
+        return (
+            np.std([n.allocated_cpu / n.total_cpu if n.total_cpu > 0 else 0 for n in nodes]),
+            np.std([n.allocated_memory / n.total_memory if n.total_memory > 0 else 0 for n in nodes]),
+            np.std([n.allocated_gpu / n.total_gpu if n.total_gpu > 0 else 0 for n in nodes]),
+        )
+
+    def assert_matches_numpy(self):
+        for actual, expected in zip(self.stats.std(), self.expected_std()):
+            self.assertAlmostEqual(actual, expected, places=9)
+
+    def test_empty_cluster_is_perfectly_balanced(self):
+        controller = NodeController(MagicMock())
+        self.assertEqual(controller.load_balance_stats.balance_factors(), (1.0, 1.0, 1.0))
+
+    def test_tracks_schedule_and_remove(self):
+        pod1 = make_pod("pod1", "1500m", "512Mi", "1")
+        pod2 = make_pod("pod2", "500m", "1024Mi", "2")
+        self.controller.schedule_pod_to_node(pod1, "node1")
+        self.assert_matches_numpy()
+        self.controller.schedule_pod_to_node(pod2, "node2")
+        self.assert_matches_numpy()
+        self.controller.remove_pod_from_node(pod1, "node1")
+        self.assert_matches_numpy()
+
+    def test_tracks_node_membership(self):
+        self.controller.schedule_pod_to_node(make_pod("pod1", "2", "1024Mi"), "node3")
+        self.controller.remove_node("node1")
+        self.assertEqual(self.stats.count, 2)
+        self.assert_matches_numpy()
+        self.controller.add_node("node4", "10.0.0.4", 16, 16 * 1024 ** 3, 0, 100, 100)
+        self.assert_matches_numpy()
+
+    def test_resync_keeps_values(self):
+        self.controller.schedule_pod_to_node(make_pod("pod1", "1", "256Mi", "1"), "node2")
+        before = self.stats.std()
+        self.stats.resync()
+        for a, b in zip(before, self.stats.std()):
+            self.assertAlmostEqual(a, b, places=12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from etcd.prefix_watcher import WatchEvent
+from node.node_controller import NodeController
+from node.node_heartbeat import HeartbeatMonitor, NodeHeartbeat
+from tests.helpers import make_pod
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+class TestNodeHeartbeat(unittest.TestCase):
+
+    def setUp(self):
+        self.etcd_client = MagicMock()
+        self.etcd_client.lease.return_value = SimpleNamespace(id=7)
+        self.etcd_client.refresh_lease.return_value = 10
+        self.heartbeat = NodeHeartbeat(self.etcd_client, "n1", ttl=10, interval=0.01)
+        self.addCleanup(self.heartbeat.stop, revoke=False)
+
+    def test_keepalive_does_not_rewrite_keys(self):
+        self.heartbeat.start()
+        self.assertTrue(wait_until(lambda: self.etcd_client.refresh_lease.call_count >= 3))
+        self.etcd_client.put.assert_called_once()
+        key, _, lease_id = self.etcd_client.put.call_args[0]
+        self.assertEqual((key, lease_id), ("heartbeats/n1", 7))
+        self.etcd_client.refresh_lease.assert_called_with(7)
+
+    def test_expired_lease_is_reacquired(self):
+        self.etcd_client.refresh_lease.return_value = 0
+        self.heartbeat.start()
+        self.assertTrue(wait_until(lambda: self.etcd_client.put.call_count >= 2))
+        self.assertGreaterEqual(self.etcd_client.lease.call_count, 2)
+
+    def test_failed_heartbeat_put_is_retried(self):
+        self.etcd_client.put.side_effect = [False, True]
+        self.heartbeat.start()
+        # 心跳键写入失败时撤销租约，避免租约存活而心跳键缺失
+        self.etcd_client.revoke_lease.assert_called_once_with(7)
+        self.assertTrue(wait_until(lambda: self.heartbeat.lease_id == 7))
+        self.assertEqual(self.etcd_client.put.call_count, 2)
+
+    def test_stop_revokes_lease(self):
+        self.heartbeat.start()
+        self.heartbeat.stop()
+        self.etcd_client.revoke_lease.assert_called_once_with(7)
+
+
+class TestHeartbeatMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.etcd_client = MagicMock()
+        self.etcd_client.get_prefix_with_revision.return_value = ([("heartbeats/n1", "{}")], 5)
+        self.controller = NodeController(MagicMock(), flush_interval=0)
+        self.controller.add_node("n1", "10.0.0.1", 4, 8, 0, 0, 0)
+        self.controller.add_node("n2", "10.0.0.2", 4, 8, 0, 0, 0)
+        self.monitor = HeartbeatMonitor(self.controller, self.etcd_client)
+        self.monitor.start()
+        self.on_event = self.etcd_client.watch_prefix.call_args[0][1]
+
+    def test_watch_starts_after_listed_revision(self):
+        self.assertEqual(self.etcd_client.watch_prefix.call_args[1]['start_revision'], 6)
+        self.assertEqual(self.monitor.alive_nodes(), {"n1"})
+
+    def test_expired_heartbeat_removes_node_from_feasible_set(self):
+        self.on_event(WatchEvent('delete', "heartbeats/n1", None, 6))
+        self.assertEqual(self.controller.get_node("n1").status, 'NotReady')
+        self.assertEqual(list(self.controller.resource_matrix.feasible_mask({'cpu': 1})), [False, True])
+
+        self.on_event(WatchEvent('put', "heartbeats/n1", "{}", 7))
+        self.assertEqual(self.controller.get_node("n1").status, 'Ready')
+        self.assertEqual(list(self.controller.resource_matrix.feasible_mask({'cpu': 1})), [True, True])
+
+    def test_manual_status_is_not_overridden(self):
+        self.controller.update_node_status("n1", 'Maintenance')
+        self.on_event(WatchEvent('delete', "heartbeats/n1", None, 6))
+        self.on_event(WatchEvent('put', "heartbeats/n1", "{}", 7))
+        self.assertEqual(self.controller.get_node("n1").status, 'Maintenance')
+
+    def test_relist_after_compaction_marks_lost_nodes(self):
+        self.etcd_client.get_prefix_with_revision.return_value = ([], 20)
+        self.monitor._resync()
+        self.assertEqual(self.controller.get_node("n1").status, 'NotReady')
+        self.assertEqual(self.controller.get_node("n2").status, 'Ready')
+
+    def test_status_changes_are_serialized_with_placements(self):
+        def churn():
+            for i in range(200):
+                pod = make_pod(f"p{i}")
+                self.controller.schedule_pod_to_node(pod, "n2")
+                self.controller.remove_pod_from_node(pod, "n2")
+
+        worker = threading.Thread(target=churn)
+        worker.start()
+        for revision in range(6, 206, 2):
+            self.on_event(WatchEvent('delete', "heartbeats/n2", None, revision))
+            self.on_event(WatchEvent('put', "heartbeats/n2", "{}", revision + 1))
+        worker.join()
+        node = self.controller.get_node("n2")
+        self.assertEqual(node.status, 'Ready')
+        self.assertEqual(node.pods, [])
+        row = self.controller.resource_matrix.index["n2"]
+        self.assertEqual(self.controller.resource_matrix.allocated[row, 0], 0)
+        self.assertTrue(self.controller.resource_matrix.ready[row])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+from node.node_controller import NodeController
+from orchestrator.kube_scheduler_plus import Kube_Scheduler_Plus
+from tests.helpers import add_nodes, make_pod
+
+
+class TestNodeResourceMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = NodeController(MagicMock())
+        add_nodes(self.controller, ("node1", 4, 2), ("node2", 8, 1), ("node3", 2, 0))
+        self.matrix = self.controller.resource_matrix
+        self.scheduler = Kube_Scheduler_Plus(self.controller)
+
+    def test_rows_follow_node_order(self):
+        self.assertEqual(self.matrix.names, ["node1", "node2", "node3"])
+        np.testing.assert_array_equal(self.matrix.total[:, 0], [4, 8, 2])
+
+    def test_matrix_tracks_add_and_remove_pod(self):
+        pod = make_pod("pod1", cpu="1500m", memory="1024Mi", gpu="1")
+        self.controller.schedule_pod_to_node(pod, "node1")
+        row = self.matrix.index["node1"]
+        self.assertAlmostEqual(self.matrix.allocated[row, 0], 1.5)
+        self.assertEqual(self.matrix.allocated[row, 1], 1024 ** 3)
+        self.assertEqual(self.matrix.allocated[row, 2], 1)
+
+        self.controller.remove_pod_from_node(pod, "node1")
+        np.testing.assert_array_equal(self.matrix.allocated[row], np.zeros(5))
+
+    def test_feasible_mask_respects_status_and_capacity(self):
+        self.controller.update_node_status("node2", "NotReady")
+        mask = self.matrix.feasible_mask({'cpu': 3, 'memory': 0, 'gpu': 0})
+        np.testing.assert_array_equal(mask, [True, False, False])
+
+    def test_select_matches_sorted_scores(self):
+        self.controller.schedule_pod_to_node(make_pod("pod1", cpu="2"), "node1")
+        self.controller.schedule_pod_to_node(make_pod("pod2", cpu="1"), "node2")
+        required = {'cpu': 0.5, 'memory': 0, 'gpu': 0}
+        expected = self.scheduler.prioritize_nodes(self.scheduler.filter_nodes(required))[0]
+        self.assertIs(self.scheduler.select_node(required), expected)
+
+    def test_select_returns_none_without_feasible_node(self):
+        self.assertIsNone(self.scheduler.select_node({'cpu': 16}))
+        with self.assertRaises(Exception):
+            self.scheduler.schedule_pod(make_pod("big-pod", cpu="16"))
+
+    def test_io_request_filters_nodes(self):
+        controller = NodeController(MagicMock())
+        controller.add_node("small-io", "10.0.0.1", 8, 8 * 1024 ** 3, 0, 10, 100)
+        controller.add_node("big-io", "10.0.0.2", 4, 4 * 1024 ** 3, 0, 100, 100)
+        controller.schedule_pod_to_node(make_pod("busy", cpu="2"), "big-io")
+        scheduler = Kube_Scheduler_Plus(controller)
+        # small-io 负载更低，但剩余 IO 不足
+        self.assertEqual(scheduler.schedule_pod(make_pod("light", io="5")), "small-io")
+        self.assertEqual(scheduler.schedule_pod(make_pod("heavy", io="50")), "big-io")
+        self.assertEqual(scheduler.schedule_pods([make_pod("heavy2", io="40")])[0]['node_name'], "big-io")
+        self.assertIsNone(scheduler.select_node({'cpu': 0.5, 'io': 60}))
+
+    def test_remove_node_keeps_rows_consistent(self):
+        self.controller.remove_node("node1")
+        self.assertEqual(self.matrix.names, ["node2", "node3"])
+        self.assertEqual(self.matrix.index, {"node2": 0, "node3": 1})
+        np.testing.assert_array_equal(self.matrix.total[:, 0], [8, 2])
+
+    def test_matrix_grows_past_initial_capacity(self):
+        for i in range(4, 40):
+            self.controller.add_node(f"node{i}", f"10.0.1.{i}", 4, 1024 ** 3, 0, 100, 100)
+        self.assertEqual(len(self.matrix), 39)
+        self.assertEqual(self.matrix.index["node39"], 38)
+        self.assertEqual(self.matrix.total[38, 0], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
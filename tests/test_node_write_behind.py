@@ -0,0 +1,106 @@
+import json
+import time
+import unittest
+from unittest.mock import MagicMock
+from node.node_controller import NodeController
+from tests.helpers import add_nodes, make_pod
+
+
+class TestNodeWriteBehind(unittest.TestCase):
+
+    def make_controller(self, **kwargs):
+        etcd_client = MagicMock()
+        etcd_client.apply_batch.return_value = True
+        etcd_client.get_with_prefix.return_value = []
+        controller = NodeController(etcd_client, **kwargs)
+        self.addCleanup(controller.close)
+        return add_nodes(controller, ("node1", 4, 2), ("node2", 2, 1))
+
+    def test_updates_are_coalesced_per_node(self):
+        controller = self.make_controller(flush_interval=60)
+        for i in range(5):
+            controller.schedule_pod_to_node(make_pod(f"pod{i}"), "node1")
+        controller.update_node_status("node2", "NotReady")
+
+        controller.etcd_client.put.assert_not_called()
+        self.assertTrue(controller.flush())
+        controller.etcd_client.apply_batch.assert_called_once()
+        items = dict(controller.etcd_client.apply_batch.call_args[0][0])
+        self.assertEqual({key for key in items if key.startswith("nodes/")}, {"nodes/node1", "nodes/node2"})
+        self.assertEqual(len([key for key in items if key.startswith("bindings/node1/")]), 5)
+        self.assertEqual(json.loads(items["nodes/node1"])['pod_count'], 5)
+        self.assertEqual(json.loads(items["nodes/node2"])['status'], "NotReady")
+
+        controller.etcd_client.reset_mock()
+        self.assertTrue(controller.flush())
+        controller.etcd_client.apply_batch.assert_not_called()
+
+    def test_batch_size_triggers_inline_flush(self):
+        controller = self.make_controller(flush_interval=60, flush_batch_size=2)
+        controller.etcd_client.apply_batch.assert_called_once()
+        items = dict(controller.etcd_client.apply_batch.call_args[0][0])
+        self.assertEqual(set(items), {"nodes/node1", "nodes/node2"})
+
+    def test_background_flush_after_interval(self):
+        controller = self.make_controller(flush_interval=0.01)
+        deadline = time.time() + 2
+        while not controller.etcd_client.apply_batch.called and time.time() < deadline:
+            time.sleep(0.01)
+        controller.etcd_client.apply_batch.assert_called()
+
+    def test_reads_flush_pending_writes_first(self):
+        controller = self.make_controller(flush_interval=60)
+        calls = []
+        controller.etcd_client.apply_batch.side_effect = lambda puts, deletes: calls.append('apply_batch') or True
+        controller.etcd_client.get_with_prefix.side_effect = lambda prefix: calls.append('get') or []
+        controller.get_all_nodes()
+        self.assertEqual(calls[0], 'apply_batch')
+        self.assertIn('get', calls)
+
+    def test_failed_flush_keeps_nodes_dirty(self):
+        controller = self.make_controller(flush_interval=60)
+        controller.etcd_client.apply_batch.return_value = False
+        self.assertFalse(controller.flush())
+        controller.etcd_client.apply_batch.return_value = True
+        self.assertTrue(controller.flush())
+        items = dict(controller.etcd_client.apply_batch.call_args[0][0])
+        self.assertEqual(set(items), {"nodes/node1", "nodes/node2"})
+
+    def test_background_flush_failures_are_counted(self):
+        controller = self.make_controller(flush_interval=0.01)
+        controller.etcd_client.apply_batch.return_value = False
+        controller.update_node_status("node1", "NotReady")  # 写回缓冲模式下不抛出异常
+        deadline = time.time() + 2
+        while controller.flush_failures == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertGreater(controller.flush_failures, 0)
+        controller.etcd_client.apply_batch.return_value = True
+        self.assertTrue(controller.flush())
+
+    def test_removed_node_is_not_flushed(self):
+        controller = self.make_controller(flush_interval=60)
+        controller.remove_node("node1")
+        controller.flush()
+        items = dict(controller.etcd_client.apply_batch.call_args[0][0])
+        self.assertEqual(set(items), {"nodes/node2"})
+
+    def test_zero_interval_writes_synchronously(self):
+        controller = self.make_controller(flush_interval=0)
+        self.assertEqual(controller.etcd_client.apply_batch.call_count, 2)
+        controller.schedule_pod_to_node(make_pod("pod1"), "node1")
+        self.assertEqual(controller.etcd_client.apply_batch.call_count, 3)
+
+    def test_remove_pod_deletes_binding(self):
+        controller = self.make_controller(flush_interval=60)
+        pod = make_pod("pod1")
+        controller.schedule_pod_to_node(pod, "node1")
+        controller.flush()
+        controller.remove_pod_from_node(pod, "node1")
+        controller.flush()
+        puts, deletes = controller.etcd_client.apply_batch.call_args[0]
+        self.assertEqual([key for key, _ in puts], ["nodes/node1"])
+        self.assertEqual(list(deletes), ["bindings/node1/default/pod1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
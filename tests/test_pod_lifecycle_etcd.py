@@ -0,0 +1,40 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+from pod.pod_controller import PodController
+from tests.helpers import make_container
+
+
+class TestPodLifecycleEtcdWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.etcd_client = MagicMock()
+        self.controller = PodController(self.etcd_client, MagicMock(), MagicMock())
+        self.controller.create_pod("web", [make_container(f"c{i}") for i in range(3)])
+        self.etcd_client.reset_mock()
+
+    def test_start_pod_writes_in_one_round_trip(self):
+        self.controller.start_pod("web")
+        self.etcd_client.put.assert_not_called()
+        self.etcd_client.put_many.assert_called_once()
+        items = dict(self.etcd_client.put_many.call_args[0][0])
+        self.assertEqual(len(items), 4)
+        self.assertEqual(json.loads(items["pods/default/web"])['status'], 'Running')
+        self.assertEqual(items["/pods/default/web/containers/c0/status"], "Running")
+
+    def test_stop_pod_writes_in_one_round_trip(self):
+        self.controller.start_pod("web")
+        self.etcd_client.reset_mock()
+        self.controller.stop_pod("web")
+        self.etcd_client.put.assert_not_called()
+        self.etcd_client.put_many.assert_called_once()
+        items = dict(self.etcd_client.put_many.call_args[0][0])
+        self.assertEqual(json.loads(items["pods/default/web"])['status'], 'Stopped')
+
+    def test_delete_pod_removes_record_and_container_keys_together(self):
+        self.controller.delete_pod("web")
+        self.etcd_client.apply_batch.assert_called_once_with((), ["pods/default/web"], ["/pods/default/web/"])
+
+
+if __name__ == '__main__':
+    unittest.main()
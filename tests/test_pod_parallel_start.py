@@ -0,0 +1,153 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from container.container_manager import ContainerManager
+from container.container_runtime import ContainerRuntime
+from container.runtime_backend import FakeBackend
+from pod.pod_controller import PodController
+from tests.helpers import make_container
+
+
+class SlowRuntime:
+    """每次启动耗时 delay 秒，并记录同时进行中的最大数量."""
+
+    def __init__(self, delay=0.1, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _run(self, name):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if name in self.fail:
+            raise Exception(f"ctr failed for {name}")
+
+    def create_container(self, container):
+        self._run(container.name)
+
+    def start_container(self, container):
+        pass
+
+    def stop_container(self, name):
+        self._run(name)
+
+
+class TestPodParallelStart(unittest.TestCase):
+
+    def make_controller(self, runtime, **kwargs):
+        self.etcd_client = MagicMock()
+        controller = PodController(self.etcd_client, runtime, runtime, **kwargs)
+        for pod in ("web", "db"):
+            controller.create_pod(pod, [make_container(f"{pod}-c{i}") for i in range(3)])
+        self.etcd_client.reset_mock()
+        return controller
+
+    def test_containers_of_a_pod_start_concurrently(self):
+        runtime = SlowRuntime()
+        controller = self.make_controller(runtime)
+        start = time.monotonic()
+        controller.start_pod("web")
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertEqual(runtime.peak, 3)
+        self.assertEqual(controller.get_pod("web").status, 'Running')
+        self.etcd_client.put_many.assert_called_once()
+
+    def test_per_pod_limit(self):
+        runtime = SlowRuntime(delay=0.02)
+        controller = self.make_controller(runtime, max_parallel_containers_per_pod=1)
+        controller.start_pod("web")
+        self.assertEqual(runtime.peak, 1)
+
+    def test_start_pods_shares_worker_pool(self):
+        runtime = SlowRuntime()
+        controller = self.make_controller(runtime, max_container_workers=4)
+        statuses = controller.start_pods(["web", "db"])
+        self.assertEqual(statuses, {"web": "Running", "db": "Running"})
+        self.assertEqual(runtime.peak, 4)
+        self.etcd_client.put_many.assert_called_once()
+        self.assertEqual(len(self.etcd_client.put_many.call_args[0][0]), 8)
+
+    def test_failed_container_is_reported(self):
+        runtime = SlowRuntime(delay=0, fail={"web-c1"})
+        controller = self.make_controller(runtime)
+        controller.start_pod("web")
+        items = dict(self.etcd_client.put_many.call_args[0][0])
+        self.assertEqual(items["/pods/default/web/containers/web-c1/status"], "Failed")
+        self.assertEqual(items["/pods/default/web/containers/web-c0/status"], "Running")
+        self.assertEqual(json.loads(items["pods/default/web"])['status'], 'Pending')
+
+    def test_stop_pods(self):
+        runtime = SlowRuntime(delay=0)
+        controller = self.make_controller(runtime)
+        controller.start_pods(["web", "db"])
+        self.assertEqual(controller.stop_pods(["web", "db"]), {"web": "Stopped", "db": "Stopped"})
+
+
+class StartFailingBackend(FakeBackend):
+    """创建成功、启动失败的假后端."""
+
+    def __init__(self, start_failures):
+        super().__init__()
+        self.start_failures = set(start_failures)
+
+    def start_task(self, name):
+        if name in self.start_failures:
+            raise Exception(f"Error starting container: injected failure for {name}")
+        super().start_task(name)
+
+
+class TestPodContainerRuntimeFailures(unittest.TestCase):
+    """通过真实的 ContainerManager / ContainerRuntime 与 FakeBackend 验证容器失败会反映到 Pod 状态."""
+
+    def make_controller(self, backend):
+        self.etcd_client = MagicMock()
+        self.async_etcd_client = MagicMock(put_many=AsyncMock())
+        controller = PodController(self.etcd_client, ContainerManager(self.etcd_client, backend=backend),
+                                   ContainerRuntime(self.etcd_client, backend=backend),
+                                   async_etcd_client=self.async_etcd_client)
+        containers = [make_container(f"web-c{i}", image="alpine:latest") for i in range(2)]
+        for container in containers:
+            container.command = []
+        controller.create_pod("web", containers)
+        return controller
+
+    def test_failed_start_keeps_pod_pending(self):
+        controller = self.make_controller(StartFailingBackend({"web-c1"}))
+        controller.start_pod("web")
+        items = dict(self.etcd_client.put_many.call_args[0][0])
+        self.assertEqual(items["/pods/default/web/containers/web-c1/status"], "Failed")
+        self.assertEqual(items["/pods/default/web/containers/web-c0/status"], "Running")
+        self.assertEqual(controller.get_pod("web").status, 'Pending')
+
+    def test_failed_async_start_keeps_pod_pending(self):
+        controller = self.make_controller(StartFailingBackend({"web-c0"}))
+        asyncio.run(controller.start_pod_async("web"))
+        items = dict(self.async_etcd_client.put_many.call_args[0][0])
+        self.assertEqual(items["/pods/default/web/containers/web-c0/status"], "Failed")
+        self.assertEqual(controller.get_pod("web").status, 'Pending')
+
+    def test_failed_stop_keeps_pod_running(self):
+        backend = FakeBackend()
+        controller = self.make_controller(backend)
+        controller.start_pod("web")
+        self.assertEqual(controller.get_pod("web").status, 'Running')
+        backend.fail.add("web-c1")
+        controller.stop_pod("web")
+        items = dict(self.etcd_client.put_many.call_args[0][0])
+        self.assertEqual(items["/pods/default/web/containers/web-c1/status"], "Failed")
+        self.assertEqual(controller.get_pod("web").status, 'Running')
+        asyncio.run(controller.stop_pod_async("web"))
+        self.assertEqual(controller.get_pod("web").status, 'Running')
+
+
+if __name__ == '__main__':
+    unittest.main()
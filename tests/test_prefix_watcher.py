@@ -0,0 +1,104 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from etcd3 import events, exceptions
+from etcd3.etcdrpc import kv_pb2
+from etcd3.watch import WatchResponse
+from etcd.etcd_client import EtcdClient
+from etcd.prefix_watcher import WatchEvent
+
+
+def make_event(key, value=None, revision=1):
+    event_type = kv_pb2.Event.PUT if value is not None else kv_pb2.Event.DELETE
+    kv = kv_pb2.KeyValue(key=key.encode(), value=(value or "").encode(), mod_revision=revision)
+    return events.new_event(kv_pb2.Event(type=event_type, kv=kv))
+
+
+def make_response(*watch_events):
+    return WatchResponse(SimpleNamespace(revision=0), list(watch_events))
+
+
+def wait_until(predicate, timeout=2):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestWatchPrefix(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('etcd.etcd_client.etcd3.client')
+        self.mock_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.registrations = []  # (key, callback, kwargs)
+
+        def register(key, callback, **kwargs):
+            self.registrations.append((key, callback, kwargs))
+            return len(self.registrations)
+
+        self.mock_client.add_watch_prefix_callback.side_effect = register
+        self.mock_client.add_watch_callback.side_effect = register
+        self.client = EtcdClient()
+        self.received = []
+
+    def start(self, **kwargs):
+        handle = self.client.watch_prefix("pods/", self.received.append, **kwargs)
+        self.addCleanup(handle.cancel)
+        return handle
+
+    def test_returns_handle_immediately_and_dispatches_in_background(self):
+        handle = self.start(start_revision=5)
+        self.assertEqual(self.registrations[0][2], {'start_revision': 5})
+        self.registrations[0][1](make_response(make_event("pods/a", "1", 6), make_event("pods/b", revision=7)))
+        self.assertTrue(wait_until(lambda: len(self.received) == 2))
+        self.assertEqual(self.received, [WatchEvent('put', "pods/a", "1", 6), WatchEvent('delete', "pods/b", None, 7)])
+        self.assertEqual(handle.revision, 7)
+
+    def test_resumes_after_last_revision_on_disconnect(self):
+        self.start()
+        self.registrations[0][1](make_response(make_event("pods/a", "1", 12)))
+        self.registrations[0][1](Exception("stream reset"))
+        self.assertTrue(wait_until(lambda: len(self.registrations) == 2))
+        self.assertEqual(self.registrations[1][2], {'start_revision': 13})
+        self.registrations[1][1](make_response(make_event("pods/b", "2", 13)))
+        self.assertTrue(wait_until(lambda: len(self.received) == 2))
+
+    def test_cancel_stops_dispatch_and_cancels_watch(self):
+        handle = self.start()
+        handle.cancel()
+        self.mock_client.cancel_watch.assert_called_once_with(1)
+        self.registrations[0][1](make_response(make_event("pods/a", "1", 3)))
+        time.sleep(0.2)
+        self.assertEqual(self.received, [])
+        self.assertFalse(handle.is_alive())
+
+    def test_slow_callback_does_not_block_watch_thread_until_queue_full(self):
+        release = threading.Event()
+        self.client.watch_prefix("pods/", lambda event: release.wait(), max_queue=10)
+        started = time.time()
+        self.registrations[0][1](make_response(*[make_event(f"pods/{i}", "v", i + 1) for i in range(5)]))
+        self.assertLess(time.time() - started, 0.5)
+        release.set()
+
+    def test_compaction_is_reported(self):
+        compacted = []
+        self.client.watch_prefix("pods/", self.received.append, start_revision=2, on_compacted=compacted.append)
+        self.registrations[0][1](exceptions.RevisionCompactedError(9))
+        self.assertTrue(wait_until(lambda: compacted))
+        self.assertEqual(compacted[0].compacted_revision, 9)
+
+    def test_single_key_watch_uses_key_callback(self):
+        changes = []
+        cancel = self.client.watch("config", lambda key, value: changes.append((key, value)))
+        self.addCleanup(cancel)
+        self.mock_client.add_watch_callback.assert_called_once()
+        self.registrations[0][1](make_response(make_event("config", "x", 4), make_event("config", revision=5)))
+        self.assertTrue(wait_until(lambda: len(changes) == 2))
+        self.assertEqual(changes, [("config", "x"), ("config", None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
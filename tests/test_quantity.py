@@ -0,0 +1,95 @@
+import unittest
+from types import SimpleNamespace
+from utils import quantity
+from pod.pod import Pod
+
+
+class TestQuantity(unittest.TestCase):
+
+    def test_parse_cpu(self):
+        self.assertEqual(quantity.parse_cpu("500m"), 500)
+        self.assertEqual(quantity.parse_cpu("2"), 2000)
+        self.assertEqual(quantity.parse_cpu("1.5"), 1500)
+        self.assertEqual(quantity.parse_cpu("1e-1"), 100)
+        self.assertEqual(quantity.parse_cpu(4), 4000)
+        self.assertEqual(quantity.parse_cpu("0.0001"), 1)  # 与 Kubernetes 一致，向上取整到毫核
+
+    def test_parse_memory_suffixes(self):
+        self.assertEqual(quantity.parse_memory("128Ki"), 128 * 1024)
+        self.assertEqual(quantity.parse_memory("256Mi"), 256 * 1024 ** 2)
+        self.assertEqual(quantity.parse_memory("1Gi"), 1024 ** 3)
+        self.assertEqual(quantity.parse_memory("2Ti"), 2 * 1024 ** 4)
+        self.assertEqual(quantity.parse_memory("1k"), 1000)
+        self.assertEqual(quantity.parse_memory("1M"), 10 ** 6)
+        self.assertEqual(quantity.parse_memory("3G"), 3 * 10 ** 9)
+        self.assertEqual(quantity.parse_memory("1T"), 10 ** 12)
+        self.assertEqual(quantity.parse_memory("12e6"), 12 * 10 ** 6)
+        self.assertEqual(quantity.parse_memory("1024"), 1024)
+
+    def test_parse_gpu(self):
+        self.assertEqual(quantity.parse_gpu("1"), 1)
+        self.assertEqual(quantity.parse_gpu("2Gpu"), 2)
+        self.assertEqual(quantity.parse_gpu(0), 0)
+
+    def test_invalid_values_default_to_zero(self):
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(quantity.parse_memory("lots"), 0)
+        self.assertEqual(quantity.parse_cpu(None), 0)
+        with self.assertRaises(ValueError):
+            quantity.parse_quantity("12Xi")
+
+    def test_parse_is_cached(self):
+        quantity.parse_quantity.cache_clear()
+        quantity.parse_quantity("768Mi")
+        quantity.parse_quantity("768Mi")
+        self.assertEqual(quantity.parse_quantity.cache_info().hits, 1)
+
+    def test_format_round_trip(self):
+        self.assertEqual(quantity.format_cpu(700), "700m")
+        self.assertEqual(quantity.format_cpu(3000), "3")
+        self.assertEqual(quantity.format_memory(896 * 1024 ** 2), "896Mi")
+        self.assertEqual(quantity.format_memory(2 * 1024 ** 3), "2Gi")
+        self.assertEqual(quantity.parse_memory(quantity.format_memory(10 ** 9)), 10 ** 9)
+
+    def test_pod_aggregates_mixed_units(self):
+        containers = [
+            SimpleNamespace(name="c1", resources={'requests': {'cpu': "500m", 'memory': "512Mi", 'gpu': "1"}}),
+            SimpleNamespace(name="c2", resources={'requests': {'cpu': "1", 'memory': "1Gi", 'gpu': "0"}}),
+        ]
+        pod = Pod(name="pod", containers=containers)
+        self.assertEqual(pod.resources['requests'], {'cpu': "1500m", 'memory': "1536Mi", 'gpu': "1"})
+        self.assertEqual(pod.request_vector, quantity.ResourceVector(cpu=1500, memory=1536 * 1024 ** 2, gpu=1))
+
+
+class TestPodRequestVector(unittest.TestCase):
+
+    def make_container(self, name, cpu, memory):
+        return SimpleNamespace(name=name, resources={'requests': {'cpu': cpu, 'memory': memory}},
+                               to_dict=lambda: {})
+
+    def test_vector_is_immutable(self):
+        pod = Pod(name="pod", containers=[self.make_container("c1", "250m", "64Mi")])
+        with self.assertRaises(AttributeError):
+            pod.request_vector.cpu = 1
+
+    def test_add_and_remove_container_recompute_vector(self):
+        pod = Pod(name="pod", containers=[self.make_container("c1", "250m", "64Mi")])
+        pod.add_container(self.make_container("c2", "750m", "64Mi"))
+        self.assertEqual(pod.request_vector.cpu, 1000)
+        self.assertEqual(pod.resources['requests']['memory'], "128Mi")
+        pod.remove_container("c1")
+        self.assertEqual(pod.request_vector, quantity.ResourceVector(cpu=750, memory=64 * 1024 ** 2))
+
+    def test_node_releases_what_it_allocated(self):
+        from node.node import Node
+        node = Node("node", "10.0.0.1", 4, 4 * 1024 ** 3, 0, 100, 100)
+        pod = Pod(name="pod", containers=[self.make_container("c1", "500m", "64Mi")])
+        node.add_pod(pod)
+        pod.add_container(self.make_container("c2", "500m", "64Mi"))
+        node.remove_pod(pod)
+        self.assertEqual(node.allocated_cpu, 0)
+        self.assertEqual(node.allocated_memory, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
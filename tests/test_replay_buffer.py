@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+from orchestrator.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer, SumTree
+
+
+def fill(buffer, count, state_size=4):
+    for i in range(count):
+        buffer.append(np.full((1, state_size), i), i % 3, float(i), np.full((1, state_size), i + 1), i % 2 == 1)
+
+
+class TestReplayBuffer(unittest.TestCase):
+
+    def test_append_and_wrap_around(self):
+        buffer = ReplayBuffer(5, seed=0)
+        fill(buffer, 7)
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual(buffer.states.shape, (5, 4))
+        self.assertEqual(buffer.states.dtype, np.float32)
+        # 最旧的两条（0、1）被 5、6 覆盖
+        self.assertEqual(sorted(buffer.rewards.tolist()), [2.0, 3.0, 4.0, 5.0, 6.0])
+        self.assertEqual(buffer.states[0, 0], 5)
+
+    def test_sample_returns_consistent_arrays(self):
+        buffer = ReplayBuffer(100, seed=0)
+        fill(buffer, 20)
+        batch = buffer.sample(8)
+        self.assertEqual(batch.states.shape, (8, 4))
+        self.assertEqual(batch.actions.dtype, np.int32)
+        np.testing.assert_array_equal(batch.states[:, 0], batch.rewards)
+        np.testing.assert_array_equal(batch.next_states[:, 0], batch.rewards + 1)
+        np.testing.assert_array_equal(batch.dones, batch.rewards % 2)
+        np.testing.assert_array_equal(batch.weights, np.ones(8))
+        self.assertTrue((batch.indices < 20).all())
+
+    def test_state_size_mismatch_and_clear(self):
+        buffer = ReplayBuffer(10)
+        fill(buffer, 3)
+        with self.assertRaises(ValueError):
+            buffer.append(np.zeros(6), 0, 0.0, np.zeros(6), False)
+        buffer.clear(6)
+        self.assertEqual(len(buffer), 0)
+        buffer.append(np.zeros(6), 0, 0.0, np.zeros(6), False)
+        self.assertEqual(buffer.states.shape, (10, 6))
+        with self.assertRaises(ValueError):
+            ReplayBuffer(10).sample(1)
+
+
+class TestPrioritizedReplayBuffer(unittest.TestCase):
+
+    def test_sum_tree_find(self):
+        tree = SumTree(5)
+        tree.update([0, 1, 2, 3, 4], [1.0, 2.0, 3.0, 0.0, 4.0])
+        self.assertEqual(tree.total, 10.0)
+        np.testing.assert_array_equal(tree.find([0.5, 1.0, 2.9, 3.0, 5.99, 6.0, 9.9]), [0, 1, 1, 2, 2, 4, 4])
+        tree.update([2, 2], [0.0, 0.5])
+        self.assertEqual(tree.total, 7.5)
+
+    def test_sampling_follows_priorities(self):
+        buffer = PrioritizedReplayBuffer(8, alpha=1.0, beta=1.0, epsilon=0.0, seed=0)
+        fill(buffer, 4)
+        # 新经历以最大优先级写入
+        np.testing.assert_array_equal(buffer.tree.get(range(4)), np.ones(4))
+        buffer.update_priorities(np.arange(4), [0.0, 0.0, 1.0, 3.0])
+        counts = np.bincount(np.concatenate([buffer.sample(4).indices for _ in range(500)]), minlength=4)
+        self.assertEqual(counts[0] + counts[1], 0)
+        self.assertAlmostEqual(counts[3] / counts.sum(), 0.75, delta=0.05)
+        batch = buffer.sample(4)
+        # 重要性采样权重：高优先级的经历权重更小，最大为 1
+        self.assertEqual(batch.weights.max(), 1.0)
+        self.assertAlmostEqual(batch.weights[batch.indices == 3].max(), 1 / 3, places=5)
+        self.assertEqual(buffer.max_priority, 3.0)
+        fill(buffer, 1)
+        self.assertEqual(buffer.tree.get([4])[0], 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
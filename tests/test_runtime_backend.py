@@ -0,0 +1,167 @@
+import asyncio
+import json
+import os
+import stat
+import tempfile
+import textwrap
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from container import runtime_backend
+from container.command_executor import CommandExecutor
+from container.container_manager import ContainerManager
+from container.container_runtime import ContainerRuntime
+from container.image_handler import ImageHandler
+from container.runtime_backend import CtrBackend, FakeBackend, create_backend, load_backend
+
+# 假的 ctr：记录参数；容器名为 broken 时失败
+FAKE_CTR = textwrap.dedent('''\
+    #!/bin/sh
+    echo "$@" >> "$FAKE_CTR_LOG"
+    case "$*" in
+        *broken*) echo "container broken not found" >&2; exit 1 ;;
+        *"containers list --quiet") echo "c1"; echo "c2" ;;
+    esac
+    exit 0
+''')
+FAKE_SUDO = '#!/bin/sh\nexec "$@"\n'
+
+
+def make_container(name, command=None):
+    return SimpleNamespace(name=name, image="alpine:latest", command=command or [], ports=[],
+                           resources={'requests': {}, 'limits': {}})
+
+
+class TestFakeBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.etcd_client = MagicMock()
+        self.backend = FakeBackend()
+        self.manager = ContainerManager(self.etcd_client, backend=self.backend)
+        self.runtime = ContainerRuntime(self.etcd_client, backend=self.backend)
+
+    def test_lifecycle(self):
+        self.manager.create_container(make_container("c1", ["sleep", "10"]))
+        self.runtime.start_container(make_container("c1"))
+        self.assertEqual(self.backend.containers["c1"]["status"], "running")
+        self.runtime.stop_container("c1")
+        self.assertEqual(json.loads(self.backend.container_info("c1"))["status"], "stopped")
+        self.assertEqual(self.manager.list_containers(), ["c1"])
+        self.manager.delete_container("c1")
+        self.assertEqual(self.backend.containers, {})
+        self.assertEqual([op for op, _ in self.backend.operations], ['create', 'start', 'kill', 'delete'])
+        self.etcd_client.delete.assert_called_once_with("/containers/c1")
+
+    def test_failure_is_raised_and_not_recorded(self):
+        self.backend.fail.add("c1")
+        with self.assertRaises(Exception):
+            self.manager.create_container(make_container("c1"))
+        self.etcd_client.put.assert_not_called()
+
+    def test_async_paths(self):
+        async def run():
+            await self.manager.create_container_async(make_container("c1"))
+            await self.runtime.start_container_async(make_container("c1"))
+            await self.runtime.list_containers_async()
+            return await self.manager.list_containers_async()
+
+        self.assertEqual(asyncio.run(run()), ["c1"])
+        self.etcd_client.put_many.assert_called_once_with([("/containers/c1/status", "listed")])
+
+
+class TestCtrBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name, content in (('ctr', FAKE_CTR), ('sudo', FAKE_SUDO)):
+            path = os.path.join(self.tmp.name, name)
+            with open(path, 'w') as f:
+                f.write(content)
+            os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        self.log = os.path.join(self.tmp.name, 'ctr.log')
+        env = {'PATH': f"{self.tmp.name}{os.pathsep}{os.environ['PATH']}", 'FAKE_CTR_LOG': self.log}
+        self._old_env = {key: os.environ.get(key) for key in env}
+        os.environ.update(env)
+        self.addCleanup(self._restore_env)
+        self.backend = CtrBackend(CommandExecutor(), namespace="k8s.io")
+
+    def _restore_env(self):
+        for key, value in self._old_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    def calls(self):
+        with open(self.log) as f:
+            return f.read().splitlines()
+
+    def test_commands(self):
+        self.backend.create_container(make_container("c1", ["sh"]))
+        self.backend.start_task("c1")
+        self.assertEqual(self.backend.list_containers(), ["c1", "c2"])
+        self.assertEqual(self.calls(), ["--namespace k8s.io container create alpine:latest c1 sh",
+                                        "--namespace k8s.io task start c1",
+                                        "--namespace k8s.io containers list --quiet"])
+
+    def test_failure_carries_stderr(self):
+        with self.assertRaisesRegex(Exception, "Error deleting container: container broken not found"):
+            self.backend.delete_container("broken")
+
+    def test_async_commands(self):
+        async def run():
+            await self.backend.kill_task_async("c1")
+            return await self.backend.list_containers_async()
+
+        self.assertEqual(asyncio.run(run()), ["c1", "c2"])
+        self.assertEqual(self.calls()[0], "--namespace k8s.io task kill c1")
+
+    def test_image_handler_uses_backend_namespace(self):
+        handler = ImageHandler(CommandExecutor(), backend=self.backend)
+        self.assertEqual(self.backend.ctr_command('images', 'list'),
+                         ['sudo', 'ctr', '--namespace', 'k8s.io', 'images', 'list'])
+        self.assertTrue(handler.pull_image("alpine:latest"))
+        self.assertTrue(asyncio.run(handler.remove_image_async("alpine:latest")))
+        self.assertEqual(self.calls(), ["--namespace k8s.io images pull alpine:latest",
+                                        "--namespace k8s.io images rm alpine:latest"])
+
+
+class TestLoadBackend(unittest.TestCase):
+
+    def setUp(self):
+        runtime_backend._shared_backend = None
+        self.addCleanup(setattr, runtime_backend, '_shared_backend', None)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.config_file = os.path.join(self.tmp.name, 'config.yaml')
+
+    def write_config(self, content):
+        with open(self.config_file, 'w') as f:
+            f.write(content)
+
+    def test_selects_configured_backend(self):
+        self.write_config("container_runtime:\n  backend: fake\n  latency: 0.01\n")
+        backend = load_backend(self.config_file)
+        self.assertIsInstance(backend, FakeBackend)
+        self.assertIs(load_backend(self.config_file), backend)
+
+    def test_unavailable_backend_falls_back_to_ctr(self):
+        self.write_config("container_runtime:\n  backend: containerd\n  address: /nonexistent.sock\n"
+                          "  namespace: k8s.io\n")
+        try:
+            create_backend('containerd', address='/nonexistent.sock').close()
+            self.skipTest("containerd gRPC bindings are installed")
+        except ImportError:
+            pass
+        backend = load_backend(self.config_file)
+        self.assertIsInstance(backend, CtrBackend)
+        self.assertEqual(backend.options, ['--address', '/nonexistent.sock', '--namespace', 'k8s.io'])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_backend('docker')
+
+
+if __name__ == '__main__':
+    unittest.main()
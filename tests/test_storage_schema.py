@@ -0,0 +1,52 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+from etcd import storage_schema
+
+
+class TestStorageSchema(unittest.TestCase):
+
+    def test_keys(self):
+        self.assertEqual(storage_schema.node_key("node1"), "nodes/node1")
+        self.assertEqual(storage_schema.binding_key("node1", "default", "pod1"), "bindings/node1/default/pod1")
+        self.assertEqual(storage_schema.binding_prefix("node1"), "bindings/node1/")
+        self.assertEqual(storage_schema.pod_key("default", "pod1"), "pods/default/pod1")
+
+    def test_migrate_splits_embedded_pods_into_bindings(self):
+        legacy_node = {
+            "name": "node1", "total_cpu": 4, "allocated_cpu": 0.5, "status": "Ready",
+            "pods": [{"name": "pod1", "namespace": "default",
+                      "resources": {"requests": {"cpu": "500m", "memory": "256Mi"}, "limits": {}}}],
+        }
+        legacy_pod = {"name": "pod1", "namespace": "default", "status": "Running"}
+        etcd_client = MagicMock()
+        etcd_client.get.return_value = None
+        etcd_client.get_with_prefix.side_effect = lambda prefix: {
+            "nodes/": [json.dumps(legacy_node)],
+            "pods/": [json.dumps(legacy_pod)],
+        }[prefix]
+        etcd_client.apply_batch.return_value = True
+
+        self.assertEqual(storage_schema.migrate(etcd_client), 1)
+
+        node_puts = dict(etcd_client.apply_batch.call_args_list[0][0][0])
+        record = json.loads(node_puts["nodes/node1"])
+        self.assertNotIn("pods", record)
+        self.assertEqual(record["pod_count"], 1)
+        binding = json.loads(node_puts["bindings/node1/default/pod1"])
+        self.assertEqual(binding["requests"]["cpu"], 500)
+        self.assertEqual(binding["requests"]["memory"], 256 * 1024 ** 2)
+
+        puts, deletes = etcd_client.apply_batch.call_args_list[1][0]
+        self.assertEqual(dict(puts), {"schema/version": "2"})
+        self.assertEqual(deletes, ["/pods/default/pod1/status"])
+
+    def test_migrate_skips_current_schema(self):
+        etcd_client = MagicMock()
+        etcd_client.get.return_value = "2"
+        self.assertEqual(storage_schema.migrate(etcd_client), 0)
+        etcd_client.apply_batch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
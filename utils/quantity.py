@@ -0,0 +1,160 @@
+import logging
+import re
+from decimal import Decimal, ROUND_CEILING
+from functools import lru_cache
+from typing import NamedTuple
+
+# Kubernetes 资源数量格式：<数字><后缀>，后缀可以是二进制单位、十进制单位或科学计数法指数
+_QUANTITY_PATTERN = re.compile(
+    r"^\s*(?P<number>[+-]?(?:\d+(?:\.\d*)?|\.\d+))"
+    r"(?:(?P<exponent>[eE][+-]?\d+)|(?P<suffix>Ki|Mi|Gi|Ti|Pi|Ei|n|u|m|k|M|G|T|P|E)?)\s*$"
+)
+# GPU 请求允许附带 'gpu' 单位（不区分大小写），例如 '2Gpu'
+_GPU_SUFFIX_PATTERN = re.compile(r"gpus?\s*$", re.IGNORECASE)
+
+_SUFFIX_MULTIPLIERS = {
+    None: Decimal(1),
+    'n': Decimal(1) / 10 ** 9,
+    'u': Decimal(1) / 10 ** 6,
+    'm': Decimal(1) / 10 ** 3,
+    'k': Decimal(10) ** 3,
+    'M': Decimal(10) ** 6,
+    'G': Decimal(10) ** 9,
+    'T': Decimal(10) ** 12,
+    'P': Decimal(10) ** 15,
+    'E': Decimal(10) ** 18,
+    'Ki': Decimal(2) ** 10,
+    'Mi': Decimal(2) ** 20,
+    'Gi': Decimal(2) ** 30,
+    'Ti': Decimal(2) ** 40,
+    'Pi': Decimal(2) ** 50,
+    'Ei': Decimal(2) ** 60,
+}
+
+_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_quantity(quantity: str) -> Decimal:
+    """
+    解析 Kubernetes 资源数量字符串，返回精确的 Decimal 值（基本单位）。
+    支持 m/k/M/G/T/P/E、Ki/Mi/Gi/Ti/Pi/Ei、n/u 以及 1e3 形式的指数；结果按原始字符串缓存。
+    :raises ValueError: 格式非法
+    """
+    match = _QUANTITY_PATTERN.match(quantity)
+    if not match:
+        raise ValueError(f"Invalid quantity: {quantity!r}")
+    value = Decimal(match.group('number'))
+    if match.group('exponent'):
+        return value.scaleb(int(match.group('exponent')[1:]))
+    return value * _SUFFIX_MULTIPLIERS[match.group('suffix')]
+
+
+def _to_decimal(value):
+    """将字符串或数字统一转换为 Decimal，非法输入返回 None。"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    if isinstance(value, str):
+        try:
+            return parse_quantity(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _ceil_int(value: Decimal) -> int:
+    return int(value.to_integral_value(rounding=ROUND_CEILING))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _parse_cpu_str(cpu_str: str) -> int:
+    value = _to_decimal(cpu_str)
+    if value is None:
+        logging.warning(f"Invalid CPU format: {cpu_str}")
+        return 0
+    return _ceil_int(value * 1000)
+
+
+def parse_cpu(cpu) -> int:
+    """解析 CPU 数量，返回毫核（整数）。数字按核心数处理，例如 '500m' -> 500，'2' -> 2000。"""
+    if isinstance(cpu, str):
+        return _parse_cpu_str(cpu)
+    value = _to_decimal(cpu)
+    return _ceil_int(value * 1000) if value is not None else 0
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _parse_memory_str(memory_str: str) -> int:
+    value = _to_decimal(memory_str)
+    if value is None:
+        logging.warning(f"Invalid memory format: {memory_str}")
+        return 0
+    return _ceil_int(value)
+
+
+def parse_memory(memory) -> int:
+    """解析内存数量，返回字节数（整数）。数字按字节处理，例如 '256Mi' -> 268435456，'1G' -> 10**9。"""
+    if isinstance(memory, str):
+        return _parse_memory_str(memory)
+    value = _to_decimal(memory)
+    return _ceil_int(value) if value is not None else 0
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _parse_gpu_str(gpu_str: str) -> int:
+    value = _to_decimal(_GPU_SUFFIX_PATTERN.sub('', gpu_str))
+    if value is None:
+        logging.warning(f"Invalid GPU format: {gpu_str}")
+        return 0
+    return _ceil_int(value)
+
+
+def parse_gpu(gpu) -> int:
+    """解析 GPU 数量，返回整数个数，例如 '1' -> 1，'2Gpu' -> 2。"""
+    if isinstance(gpu, str):
+        return _parse_gpu_str(gpu)
+    value = _to_decimal(gpu)
+    return _ceil_int(value) if value is not None else 0
+
+
+def parse_count(value) -> int:
+    """解析没有专用单位的资源（IO、网络等），返回基本单位下的整数。"""
+    return parse_memory(value)
+
+
+def format_cpu(millicores: int) -> str:
+    """将毫核格式化为 Kubernetes 字符串，例如 2000 -> '2'，700 -> '700m'。"""
+    if millicores % 1000 == 0:
+        return str(millicores // 1000)
+    return f"{millicores}m"
+
+
+def format_memory(num_bytes: int) -> str:
+    """将字节数格式化为最大的整除二进制单位，例如 939524096 -> '896Mi'。"""
+    for suffix in ('Ti', 'Gi', 'Mi', 'Ki'):
+        multiplier = int(_SUFFIX_MULTIPLIERS[suffix])
+        if num_bytes and num_bytes % multiplier == 0:
+            return f"{num_bytes // multiplier}{suffix}"
+    return str(num_bytes)
+
+
+class ResourceVector(NamedTuple):
+    """规范化后的资源请求向量：cpu 为毫核，memory 为字节，其余为整数。"""
+    cpu: int = 0
+    memory: int = 0
+    gpu: int = 0
+    io: int = 0
+    net: int = 0
+
+    @classmethod
+    def from_requests(cls, requests):
+        """从资源请求字典（如 {'cpu': '500m', 'memory': '256Mi'}）构造向量。"""
+        return cls(
+            cpu=parse_cpu(requests.get('cpu', 0)),
+            memory=parse_memory(requests.get('memory', 0)),
+            gpu=parse_gpu(requests.get('gpu', 0)),
+            io=parse_count(requests.get('io', 0)),
+            net=parse_count(requests.get('net', 0)),
+        )